@@ -5,6 +5,7 @@ qrly - Simplified GUI without 3D viewer
 
 import sys
 import json
+import multiprocessing
 import os
 from pathlib import Path
 
@@ -15,81 +16,200 @@ sys.path.insert(0, str(project_root))
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QDoubleSpinBox,
-    QGroupBox, QFormLayout, QGridLayout, QProgressBar, QFileDialog, QMessageBox, QCheckBox, QDialog, QSizePolicy, QTextBrowser
+    QGroupBox, QFormLayout, QGridLayout, QProgressBar, QFileDialog, QMessageBox, QCheckBox, QDialog, QSizePolicy, QTextBrowser,
+    QListWidget, QListWidgetItem, QSpinBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
 from qrly.generator import QRModelGenerator
+from qrly.job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED, CANCELLED, default_workers
+from qrly.pipeline import ModelPipeline
 from qrly import __version__
 
 # Default output directory in user's home folder
 DEFAULT_OUTPUT_DIR = Path.home() / "qr-codes"
 
 
-class GeneratorThread(QThread):
-    """Background thread for STL generation"""
-    progress = pyqtSignal(str)
-    finished = pyqtSignal(bool, str, str)  # success, stl_path, message
+class FastPreviewThread(QThread):
+    """Background thread drawing the instant raster preview (no OpenSCAD)"""
+    finished = pyqtSignal(bool, QImage, str)  # success, image, error message
 
-    def __init__(self, input_path, output_name, mode, params, text_content='', text_rotation=0, text_content_top=''):
+    def __init__(self, pipeline, pipeline_params):
         super().__init__()
-        self.input_path = input_path
-        self.output_name = output_name
-        self.mode = mode
-        self.params = params
-        self.text_content = text_content
-        self.text_rotation = text_rotation
-        self.text_content_top = text_content_top
+        self.pipeline = pipeline
+        self.pipeline_params = pipeline_params
 
     def run(self):
         try:
-            # Check if input is a URL
-            actual_input = self.input_path
-            temp_qr_file = None
-
-            if QRModelGenerator.is_url(self.input_path):
-                # Generate QR code from URL - save to temp location
-                self.progress.emit(f"Generating QR code from URL...")
+            image = self.pipeline.get('preview', self.pipeline_params)
+        except Exception as e:
+            self.finished.emit(False, QImage(), f"Preview generation failed: {str(e)}")
+            return
+        data = image.tobytes('raw', 'RGB')
+        qimage = QImage(data, image.width, image.height, image.width * 3, QImage.Format.Format_RGB888)
+        self.finished.emit(True, qimage.copy(), "")  # copy() detaches from the bytes buffer
 
-                # Generate QR to temporary file (generate() will handle final placement)
-                actual_input = QRModelGenerator.generate_qr_image(self.input_path)
-                self.progress.emit(f"QR code created")
 
-            self.progress.emit("Generating 3D model...")
+class PreviewThread(QThread):
+    """Background thread rendering the OpenSCAD preview PNG (cancellable)"""
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool, bytes, str)  # success, png_data, message
 
-            generator = QRModelGenerator(
-                actual_input,
-                self.mode,
-                str(DEFAULT_OUTPUT_DIR),
-                output_name=self.output_name
-            )
+    def __init__(self, pipeline, pipeline_params):
+        super().__init__()
+        self.pipeline = pipeline
+        self.pipeline_params = pipeline_params
+        self.process = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the render and kill the OpenSCAD child process"""
+        self.cancelled = True
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.kill()
 
-            # Apply custom parameters
-            generator.card_height = self.params['height']
-            generator.qr_margin = self.params['margin']
-            generator.qr_relief = self.params['relief']
-            generator.corner_radius = self.params['corner_radius']
-            generator.size_scale = self.params['size_scale']
-            generator.text_content = self.text_content
-            generator.text_content_top = self.text_content_top
-            generator.text_rotation = self.text_rotation
-            # Sync text relief with QR relief (always same height)
-            generator.text_height = self.params['relief']
+    def run(self):
+        import shutil
+        import subprocess
+        import tempfile
+        from qrly.generator import find_openscad_binary
 
+        # Scratch directory, always removed when the render ends
+        temp_dir = Path(tempfile.mkdtemp(prefix='qrly_preview_'))
+        try:
+            if QRModelGenerator.is_url(self.pipeline_params['input']):
+                self.progress.emit("Generating QR code from URL...")
             self.progress.emit("Creating 3D model...")
-            scad_path, stl_path, json_path = generator.generate(qr_input=self.input_path)
 
-            self.progress.emit("Model generated successfully!")
-            self.finished.emit(True, str(stl_path), f"Generated: {Path(stl_path).name}")
+            # Generate SCAD code (unchanged stages are reused from earlier previews)
+            scad_content = self.colorize_scad(self.pipeline.get('scad', self.pipeline_params))
+            if self.cancelled:
+                self.finished.emit(False, b'', "Preview cancelled")
+                return
+
+            scad_file = temp_dir / 'preview.scad'
+            with open(scad_file, 'w', encoding='utf-8') as f:
+                f.write(scad_content)
+
+            # Render preview image with OpenSCAD
+            self.progress.emit("Rendering preview (this may take a few seconds)...")
+            preview_image = temp_dir / 'preview.png'
+
+            # Camera position for nice 3D view
+            # translate_x,y,z,rot_x,rot_y,rot_z,distance
+            camera_pos = "0,0,0,55,0,205,200"  # x,y,z,rot_x,rot_y,rot_z,distance (205 = 25 + 180)
+
+            # Render command (similar to export_stl but with PNG-specific parameters)
+            cmd = [
+                find_openscad_binary(),
+                '-o', str(preview_image),
+                '--autocenter',
+                '--viewall',
+                '--camera=' + camera_pos,
+                '--imgsize=800,800',
+                '--projection=ortho',
+                '--colorscheme=Starnight',
+                str(scad_file)
+            ]
+
+            self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            if self.cancelled:
+                self.process.kill()
+            try:
+                _, stderr = self.process.communicate(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.communicate()
+                raise Exception("OpenSCAD rendering timed out")
+
+            if self.cancelled:
+                self.finished.emit(False, b'', "Preview cancelled")
+            elif self.process.returncode == 0 and preview_image.exists():
+                self.finished.emit(True, preview_image.read_bytes(), "Preview ready")
+            else:
+                raise Exception(f"OpenSCAD rendering failed: {stderr}")
 
         except Exception as e:
-            self.finished.emit(False, "", f"Error: {str(e)}")
+            self.finished.emit(False, b'', f"Preview generation failed: {str(e)}")
+        finally:
+            self.process = None
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def colorize_scad(scad_content):
+        """Add colors for preview (white base, black QR/text)"""
+        scad_content = scad_content.replace(
+            '        // Base card with rounded corners (hull is MUCH faster than minkowski)\n        rounded_square(card_width, card_length, card_height, corner_radius);',
+            '        // Base card with rounded corners (hull is MUCH faster than minkowski)\n        color("white")\n        rounded_square(card_width, card_length, card_height, corner_radius);'
+        )
+        scad_content = scad_content.replace(
+            '        // QR Code pattern (raised)\n        translate([qr_offset_x, qr_offset_y, card_height])\n            qr_pattern();',
+            '        // QR Code pattern (raised)\n        color("black")\n        translate([qr_offset_x, qr_offset_y, card_height])\n            qr_pattern();'
+        )
+        scad_content = scad_content.replace(
+            '        // Top text label (if enabled, for rectangle-text-2x mode)\n        text_label_top();',
+            '        // Top text label (if enabled, for rectangle-text-2x mode)\n        color("black")\n        text_label_top();'
+        )
+        scad_content = scad_content.replace(
+            '        // Bottom text label (if enabled)\n        text_label();',
+            '        // Bottom text label (if enabled)\n        color("black")\n        text_label();'
+        )
+        return scad_content
+
+
+class JobPrepareThread(QThread):
+    """Background preparation of a generation job (stages, identical model lookup, memory estimate)"""
+    prepared = pyqtSignal(dict, object)  # settings ready to submit, existing catalog entry or None
+
+    def __init__(self, pipeline, settings):
+        super().__init__()
+        self.pipeline = pipeline
+        self.settings = settings
+
+    def run(self):
+        settings = dict(self.settings)
+        try:
+            # Worker reuses the matrix, dimensions and SCAD code instead of recomputing them
+            settings['stages'] = self.pipeline.export_stages(settings)
+        except Exception:
+            pass  # Input not readable here; the worker reports the error
+        existing = self.find_existing_model(settings)
+        settings['memory_mb'] = self.estimate_job_memory(settings)
+        self.prepared.emit(settings, existing)
+
+    def find_existing_model(self, settings):
+        """Catalog entry of an identical model in the output directory, or None"""
+        from qrly.catalog import Catalog, model_params
+
+        try:
+            generator = self.pipeline.make_generator(settings)
+            matrix_hash = self.pipeline.get('matrix', settings)['hash']
+            url = settings['input'] if QRModelGenerator.is_url(settings['input']) else None
+            entry = Catalog(DEFAULT_OUTPUT_DIR).find_model(model_params(generator), matrix_hash, url)
+            if entry is not None and not all(path.exists() for path in generator.extra_paths(entry['stl_path'])):
+                return None  # Generated without separate bodies or 3MF
+            return entry
+        except Exception:
+            return None  # Input not readable here or no catalog - just generate
+
+    def estimate_job_memory(self, settings):
+        """Estimated OpenSCAD memory of a job in MB (from the cached SCAD code)"""
+        from qrly.generator import find_openscad_binary
+        from qrly.openscad import probe_openscad, render_flags
+        from qrly.scheduler import BASE_MEMORY_MB, count_primitives, estimate_memory_mb
+
+        try:
+            primitives = count_primitives(self.pipeline.get('scad', settings))
+        except Exception:
+            return BASE_MEMORY_MB  # Input not readable here; the worker reports the error
+        return estimate_memory_mb(primitives, render_flags(probe_openscad(find_openscad_binary())))
 
 
 class PreviewDialog(QDialog):
-    """Dialog showing OpenSCAD-rendered preview of the model"""
+    """Dialog showing a live preview of the model (instant raster view, OpenSCAD render on demand)"""
 
-    def __init__(self, input_path, mode, params, text_content='', text_content_top='', text_rotation=0, parent=None):
+    def __init__(self, input_path, mode, params, text_content='', text_content_top='', text_rotation=0, parent=None, pipeline=None):
         super().__init__(parent)
         self.input_path = input_path
         self.mode = mode
@@ -97,9 +217,13 @@ class PreviewDialog(QDialog):
         self.text_content = text_content
         self.text_content_top = text_content_top
         self.text_rotation = text_rotation
-        self.preview_image = None
+        self.pipeline = pipeline or ModelPipeline()
+        self.preview_thread = None
+        self.pending_params = None  # Latest request while a render is running (older ones are dropped)
+        self.fast_thread = None
+        self.fast_pending = False  # Settings changed while the instant preview was drawn
         self.setup_ui()
-        self.generate_preview()
+        self.show_fast_preview()
 
     def setup_ui(self):
         """Setup preview dialog UI"""
@@ -124,10 +248,7 @@ class PreviewDialog(QDialog):
         # Set dialog background to white
         self.setStyleSheet("QDialog { background-color: #ffffff; }")
 
-        # Close button
-        close_btn = QPushButton("Close")
-        close_btn.clicked.connect(self.accept)
-        close_btn.setStyleSheet("""
+        button_style = """
             QPushButton {
                 background-color: #6c757d;
                 color: white;
@@ -138,140 +259,178 @@ class PreviewDialog(QDialog):
             QPushButton:hover {
                 background-color: #5a6268;
             }
-        """)
-        layout.addWidget(close_btn)
+            QPushButton:disabled {
+                background-color: #cccccc;
+            }
+        """
+        button_row = QHBoxLayout()
 
-    def generate_preview(self):
-        """Generate preview by creating temporary SCAD and rendering it"""
-        import tempfile
-        import subprocess
+        # Exact preview button (full OpenSCAD render)
+        self.exact_btn = QPushButton("Exact Preview (OpenSCAD)")
+        self.exact_btn.clicked.connect(self.generate_preview)
+        self.exact_btn.setStyleSheet(button_style)
+        button_row.addWidget(self.exact_btn)
 
-        try:
-            # Create temp directory
-            temp_dir = Path(tempfile.mkdtemp(prefix='qrly_preview_'))
-
-            # Check if input is URL and generate QR code if needed
-            actual_input = self.input_path
-            if self.input_path and QRModelGenerator.is_url(self.input_path):
-                self.status_label.setText("Generating QR code from URL...")
-                QApplication.processEvents()
-                actual_input = QRModelGenerator.generate_qr_image(self.input_path)
-            elif not self.input_path:
-                # Create a dummy QR code for preview
-                self.status_label.setText("Generating sample QR code...")
-                QApplication.processEvents()
-                actual_input = QRModelGenerator.generate_qr_image("https://example.com")
-
-            # Create generator
-            self.status_label.setText("Creating 3D model...")
-            QApplication.processEvents()
-
-            generator = QRModelGenerator(actual_input, self.mode, str(temp_dir), output_name='preview')
-
-            # Apply parameters
-            generator.card_height = self.params['height']
-            generator.qr_margin = self.params['margin']
-            generator.qr_relief = self.params['relief']
-            generator.corner_radius = self.params['corner_radius']
-            generator.size_scale = self.params['size_scale']
-            generator.text_content = self.text_content
-            generator.text_content_top = self.text_content_top
-            generator.text_rotation = self.text_rotation
-            generator.text_height = self.params['relief']
-
-            # Load and process image
-            matrix, width, height = generator.load_and_process_image()
-            dimensions = generator.calculate_dimensions(height)
-
-            # Generate SCAD file
-            scad_content = generator.generate_openscad(matrix, dimensions)
-
-            # Add colors for preview (white base, black QR/text)
-            scad_content = scad_content.replace(
-                '        // Base card with rounded corners (hull is MUCH faster than minkowski)\n        rounded_square(card_width, card_length, card_height, corner_radius);',
-                '        // Base card with rounded corners (hull is MUCH faster than minkowski)\n        color("white")\n        rounded_square(card_width, card_length, card_height, corner_radius);'
-            )
-            scad_content = scad_content.replace(
-                '        // QR Code pattern (raised)\n        translate([qr_offset_x, qr_offset_y, card_height])\n            qr_pattern();',
-                '        // QR Code pattern (raised)\n        color("black")\n        translate([qr_offset_x, qr_offset_y, card_height])\n            qr_pattern();'
-            )
-            scad_content = scad_content.replace(
-                '        // Top text label (if enabled, for rectangle-text-2x mode)\n        text_label_top();',
-                '        // Top text label (if enabled, for rectangle-text-2x mode)\n        color("black")\n        text_label_top();'
-            )
-            scad_content = scad_content.replace(
-                '        // Bottom text label (if enabled)\n        text_label();',
-                '        // Bottom text label (if enabled)\n        color("black")\n        text_label();'
-            )
+        # Cancel button (stops a running render)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_preview)
+        self.cancel_btn.setStyleSheet(button_style)
+        self.cancel_btn.setEnabled(False)
+        button_row.addWidget(self.cancel_btn)
 
-            scad_file = temp_dir / 'preview.scad'
-            with open(scad_file, 'w', encoding='utf-8') as f:
-                f.write(scad_content)
+        # Close button
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        close_btn.setStyleSheet(button_style)
+        button_row.addWidget(close_btn)
 
-            # Render preview image with OpenSCAD
-            self.status_label.setText("Rendering preview (this may take a few seconds)...")
-            QApplication.processEvents()
+        layout.addLayout(button_row)
 
-            preview_image = temp_dir / 'preview.png'
+    def preview_params(self):
+        """Pipeline parameters for the current settings"""
+        # Use a sample QR code if no input was given
+        actual_input = self.input_path or "https://example.com"
+        return dict(self.params, input=actual_input, mode=self.mode,
+                    text_content=self.text_content, text_content_top=self.text_content_top,
+                    text_rotation=self.text_rotation)
 
-            # Find OpenSCAD binary
-            from qrly.generator import find_openscad_binary
-            openscad_bin = find_openscad_binary()
+    def update_settings(self, input_path, mode, params, text_content='', text_content_top='', text_rotation=0):
+        """Apply changed settings from the main window (live update)"""
+        self.input_path = input_path
+        self.mode = mode
+        self.params = params
+        self.text_content = text_content
+        self.text_content_top = text_content_top
+        self.text_rotation = text_rotation
+        self.cancel_preview()  # An exact render of the old settings is stale now
+        self.show_fast_preview()
 
-            # Camera position for nice 3D view
-            # translate_x,y,z,rot_x,rot_y,rot_z,distance
-            camera_pos = "0,0,0,55,0,205,200"  # x,y,z,rot_x,rot_y,rot_z,distance (205 = 25 + 180)
+    def show_fast_preview(self):
+        """Draw the instant preview (no OpenSCAD) in a background thread; the newest settings win"""
+        if self.fast_thread is not None and self.fast_thread.isRunning():
+            self.fast_pending = True
+            return
 
-            # Render command (similar to export_stl but with PNG-specific parameters)
-            cmd = [
-                openscad_bin,
-                '-o', str(preview_image),
-                '--autocenter',
-                '--viewall',
-                '--camera=' + camera_pos,
-                '--imgsize=800,800',
-                '--projection=ortho',
-                '--colorscheme=Starnight',
-                str(scad_file)
-            ]
+        self.fast_pending = False
+        self.fast_thread = FastPreviewThread(self.pipeline, self.preview_params())
+        self.fast_thread.finished.connect(self.on_fast_preview_finished)
+        self.fast_thread.start()
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0 and preview_image.exists():
-                # Load and display image
-                pixmap = QPixmap(str(preview_image))
-                if not pixmap.isNull():
-                    # Scale to fit
-                    scaled_pixmap = pixmap.scaled(
-                        self.image_label.size(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    self.image_label.setPixmap(scaled_pixmap)
-                    self.status_label.setText("Preview ready")
-                    self.status_label.setStyleSheet("font-weight: bold; padding: 10px; color: #28a745;")
-                else:
-                    raise Exception("Failed to load rendered image")
-            else:
-                raise Exception(f"OpenSCAD rendering failed: {result.stderr}")
+    def on_fast_preview_finished(self, success: bool, qimage: QImage, message: str):
+        """Show the instant preview (or draw it again for settings changed meanwhile)"""
+        if self.fast_pending:
+            self.fast_thread.wait()
+            self.show_fast_preview()
+            return
+        if self.preview_thread is not None and self.preview_thread.isRunning() and not self.preview_thread.cancelled:
+            return  # The exact render started meanwhile and reports its own status
+        if not success:
+            self.show_error(message)
+            return
 
-            # Cleanup temp files (keep them for a moment for debugging)
-            # import shutil
-            # shutil.rmtree(temp_dir)
+        self.show_pixmap(QPixmap.fromImage(qimage))
+        self.status_label.setText("✓ Quick preview (use Exact Preview for the OpenSCAD render)")
+        self.status_label.setStyleSheet("font-weight: bold; padding: 10px; color: #28a745;")
 
-        except Exception as e:
-            self.status_label.setText(f"Preview generation failed: {str(e)}")
-            self.status_label.setStyleSheet("font-weight: bold; padding: 10px; color: #cc0000;")
+    def show_pixmap(self, pixmap):
+        """Show an image scaled to fit the label"""
+        scaled_pixmap = pixmap.scaled(
+            self.image_label.size(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.image_label.setPixmap(scaled_pixmap)
+
+    def show_error(self, message):
+        """Show an error message (keeps the last good image)"""
+        self.status_label.setText(message)
+        self.status_label.setStyleSheet("font-weight: bold; padding: 10px; color: #cc0000;")
+        if self.image_label.pixmap() is None or self.image_label.pixmap().isNull():
             self.image_label.setText("Could not generate preview")
             self.image_label.setStyleSheet("border: 2px solid #ccc; background-color: #f8f9fa; color: #666;")
 
+    def generate_preview(self):
+        """Render the exact OpenSCAD preview in a background thread"""
+        self.request_preview(self.preview_params())
+
+    def request_preview(self, pipeline_params):
+        """Start a render; a running render is superseded by the newest request"""
+        if self.preview_thread is not None and self.preview_thread.isRunning():
+            self.pending_params = pipeline_params
+            self.preview_thread.cancel()
+            return
+
+        self.pending_params = None
+        self.status_label.setText("Generating preview...")
+        self.status_label.setStyleSheet("font-weight: bold; padding: 10px; color: #0066cc;")
+        self.cancel_btn.setEnabled(True)
+
+        self.preview_thread = PreviewThread(self.pipeline, pipeline_params)
+        self.preview_thread.progress.connect(self.status_label.setText)
+        self.preview_thread.finished.connect(self.on_preview_finished)
+        self.preview_thread.start()
+
+    def cancel_preview(self):
+        """Cancel the running render (and any queued one)"""
+        self.pending_params = None
+        if self.preview_thread is not None:
+            self.preview_thread.cancel()
+
+    def on_preview_finished(self, success: bool, png_data: bytes, message: str):
+        """Show rendered image (or start the queued render)"""
+        if self.pending_params is not None:
+            self.preview_thread.wait()
+            self.request_preview(self.pending_params)
+            return
+
+        self.cancel_btn.setEnabled(False)
+        if self.preview_thread.cancelled:
+            # Back to the instant preview of the current settings
+            self.show_fast_preview()
+            return
+        if success:
+            # Load and display image
+            pixmap = QPixmap()
+            if pixmap.loadFromData(png_data):
+                self.show_pixmap(pixmap)
+                self.status_label.setText(message)
+                self.status_label.setStyleSheet("font-weight: bold; padding: 10px; color: #28a745;")
+                return
+            message = "Preview generation failed: Failed to load rendered image"
+
+        self.show_error(message)
+
+    def done(self, result):
+        """Kill a running render when the dialog is closed (Close button, Escape or window close)"""
+        self.cancel_preview()
+        self.fast_pending = False
+        for thread in (self.preview_thread, self.fast_thread):
+            if thread is not None:
+                thread.wait()
+        super().done(result)
+
 
 class SimpleMainWindow(QMainWindow):
     """Simplified main window without 3D viewer"""
 
     def __init__(self):
         super().__init__()
-        self.generator_thread = None
+        self.preview_dialog = None
+        # Generation jobs run in worker processes; the timer collects their progress
+        self.job_queue = JobQueue(default_workers())
+        self.job_timer = QTimer(self)
+        self.job_timer.setInterval(200)
+        self.job_timer.timeout.connect(self.poll_jobs)
+        # Memoized model stages shared by preview and generation
+        self.pipeline = ModelPipeline()
+        self.prepare_threads = []  # Jobs being prepared (see JobPrepareThread)
+
+        # Debounce live preview updates while settings are being edited
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self.update_preview)
+
         self.setup_ui()
 
         # Enable drag and drop for JSON config files
@@ -491,6 +650,14 @@ class SimpleMainWindow(QMainWindow):
         self.corner_spin.setSuffix(" mm")
         params_layout.addWidget(self.corner_spin, 1, 3)
 
+        # Row 3: Separate bodies for two-colour printing
+        self.bodies_check = QCheckBox("Separate bodies for two-colour printing (base + QR/text STLs)")
+        params_layout.addWidget(self.bodies_check, 2, 0, 1, 4)
+
+        # Row 4: 3MF next to the STL
+        self.threemf_check = QCheckBox("Also write 3MF (compact, with metadata)")
+        params_layout.addWidget(self.threemf_check, 3, 0, 1, 4)
+
         params_group.setLayout(params_layout)
         params_group.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Expanding)
         layout.addWidget(params_group)
@@ -631,6 +798,47 @@ class SimpleMainWindow(QMainWindow):
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.status_label)
 
+        # Job queue panel
+        jobs_group = QGroupBox("Jobs")
+        jobs_layout = QVBoxLayout()
+
+        self.job_list = QListWidget()
+        self.job_list.setMinimumHeight(100)
+        jobs_layout.addWidget(self.job_list)
+
+        jobs_buttons = QHBoxLayout()
+        jobs_buttons.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(self.job_queue.max_workers)
+        self.workers_spin.valueChanged.connect(self.set_workers)
+        jobs_buttons.addWidget(self.workers_spin)
+        jobs_buttons.addStretch()
+
+        cancel_job_btn = QPushButton("Cancel")
+        cancel_job_btn.clicked.connect(self.cancel_job)
+        jobs_buttons.addWidget(cancel_job_btn)
+
+        retry_job_btn = QPushButton("Retry")
+        retry_job_btn.clicked.connect(self.retry_job)
+        jobs_buttons.addWidget(retry_job_btn)
+
+        clear_jobs_btn = QPushButton("Clear Finished")
+        clear_jobs_btn.clicked.connect(self.clear_finished_jobs)
+        jobs_buttons.addWidget(clear_jobs_btn)
+
+        jobs_layout.addLayout(jobs_buttons)
+        jobs_group.setLayout(jobs_layout)
+        layout.addWidget(jobs_group)
+
+        # Live preview: any settings change refreshes an open preview dialog
+        self.input_field.textChanged.connect(self.schedule_preview_update)
+        self.mode_combo.currentIndexChanged.connect(self.schedule_preview_update)
+        self.text_field.textChanged.connect(self.schedule_preview_update)
+        self.text_field_top.textChanged.connect(self.schedule_preview_update)
+        for spin in (self.height_spin, self.margin_spin, self.relief_spin, self.corner_spin):
+            spin.valueChanged.connect(self.schedule_preview_update)
+
         # Initialize size label
         self.update_size_label()
 
@@ -640,7 +848,7 @@ class SimpleMainWindow(QMainWindow):
             self,
             "Select QR Code Image",
             str(Path.home()),
-            "Image Files (*.png *.jpg *.jpeg)"
+            "Image Files (*.png *.jpg *.jpeg *.svg)"
         )
         if file_path:
             self.input_field.setText(file_path)
@@ -681,6 +889,7 @@ class SimpleMainWindow(QMainWindow):
         """Set the size scale factor (0.5 = small, 1.0 = medium, 2.0 = large)"""
         self.current_size_scale = scale
         self.update_size_label()
+        self.schedule_preview_update()
 
     def update_size_label(self):
         """Update the size label based on current mode and scale"""
@@ -745,8 +954,8 @@ class SimpleMainWindow(QMainWindow):
         msg.setIcon(QMessageBox.Icon.Information)
         msg.exec()
 
-    def show_preview(self):
-        """Show preview dialog"""
+    def preview_settings(self):
+        """Current settings as PreviewDialog arguments (input, mode, params, texts, rotation)"""
         # Get input
         input_text = self.input_field.text().strip()
 
@@ -779,10 +988,28 @@ class SimpleMainWindow(QMainWindow):
             'corner_radius': self.corner_spin.value(),
             'size_scale': self.current_size_scale
         }
+        return input_text, mode, params, text_content, text_content_top, text_rotation
 
-        # Show preview dialog
-        dialog = PreviewDialog(input_text, mode, params, text_content, text_content_top, text_rotation, self)
-        dialog.exec()
+    def show_preview(self):
+        """Show preview dialog (stays open and follows settings changes)"""
+        if self.preview_dialog is not None and self.preview_dialog.isVisible():
+            self.preview_dialog.update_settings(*self.preview_settings())
+            self.preview_dialog.raise_()
+            self.preview_dialog.activateWindow()
+            return
+
+        self.preview_dialog = PreviewDialog(*self.preview_settings(), parent=self, pipeline=self.pipeline)
+        self.preview_dialog.show()
+
+    def schedule_preview_update(self, *args):
+        """Refresh an open preview shortly after the last settings change"""
+        if self.preview_dialog is not None and self.preview_dialog.isVisible():
+            self.preview_timer.start()
+
+    def update_preview(self):
+        """Push current settings to the open preview dialog"""
+        if self.preview_dialog is not None and self.preview_dialog.isVisible():
+            self.preview_dialog.update_settings(*self.preview_settings())
 
     def generate_model(self):
         """Start model generation in background thread"""
@@ -865,35 +1092,114 @@ class SimpleMainWindow(QMainWindow):
             'size_scale': self.current_size_scale
         }
 
-        # Start generation in background
-        self.generate_btn.setEnabled(False)
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate
-        self.status_label.setText("Starting generation...")
+        # Queue the job with a snapshot of the current settings
+        settings = dict(params, input=input_text, mode=mode, text_content=text_content,
+                        text_content_top=text_content_top, text_rotation=text_rotation,
+                        output_name=output_name, output_dir=str(DEFAULT_OUTPUT_DIR),
+                        bodies=self.bodies_check.isChecked(), **{'3mf': self.threemf_check.isChecked()})
 
-        self.generator_thread = GeneratorThread(input_text, output_name, mode, params, text_content, text_rotation, text_content_top)
-        self.generator_thread.progress.connect(self.on_progress)
-        self.generator_thread.finished.connect(self.on_generation_finished)
-        self.generator_thread.start()
-
-    def on_progress(self, message: str):
-        """Update progress message"""
-        self.status_label.setText(message)
+        # Stages, catalog lookup and the OpenSCAD probe run off the GUI thread
+        self.status_label.setText(f"Preparing: {output_name}...")
+        self.status_label.setStyleSheet("padding: 10px; color: #666; font-size: 12px;")
+        thread = JobPrepareThread(self.pipeline, settings)
+        thread.prepared.connect(self.submit_job)
+        thread.finished.connect(lambda: self.prepare_threads.remove(thread))
+        self.prepare_threads.append(thread)
+        thread.start()
+
+    def submit_job(self, settings, existing):
+        """Queue a prepared job (offering an identical existing model instead)"""
+        if existing is not None:
+            answer = QMessageBox.question(
+                self,
+                "Model Already Exists",
+                f"An identical model was already generated:\n{existing['dir']}\n\n"
+                f"Use the existing model instead of generating it again?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes
+            )
+            if answer == QMessageBox.StandardButton.Yes:
+                self.status_label.setText(f"✅ Existing model: {existing['stl_path'].name}\n📁 Files in: {existing['dir']}/")
+                self.status_label.setStyleSheet("padding: 10px; color: #008800; font-size: 12px; font-weight: bold;")
+                return
 
-    def on_generation_finished(self, success: bool, stl_path: str, message: str):
-        """Handle generation completion"""
-        self.generate_btn.setEnabled(True)
-        self.progress_bar.setVisible(False)
+        job = self.job_queue.submit(settings)
+        item = QListWidgetItem()
+        item.setData(Qt.ItemDataRole.UserRole, job.id)
+        self.job_list.addItem(item)
+        self.update_job_item(job)
 
-        if success:
-            stl_file = Path(stl_path)
-            success_msg = f"✅ {message}\n📁 Files saved in: {DEFAULT_OUTPUT_DIR}/"
-            self.status_label.setText(success_msg)
-            self.status_label.setStyleSheet("padding: 10px; color: #008800; font-size: 12px; font-weight: bold;")
-        else:
-            self.status_label.setText(f"❌ {message}")
-            self.status_label.setStyleSheet("padding: 10px; color: #cc0000; font-size: 12px; font-weight: bold;")
-            QMessageBox.critical(self, "Generation Failed", message)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)  # Indeterminate
+        self.status_label.setText(f"Queued: {settings['output_name']}")
+        self.status_label.setStyleSheet("padding: 10px; color: #666; font-size: 12px;")
+        self.job_timer.start()
+
+    def job_item(self, job_id):
+        """List item of a job (or None)"""
+        for row in range(self.job_list.count()):
+            item = self.job_list.item(row)
+            if item.data(Qt.ItemDataRole.UserRole) == job_id:
+                return item
+        return None
+
+    def update_job_item(self, job):
+        """Show a job's state in the job list"""
+        item = self.job_item(job.id)
+        if item is None:
+            return
+        icons = {QUEUED: '⏳', RUNNING: '⚙️', DONE: '✅', FAILED: '❌', CANCELLED: '⏹'}
+        item.setText(f"{icons[job.state]} #{job.id} {job.name} - {job.message}")
+        if job.state == DONE:
+            item.setToolTip(job.stl_path)
+
+    def selected_job_id(self):
+        """Job id of the selected list row (or None)"""
+        item = self.job_list.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item is not None else None
+
+    def poll_jobs(self):
+        """Collect progress and results from the worker processes"""
+        for job in self.job_queue.poll():
+            self.update_job_item(job)
+            if job.state == DONE:
+                self.status_label.setText(f"✅ {job.message}\n📁 Files saved in: {DEFAULT_OUTPUT_DIR}/")
+                self.status_label.setStyleSheet("padding: 10px; color: #008800; font-size: 12px; font-weight: bold;")
+            elif job.state == FAILED:
+                self.status_label.setText(f"❌ #{job.id} {job.name}: {job.message}")
+                self.status_label.setStyleSheet("padding: 10px; color: #cc0000; font-size: 12px; font-weight: bold;")
+
+        if not self.job_queue.active:
+            self.job_timer.stop()
+            self.progress_bar.setVisible(False)
+
+    def set_workers(self, count):
+        """Change the number of parallel worker processes"""
+        self.job_queue.max_workers = count
+        self.poll_jobs()
+
+    def cancel_job(self):
+        """Cancel the selected job"""
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.update_job_item(self.job_queue.cancel(job_id))
+            self.poll_jobs()
+
+    def retry_job(self):
+        """Run the selected failed or cancelled job again"""
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.update_job_item(self.job_queue.retry(job_id))
+            self.progress_bar.setVisible(True)
+            self.job_timer.start()
+
+    def clear_finished_jobs(self):
+        """Remove finished jobs from the list"""
+        self.job_queue.clear_finished()
+        remaining = {job.id for job in self.job_queue.jobs}
+        for row in reversed(range(self.job_list.count())):
+            if self.job_list.item(row).data(Qt.ItemDataRole.UserRole) not in remaining:
+                self.job_list.takeItem(row)
 
     def show_help_dialog(self):
         """Show help dialog with usage tips"""
@@ -904,7 +1210,7 @@ class SimpleMainWindow(QMainWindow):
 <h3>Input:</h3>
 <ul>
 <li><b>Enter URL:</b> QR code is generated automatically</li>
-<li><b>Or select image file:</b> PNG/JPG files are supported</li>
+<li><b>Or select image file:</b> PNG/JPG and SVG files are supported</li>
 </ul>
 
 <h3>Model Type:</h3>
@@ -985,6 +1291,23 @@ Open Source Project by Martin Pfeffer | MIT License | © 2025<br>
 
         dialog.exec()
 
+    def closeEvent(self, event):
+        """Cancel running jobs and remove temporary pipeline files on exit"""
+        if self.job_queue.active:
+            reply = QMessageBox.question(
+                self, "Jobs Running",
+                "Generation jobs are still queued or running. Cancel them and quit?")
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+        for thread in list(self.prepare_threads):
+            thread.wait()
+        self.job_queue.shutdown()
+        if self.preview_dialog is not None:
+            self.preview_dialog.close()
+        self.pipeline.cleanup()
+        super().closeEvent(event)
+
     def dragEnterEvent(self, event):
         """Handle drag enter event - accept JSON files"""
         if event.mimeData().hasUrls():
@@ -1085,6 +1408,15 @@ Open Source Project by Martin Pfeffer | MIT License | © 2025<br>
 
 
 def main():
+    # Worker processes of frozen app bundles start through main()
+    multiprocessing.freeze_support()
+
+    # Headless hot folder mode: qrly watch <dir>
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        from qrly.watch import main as watch_main
+        watch_main(sys.argv[2:])
+        return
+
     print("Starting QR Code 3D Generator (Simple Mode)...")
 
     # Enable high DPI scaling
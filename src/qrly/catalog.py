@@ -0,0 +1,280 @@
+"""
+SQLite catalog of an output directory
+
+Keeps the next free counter per model name, so allocating "acme-medium-thin",
+"acme-medium-thin (1)", ... is a single indexed lookup instead of probing every
+existing directory. Allocation runs in an IMMEDIATE transaction (one writer at
+a time across processes) and creates the directory with mkdir(exist_ok=False),
+so concurrent workers never get the same directory.
+
+Every generated model is also recorded (input, mode, parameters, matrix hash,
+artifact paths, size, render time), so "has this URL already been made at
+large/thick?" is an indexed query instead of a scan over all metadata files.
+Models generated before the catalog existed are added by import_metadata().
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+CATALOG_NAME = '.qrly-catalog.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    next_counter INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS models (
+    dir TEXT PRIMARY KEY,
+    input TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    matrix_hash TEXT,
+    engine TEXT,
+    scad_path TEXT NOT NULL,
+    stl_path TEXT NOT NULL,
+    json_path TEXT NOT NULL,
+    stl_bytes INTEGER,
+    render_seconds REAL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS models_input ON models (input, params_hash);
+CREATE INDEX IF NOT EXISTS models_params ON models (params_hash, matrix_hash);
+"""
+
+INSERT_MODEL = "INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+TEXT_MODES = ['rectangle-text', 'pendant-text', 'rectangle-text-2x']
+
+
+def _number(value):
+    """Parameter value as written to the metadata (float, 3 decimals)"""
+    return None if value is None else float(round(value, 3))
+
+
+def model_params(generator):
+    """Parameters that determine a model besides its QR matrix (normalized like the metadata)"""
+    text = generator.text_content if generator.mode in TEXT_MODES else ''
+    text_top = generator.text_content_top if generator.mode == 'rectangle-text-2x' else ''
+    rotation = 180 if generator.mode == 'rectangle-text-2x' else generator.text_rotation
+    return {
+        'mode': generator.mode,
+        'card_height': _number(generator.card_height),
+        'qr_margin': _number(generator.qr_margin),
+        'qr_relief': _number(generator.qr_relief),
+        'corner_radius': _number(generator.corner_radius),
+        'size_scale': _number(generator.size_scale),
+        'text': text or '',
+        'text_top': text_top or '',
+        'text_rotation': rotation if (text or text_top) else 0,
+    }
+
+
+def metadata_params(metadata):
+    """model_params() of an existing model, read from its metadata JSON"""
+    parameters = metadata.get('parameters', {})
+    text = metadata.get('text') or {}
+    return {
+        'mode': metadata['mode'],
+        'card_height': _number(metadata['dimensions'].get('card_height_mm')),
+        'qr_margin': _number(parameters.get('qr_margin_mm')),
+        'qr_relief': _number(parameters.get('qr_relief_mm')),
+        'corner_radius': _number(parameters.get('corner_radius_mm')),
+        'size_scale': _number(parameters.get('size_scale')),
+        'text': text.get('content', text.get('content_bottom', '')),
+        'text_top': text.get('content_top', ''),
+        'text_rotation': text.get('rotation_deg', 0) if text else 0,
+    }
+
+
+def params_hash(params):
+    """SHA-256 of canonical parameters"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class Catalog:
+    """Catalog database of one output directory"""
+
+    def __init__(self, output_dir, path=None):
+        self.output_dir = Path(output_dir)
+        self.path = Path(path) if path else self.output_dir / CATALOG_NAME
+
+    def connect(self):
+        """Open the database (autocommit mode - transactions are explicit)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _scan_counter(self, name):
+        """Next counter after directories created before the catalog existed (one scan per name)"""
+        pattern = re.compile(rf'^{re.escape(name)}(?: \((\d+)\))?$')
+        highest = -1
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                match = pattern.match(entry.name)
+                if match and entry.is_dir():
+                    highest = max(highest, int(match.group(1) or 0))
+        return highest + 1
+
+    @staticmethod
+    def _claim(model_dir):
+        """
+        Create model_dir; True if it did not exist yet.
+
+        Existing directories are never taken over, not even empty ones: another
+        worker may have just allocated it and not written its files yet.
+        """
+        try:
+            model_dir.mkdir(exist_ok=False)
+            return True
+        except FileExistsError:
+            return False
+
+    def allocate_dir(self, name):
+        """
+        Create and return a new, empty directory "name" or "name (N)".
+
+        The plain name is tried first (it is free again after its directory was
+        deleted), then the next counter.
+        """
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT next_counter FROM names WHERE name = ?", (name,)).fetchone()
+            counter = row[0] if row else self._scan_counter(name)
+            if counter > 0 and self._claim(self.output_dir / name):
+                conn.execute("COMMIT")
+                return self.output_dir / name
+            while True:
+                model_dir = self.output_dir / (name if counter == 0 else f"{name} ({counter})")
+                counter += 1
+                if self._claim(model_dir):
+                    break
+            conn.execute("INSERT OR REPLACE INTO names (name, next_counter) VALUES (?, ?)", (name, counter))
+            conn.execute("COMMIT")
+            return model_dir
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _relative(self, path):
+        return Path(os.path.relpath(path, self.output_dir)).as_posix()
+
+    def _model_row(self, model_dir, qr_input, params, matrix_hash, engine, render_seconds, created):
+        model_dir = Path(model_dir)
+        paths = [model_dir / f"{model_dir.name}{suffix}" for suffix in ('.scad', '.stl', '.json')]
+        stl_bytes = paths[1].stat().st_size if paths[1].exists() else None
+        return (self._relative(model_dir), qr_input, params['mode'], params_hash(params),
+                json.dumps(params, sort_keys=True), matrix_hash, engine,
+                *(self._relative(path) for path in paths), stl_bytes, render_seconds,
+                created or time.time())
+
+    def record_model(self, model_dir, qr_input, params, matrix_hash=None, engine=None,
+                     render_seconds=None, created=None):
+        """
+        Add (or replace) a model directory in the catalog.
+
+        Args:
+            model_dir: Model directory (contains <name>.scad/.stl/.json)
+            qr_input: URL or image file name the model was made from
+            params: model_params() / metadata_params()
+            matrix_hash: Hash of the QR matrix (None if unknown)
+            engine: Render engine ('openscad' or 'native')
+            render_seconds: STL export time
+            created: Creation time (default: now)
+        """
+        conn = self.connect()
+        try:
+            conn.execute(INSERT_MODEL, self._model_row(model_dir, qr_input, params, matrix_hash, engine,
+                                                       render_seconds, created))
+        finally:
+            conn.close()
+
+    def find_model(self, params, matrix_hash=None, qr_input=None):
+        """
+        Most recent model with these parameters and the same QR matrix (or, for entries
+        without a known matrix, the same URL input).
+
+        Entries whose STL no longer exists are dropped.
+
+        Returns:
+            Dict with the catalog columns (paths absolute), or None
+        """
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                "SELECT * FROM models WHERE params_hash = ? AND (matrix_hash = ? OR (matrix_hash IS NULL AND input = ?)) "
+                "ORDER BY created DESC", (params_hash(params), matrix_hash, qr_input)).fetchall()
+            for row in rows:
+                entry = dict(row)
+                for key in ('dir', 'scad_path', 'stl_path', 'json_path'):
+                    entry[key] = self.output_dir / entry[key]
+                if entry['stl_path'].exists():
+                    return entry
+                conn.execute("DELETE FROM models WHERE dir = ?", (row['dir'],))
+            return None
+        finally:
+            conn.close()
+
+    def import_metadata(self):
+        """
+        Add all model directories below the output directory from their metadata JSON.
+
+        Matrix hashes are computed from the QR images next to the metadata.
+
+        Returns:
+            Number of models added
+        """
+        from .generator import QRModelGenerator
+        from .matrix import matrix_hash
+
+        rows = []
+        for root, dirs, files in os.walk(self.output_dir):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]  # Skip the model store
+            model_dir = Path(root)
+            if f"{model_dir.name}.json" not in files:
+                continue
+            try:
+                with open(model_dir / f"{model_dir.name}.json", encoding='utf-8') as f:
+                    metadata = json.load(f)
+                params = metadata_params(metadata)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                continue  # Not a model metadata file
+
+            # Hash of the matrix actually printed (recorded since metadata has qr_matrix)
+            qr_hash = (metadata.get('qr_matrix') or {}).get('sha256')
+            if qr_hash is None and f"{model_dir.name}.png" in files:
+                try:
+                    matrix, _, _ = QRModelGenerator(model_dir / f"{model_dir.name}.png").load_and_process_image()
+                    qr_hash = matrix_hash(matrix)
+                except Exception:
+                    pass  # Unreadable image - the model is still found by URL
+
+            generated_at = metadata.get('generated_at')
+            try:
+                created = time.mktime(time.strptime(generated_at[:19], '%Y-%m-%dT%H:%M:%S'))
+            except (TypeError, ValueError):
+                created = os.path.getmtime(model_dir / f"{model_dir.name}.json")
+            rows.append(self._model_row(model_dir, metadata.get('qr_input', ''), params, qr_hash,
+                                        (metadata.get('render') or {}).get('engine'), None, created))
+
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(INSERT_MODEL, rows)
+        finally:
+            conn.close()
+        return len(rows)
@@ -0,0 +1,382 @@
+"""
+Glyph outlines and text meshes for the native render path
+
+Reads TrueType outlines (glyf table) from a local TTF file, triangulates them
+and extrudes them to match OpenSCAD's
+`linear_extrude() text(..., font="Liberation Mono:style=Bold", halign="center", valign="bottom", spacing=0.85)`.
+Glyph meshes are cached, so a label is assembled by instancing cached glyphs.
+"""
+
+import os
+import struct
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from .mesh import Mesh, clean_ring, extrude_polygon, point_in_polygon, signed_area, triangulate_polygon
+
+# Same font the SCAD code asks for, then metric-compatible fallbacks
+FONT_CANDIDATES = [
+    'LiberationMono-Bold.ttf',
+    'DejaVuSansMono-Bold.ttf',
+    'courbd.ttf',  # Windows: Courier New Bold
+    'Courier New Bold.ttf',
+]
+
+FONT_DIRS = [
+    '/usr/share/fonts/truetype/liberation',
+    '/usr/share/fonts/truetype/liberation2',
+    '/usr/share/fonts/liberation-mono',
+    '/usr/share/fonts/liberation',
+    '/usr/share/fonts/TTF',
+    '/usr/share/fonts/truetype/dejavu',
+    '/usr/share/fonts/dejavu',
+    '/usr/local/share/fonts',
+    '/Library/Fonts',
+    '/System/Library/Fonts/Supplemental',
+    str(Path.home() / 'Library' / 'Fonts'),
+    str(Path.home() / '.local' / 'share' / 'fonts'),
+    str(Path.home() / '.fonts'),
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+]
+
+# Character spacing used by the SCAD text() calls
+TEXT_SPACING = 0.85
+
+# OpenSCAD's text(size=s) is rendered at s / 0.72 em (FreeType at 100 dpi per 72 pt),
+# which gives capitals an ascent of about s
+SIZE_TO_EM = 1 / 0.72
+
+# Font the SCAD code asks for (the other candidates only approximate its outlines)
+SCAD_FONT_FILE = FONT_CANDIDATES[0]
+
+
+def find_font_file():
+    """Find a monospace bold TTF, checking bundled fonts, then system font directories"""
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    search_dirs = [os.path.join(base_path, 'fonts')] + FONT_DIRS
+    for name in FONT_CANDIDATES:
+        for directory in search_dirs:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+class TrueTypeFont:
+    """Minimal TrueType reader: cmap, horizontal metrics and glyf outlines"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self.data = f.read()
+
+        num_tables = struct.unpack_from('>H', self.data, 4)[0]
+        self.tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack_from('>4sIII', self.data, 12 + 16 * i)
+            self.tables[tag.decode('latin-1')] = (offset, length)
+
+        for required in ('head', 'hhea', 'hmtx', 'maxp', 'cmap', 'loca', 'glyf'):
+            if required not in self.tables:
+                raise ValueError(f"Unsupported font (no '{required}' table): {self.path}")
+
+        head = self.tables['head'][0]
+        self.units_per_em = struct.unpack_from('>H', self.data, head + 18)[0]
+        self.index_to_loc_format = struct.unpack_from('>h', self.data, head + 50)[0]
+
+        hhea = self.tables['hhea'][0]
+        self.ascender, self.descender = struct.unpack_from('>hh', self.data, hhea + 4)
+        self.num_h_metrics = struct.unpack_from('>H', self.data, hhea + 34)[0]
+        self.num_glyphs = struct.unpack_from('>H', self.data, self.tables['maxp'][0] + 4)[0]
+
+        self._cmap = self._read_cmap()
+
+    def _read_cmap(self):
+        base = self.tables['cmap'][0]
+        count = struct.unpack_from('>H', self.data, base + 2)[0]
+        subtables = {}
+        for i in range(count):
+            platform, encoding, offset = struct.unpack_from('>HHI', self.data, base + 4 + 8 * i)
+            subtables[(platform, encoding)] = base + offset
+
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3), (0, 1), (0, 0)):
+            if key in subtables:
+                offset = subtables[key]
+                fmt = struct.unpack_from('>H', self.data, offset)[0]
+                if fmt == 4:
+                    return self._read_cmap_format4(offset)
+                if fmt == 12:
+                    return self._read_cmap_format12(offset)
+        raise ValueError(f"Unsupported font (no Unicode cmap): {self.path}")
+
+    def _read_cmap_format4(self, offset):
+        seg_count = struct.unpack_from('>H', self.data, offset + 6)[0] // 2
+        ends = struct.unpack_from(f'>{seg_count}H', self.data, offset + 14)
+        starts = struct.unpack_from(f'>{seg_count}H', self.data, offset + 16 + 2 * seg_count)
+        deltas = struct.unpack_from(f'>{seg_count}h', self.data, offset + 16 + 4 * seg_count)
+        range_offset_pos = offset + 16 + 6 * seg_count
+        range_offsets = struct.unpack_from(f'>{seg_count}H', self.data, range_offset_pos)
+
+        cmap = {}
+        for i in range(seg_count):
+            for code in range(starts[i], ends[i] + 1):
+                if code == 0xFFFF:
+                    continue
+                if range_offsets[i] == 0:
+                    glyph = (code + deltas[i]) & 0xFFFF
+                else:
+                    pos = range_offset_pos + 2 * i + range_offsets[i] + 2 * (code - starts[i])
+                    glyph = struct.unpack_from('>H', self.data, pos)[0]
+                    if glyph:
+                        glyph = (glyph + deltas[i]) & 0xFFFF
+                if glyph:
+                    cmap[code] = glyph
+        return cmap
+
+    def _read_cmap_format12(self, offset):
+        groups = struct.unpack_from('>I', self.data, offset + 12)[0]
+        cmap = {}
+        for i in range(groups):
+            start, end, glyph = struct.unpack_from('>III', self.data, offset + 16 + 12 * i)
+            for code in range(start, end + 1):
+                cmap[code] = glyph + code - start
+        return cmap
+
+    def glyph_index(self, char):
+        """Glyph index for a character (0 = .notdef)"""
+        return self._cmap.get(ord(char), 0)
+
+    def advance_width(self, glyph):
+        """Horizontal advance in font units"""
+        hmtx = self.tables['hmtx'][0]
+        index = min(glyph, self.num_h_metrics - 1)
+        return struct.unpack_from('>H', self.data, hmtx + 4 * index)[0]
+
+    def _glyph_range(self, glyph):
+        loca = self.tables['loca'][0]
+        if self.index_to_loc_format == 0:
+            start, end = struct.unpack_from('>HH', self.data, loca + 2 * glyph)
+            start, end = start * 2, end * 2
+        else:
+            start, end = struct.unpack_from('>II', self.data, loca + 4 * glyph)
+        return self.tables['glyf'][0] + start, end - start
+
+    def glyph_contours(self, glyph, depth=0):
+        """
+        Raw outline of a glyph.
+
+        Returns:
+            List of contours, each a list of (x, y, on_curve) in font units
+        """
+        offset, length = self._glyph_range(glyph)
+        if length == 0 or depth > 8:
+            return []
+
+        num_contours = struct.unpack_from('>h', self.data, offset)[0]
+        if num_contours < 0:
+            return self._composite_contours(offset + 10, depth)
+
+        end_points = struct.unpack_from(f'>{num_contours}H', self.data, offset + 10)
+        num_points = end_points[-1] + 1 if num_contours else 0
+        pos = offset + 10 + 2 * num_contours
+        instruction_length = struct.unpack_from('>H', self.data, pos)[0]
+        pos += 2 + instruction_length
+
+        flags = []
+        while len(flags) < num_points:
+            flag = self.data[pos]
+            pos += 1
+            flags.append(flag)
+            if flag & 0x08:  # REPEAT_FLAG
+                repeat = self.data[pos]
+                pos += 1
+                flags.extend([flag] * repeat)
+
+        def read_coords(short_bit, same_bit):
+            nonlocal pos
+            values = []
+            value = 0
+            for flag in flags[:num_points]:
+                if flag & short_bit:
+                    delta = self.data[pos]
+                    pos += 1
+                    value += delta if flag & same_bit else -delta
+                elif not flag & same_bit:
+                    value += struct.unpack_from('>h', self.data, pos)[0]
+                    pos += 2
+                values.append(value)
+            return values
+
+        xs = read_coords(0x02, 0x10)
+        ys = read_coords(0x04, 0x20)
+
+        contours = []
+        start = 0
+        for end in end_points:
+            contours.append([(xs[i], ys[i], bool(flags[i] & 0x01)) for i in range(start, end + 1)])
+            start = end + 1
+        return contours
+
+    def _composite_contours(self, pos, depth):
+        contours = []
+        while True:
+            flags, glyph = struct.unpack_from('>HH', self.data, pos)
+            pos += 4
+            if flags & 0x0001:  # ARG_1_AND_2_ARE_WORDS
+                arg1, arg2 = struct.unpack_from('>hh', self.data, pos)
+                pos += 4
+            else:
+                arg1, arg2 = struct.unpack_from('>bb', self.data, pos)
+                pos += 2
+
+            a, b, c, d = 1.0, 0.0, 0.0, 1.0
+            if flags & 0x0008:  # WE_HAVE_A_SCALE
+                a = d = struct.unpack_from('>h', self.data, pos)[0] / 16384
+                pos += 2
+            elif flags & 0x0040:  # WE_HAVE_AN_X_AND_Y_SCALE
+                a, d = (v / 16384 for v in struct.unpack_from('>hh', self.data, pos))
+                pos += 4
+            elif flags & 0x0080:  # WE_HAVE_A_TWO_BY_TWO
+                a, b, c, d = (v / 16384 for v in struct.unpack_from('>hhhh', self.data, pos))
+                pos += 8
+
+            # Point-matching anchors (ARGS_ARE_XY_VALUES unset) are rare - treat as no offset
+            dx, dy = (arg1, arg2) if flags & 0x0002 else (0, 0)
+            for contour in self.glyph_contours(glyph, depth + 1):
+                contours.append([(a * x + c * y + dx, b * x + d * y + dy, on) for x, y, on in contour])
+
+            if not flags & 0x0020:  # MORE_COMPONENTS
+                break
+        return contours
+
+
+def _flatten_contour(contour, steps):
+    """Convert a quadratic TrueType contour to a polyline"""
+    n = len(contour)
+    if n == 0:
+        return []
+
+    # Start on an on-curve point (or an implied midpoint if there is none)
+    start = next((i for i, p in enumerate(contour) if p[2]), None)
+    if start is None:
+        (x0, y0, _), (x1, y1, _) = contour[0], contour[1 % n]
+        points = [((x0 + x1) / 2, (y0 + y1) / 2, True)] + contour[1:] + contour[:1]
+    else:
+        points = contour[start:] + contour[:start]
+
+    polyline = [(points[0][0], points[0][1])]
+    current = polyline[0]
+    control = None
+    for x, y, on in points[1:] + points[:1]:
+        if on:
+            if control is None:
+                polyline.append((x, y))
+            else:
+                polyline.extend(_quadratic(current, control, (x, y), steps))
+                control = None
+            current = (x, y)
+        else:
+            if control is not None:
+                mid = ((control[0] + x) / 2, (control[1] + y) / 2)
+                polyline.extend(_quadratic(current, control, mid, steps))
+                current = mid
+            control = (x, y)
+    return polyline
+
+
+def _quadratic(p0, p1, p2, steps):
+    points = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        u = 1 - t
+        points.append((u * u * p0[0] + 2 * u * t * p1[0] + t * t * p2[0],
+                       u * u * p0[1] + 2 * u * t * p1[1] + t * t * p2[1]))
+    return points
+
+
+def glyph_polygons(font, char, size, steps=4):
+    """
+    Glyph outline as polygons in mm.
+
+    Returns:
+        List of (outer, holes) with outer rings counter-clockwise and holes clockwise
+    """
+    scale = size * SIZE_TO_EM / font.units_per_em
+    rings = []
+    for contour in font.glyph_contours(font.glyph_index(char)):
+        ring = clean_ring([(x * scale, y * scale) for x, y in _flatten_contour(contour, steps)])
+        if len(ring) >= 3 and abs(signed_area(ring)) > 1e-9:
+            rings.append(ring)
+
+    # TrueType: filled contours are clockwise, counters are counter-clockwise
+    outers = [r for r in rings if signed_area(r) < 0]
+    counters = [r for r in rings if signed_area(r) > 0]
+
+    shapes = [[list(reversed(r)), []] for r in outers]
+    for counter in counters:
+        containing = [s for s in shapes if point_in_polygon(counter[0], s[0])]
+        if containing:
+            smallest = min(containing, key=lambda s: abs(signed_area(s[0])))
+            smallest[1].append(list(reversed(counter)))
+        else:
+            # Counter without a parent - font uses the opposite winding, keep it as a solid
+            shapes.append([counter, []])
+    return [(outer, holes) for outer, holes in shapes]
+
+
+@lru_cache(maxsize=8)
+def load_font(font_path):
+    """Parsed font, cached per path"""
+    return TrueTypeFont(font_path)
+
+
+@lru_cache(maxsize=512)
+def glyph_mesh(font_path, char, size, height):
+    """
+    Extruded mesh of a single glyph, cached by (font, glyph, size, height).
+
+    The returned mesh is shared - callers must use translated()/rotated_z() copies.
+    """
+    mesh = Mesh()
+    for outer, holes in glyph_polygons(load_font(font_path), char, size):
+        mesh.extend(extrude_polygon(outer, holes, height=height))
+    return mesh
+
+
+def text_mesh(text, size, height, font_path=None, spacing=TEXT_SPACING):
+    """
+    Extruded text label, laid out like OpenSCAD's text(halign="center", valign="bottom").
+
+    Args:
+        text: Label text
+        size: Font size in mm as passed to OpenSCAD's text() (see SIZE_TO_EM)
+        height: Extrusion height in mm
+        font_path: TTF file (default: find_font_file())
+        spacing: Advance multiplier (OpenSCAD `spacing`)
+
+    Returns:
+        Mesh with the text centered on X=0 and its lowest point on Y=0
+    """
+    font_path = font_path or find_font_file()
+    if font_path is None:
+        raise FileNotFoundError("No TrueType font found for text labels (install Liberation Mono)")
+
+    font = load_font(font_path)
+    scale = size * SIZE_TO_EM / font.units_per_em
+
+    mesh = Mesh()
+    pen_x = 0.0
+    for char in text:
+        glyph = glyph_mesh(font_path, char, size, height)
+        if glyph.faces:
+            mesh.extend(glyph.translated(pen_x, 0.0, 0.0))
+        pen_x += font.advance_width(font.glyph_index(char)) * scale * spacing
+
+    bounds = mesh.bounds()
+    min_y = bounds[0][1] if bounds else 0.0
+    return mesh.translated(-pen_x / 2, -min_y, 0.0)
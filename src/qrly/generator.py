@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 QR Code 3D Model Generator
-Converts QR code images (PNG/JPG) or URLs to 3D-printable OpenSCAD models
+Converts QR code images (PNG/JPG/SVG) or URLs to 3D-printable OpenSCAD models
 """
 
 import argparse
@@ -15,12 +15,28 @@ from PIL import Image
 import subprocess
 import qrcode
 import tempfile
+import time
 
 from . import __version__
+from .ingest import THRESHOLDS, binarize, is_path, open_image, sample_grayscale, sampling_rate
+from .matrix import decode_matrix, encode_matrix, matrix_hash
+from .vector import is_vector, load_svg_matrix
 
 # Default output directory in user's home folder
 DEFAULT_OUTPUT_DIR = Path.home() / "qr-codes"
 
+# Curve segments for round shapes ($fn in the SCAD code, also used by the native engine)
+CURVE_SEGMENTS = 8
+
+# Available render engines: OpenSCAD (exact CSG) or native Python mesh builder
+ENGINES = ['openscad', 'native']
+
+# Input name of in-memory images (files are named by output_name, see QRModelGenerator)
+MEMORY_INPUT_NAME = 'qr-code.png'
+
+# Separate bodies for two-colour printing (split_bodies): body → mesh parts (see build_meshes)
+BODIES = {'base': ('base',), 'relief': ('relief', 'text')}
+
 
 def find_openscad_binary():
     """Find OpenSCAD binary, checking bundled, system, then PATH"""
@@ -61,10 +77,43 @@ class QRModelGenerator:
     """Generate 3D models from QR code images"""
 
     def __init__(self, image_path, mode='square', output_dir='.', output_name=None):
-        self.image_path = Path(image_path)
+        """
+        Args:
+            image_path: QR code image file, or an in-memory image (see ingest.open_image:
+                        bytes, file-like object, PIL Image, array) - then output_name names the files
+        """
+        if is_path(image_path):
+            self.image_path = Path(image_path)
+            self.image_data = None
+        else:
+            self.image_path = None
+            # File objects are read once (the image may be loaded several times)
+            self.image_data = image_path.read() if hasattr(image_path, 'read') else image_path
         self.mode = mode
         self.output_dir = Path(output_dir)
         self.output_name = output_name  # Optional: override name derived from image_path
+        self.engine = 'openscad'  # 'openscad' or 'native' (see ENGINES)
+        self.move_input = True  # Move input image into the model directory (copy if False)
+        self.split_bodies = False  # Also write base and relief/text as separate STLs (see BODIES) for two-colour printing
+        self.three_mf = False  # Also write NAME.3mf (indexed, compressed mesh with embedded metadata, see threemf)
+        self.openscad_flags = None  # OpenSCAD flags used by the last export_stl() run
+        self.compact_output = True  # Rewrite OpenSCAD's STL as welded, merged binary STL (see stl_compact)
+        self.compaction = None  # Triangle counts and sizes of the last compact_openscad_stl(), recorded in the metadata
+        self.compacted_mesh = None  # Mesh of the last compacted OpenSCAD STL (reused for the 3MF)
+        self.render_strategy = None  # 'scad', 'scad-merged' or 'native' after export_governed_stl()
+        self.exported_with = None  # Engine that wrote the STL ('openscad' or 'native'), if written synchronously
+        self.deterministic = False  # Byte-identical output for identical requests (no timestamps, sorted JSON)
+        self.store = None  # Optional ModelStore (content-addressed output, implies deterministic)
+        self.reuse = False  # Return an identical model from the output directory's catalog instead of generating
+        self.reused = False  # Last generate() returned an existing model (catalog or store) without rendering
+        self.export_seconds = None  # Duration of the last STL export
+        self.preset_matrix = None  # Module matrix used instead of reading image_path (e.g. from metadata JSON)
+        self.qr_encoding = None  # QR encoding chosen for a URL input (see qr_encode), recorded in the metadata
+        self.threshold = 'auto'  # Binarization: 'auto', 'otsu', 'adaptive' or a fixed 0-255 value (see ingest.binarize)
+        self.threshold_used = None  # Threshold applied by the last load_and_process_image()
+        self.check_input = True  # Reject matrices without valid finder/timing patterns before rendering
+        self.input_check = None  # Result of the last check (see qr_check.check_matrix), recorded in the metadata
+        self.scan_check = None  # Decode check of the model's top view (see scan_check), recorded in the metadata
 
         # Design parameters
         self.card_width = 55    # mm - credit card width
@@ -87,6 +136,75 @@ class QRModelGenerator:
         self.text_margin = 2         # Distance between QR code and text in mm (base value, will be scaled)
         self.text_rotation = 0       # Rotation in Z-axis (0 or 180 degrees)
 
+    @property
+    def input_name(self):
+        """File name of the input for messages and metadata"""
+        return self.image_path.name if self.image_path is not None else MEMORY_INPUT_NAME
+
+    @classmethod
+    def from_metadata(cls, json_path, output_dir='.', output_name=None):
+        """
+        Generator that rebuilds a model from its metadata JSON.
+
+        The embedded QR matrix is used directly (no image I/O or sampling); metadata
+        from versions without it falls back to the QR image next to the JSON file.
+
+        Returns:
+            (generator, qr_input)
+        """
+        json_path = Path(json_path)
+        with open(json_path, encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        image_path = json_path.with_suffix('.png')
+        preset_matrix = None
+        if 'qr_matrix' in metadata:
+            preset_matrix = decode_matrix(metadata['qr_matrix'])
+        elif not image_path.exists():
+            raise ValueError(f"{json_path.name} has no embedded QR matrix and no QR image next to it")
+
+        dimensions = metadata['dimensions']
+        params = metadata.get('parameters', {})
+        if output_name is None:
+            # "acme-medium-thin (1).json" → "acme" (size and thickness are appended again)
+            output_name = re.sub(r' \(\d+\)$', '', json_path.stem)
+            suffix = cls.get_output_name('', dimensions['card_height_mm'], params.get('size_scale', 1.0))
+            if output_name.endswith(suffix) and len(output_name) > len(suffix):
+                output_name = output_name[:-len(suffix)]
+
+        generator = cls(image_path, metadata['mode'], output_dir, output_name=output_name)
+        generator.preset_matrix = preset_matrix
+        generator.move_input = False  # Never move archived files
+        generator.card_height = dimensions['card_height_mm']
+        generator.qr_margin = params.get('qr_margin_mm', generator.qr_margin)
+        generator.qr_relief = params.get('qr_relief_mm', generator.qr_relief)
+        generator.corner_radius = params.get('corner_radius_mm', generator.corner_radius)
+        generator.size_scale = params.get('size_scale', generator.size_scale)
+
+        text = metadata.get('text') or {}
+        generator.text_content = text.get('content', text.get('content_bottom', ''))
+        generator.text_content_top = text.get('content_top', '')
+        generator.text_rotation = text.get('rotation_deg', 0)
+        generator.text_height = text.get('height_mm', generator.qr_relief)
+        return generator, metadata.get('qr_input')
+
+    def apply_params(self, params):
+        """Apply GUI parameter dict (height, margin, relief, corner_radius, size_scale)"""
+        self.card_height = params['height']
+        self.qr_margin = params['margin']
+        self.qr_relief = params['relief']
+        self.corner_radius = params['corner_radius']
+        self.size_scale = params['size_scale']
+        # Sync text relief with QR relief (always same height)
+        self.text_height = params['relief']
+
+    def auto_adjust_relief(self):
+        """Raise QR relief to 0.7mm for thin models; returns True if adjusted"""
+        if self.card_height <= 0.6:
+            self.qr_relief = 0.7
+            return True
+        return False
+
     @staticmethod
     def is_url(text):
         """Check if the input is a URL"""
@@ -107,8 +225,21 @@ class QRModelGenerator:
 
     @staticmethod
     def get_unique_output_dir(output_base_dir, base_name, card_height=1.25, size_scale=1.0):
-        """Get a unique output directory, adding counter if needed"""
+        """
+        Create a unique output directory, adding counter if needed.
+
+        Names are allocated through the output directory's SQLite catalog (O(1),
+        safe across processes); without a usable catalog, existing names are probed.
+        """
+        import sqlite3
+        from .catalog import Catalog
+
         final_name = QRModelGenerator.get_output_name(base_name, card_height, size_scale)
+        try:
+            return Catalog(output_base_dir).allocate_dir(final_name)
+        except sqlite3.Error as e:
+            print(f"⚠ Output catalog not available ({e}), probing directory names")
+
         model_dir = Path(output_base_dir) / final_name
 
         counter = 1
@@ -119,17 +250,31 @@ class QRModelGenerator:
         return model_dir
 
     @staticmethod
-    def generate_qr_image(data, output_path=None):
-        """Generate QR code image from text/URL"""
+    def generate_qr_image(data, output_path=None, ecc='H', version=None):
+        """
+        Generate QR code image from text/URL.
+
+        Args:
+            ecc: Error correction level 'L', 'M', 'Q' or 'H' (see qr_encode.encoding_for to choose one)
+            version: QR version (None = smallest that fits)
+        """
+        from .qr_encode import ECC_LEVELS
+
         qr = qrcode.QRCode(
-            version=None,  # Auto-size
-            error_correction=qrcode.constants.ERROR_CORRECT_H,  # High error correction
+            version=version,
+            error_correction=ECC_LEVELS[ecc],
             box_size=10,
             border=1,  # Minimal border (QR spec recommends 4, but we have physical margins)
         )
         qr.add_data(data)
         qr.make(fit=True)
 
+        # Codes with more than ~50 modules: smaller boxes, so sampling (one pixel every
+        # sampling_rate) never steps over a module
+        modules = qr.modules_count + 2 * qr.border
+        while qr.box_size > 1 and sampling_rate(modules * qr.box_size, modules * qr.box_size) > qr.box_size:
+            qr.box_size -= 1
+
         img = qr.make_image(fill_color="black", back_color="white")
 
         if output_path:
@@ -141,41 +286,42 @@ class QRModelGenerator:
             img.save(temp_file.name)
             return temp_file.name
 
+    @staticmethod
+    def save_matrix_image(matrix, output_path, box_size=10):
+        """Save a module matrix as black-on-white PNG (box_size pixels per module)"""
+        height = len(matrix)
+        width = len(matrix[0]) if height else 0
+        img = Image.new('L', (width, height), 255)
+        img.putdata([0 if cell else 255 for row in matrix for cell in row])
+        img.resize((width * box_size, height * box_size), Image.NEAREST).save(output_path)
+
     def load_and_process_image(self):
         """Load image and convert to binary matrix with sampling for performance"""
-        if not self.image_path.exists():
-            raise FileNotFoundError(f"Image file not found: {self.image_path}")
-
-        # Load image
-        img = Image.open(self.image_path)
-
-        # Convert to grayscale
-        img = img.convert('L')
+        if self.preset_matrix is not None:
+            matrix = self.preset_matrix
+            return matrix, len(matrix[0]) if matrix else 0, len(matrix)
 
-        # Get original dimensions
-        width, height = img.size
+        source = self.image_path if self.image_path is not None else self.image_data
+        if self.image_path is not None and not self.image_path.exists():
+            raise FileNotFoundError(f"Image file not found: {self.image_path}")
 
-        # Calculate sampling rate to reduce complexity (like card-generator)
-        # Target grid: 50x50 (~800-1200 cubes instead of ~10000)
-        # QR codes with Error Correction Level H can tolerate 30% data loss
-        target_grid = 50
-        sample_rate = max(width, height) // target_grid
+        if is_vector(source):
+            # Exact module matrix from the SVG shapes (no raster step)
+            matrix = load_svg_matrix(source)
+            return matrix, len(matrix[0]), len(matrix)
 
-        # Ensure sample_rate is at least 1
-        if sample_rate < 1:
-            sample_rate = 1
+        # Load image (decoded lazily - see ingest.py)
+        with open_image(source) as img:
+            # Calculate sampling rate to reduce complexity (like card-generator)
+            # Target grid: 50x50 (~800-1200 cubes instead of ~10000)
+            # QR codes with Error Correction Level H can tolerate 30% data loss
+            sample_rate = sampling_rate(*img.size)
 
-        # Convert to binary (threshold at 128)
-        threshold = 128
+            # Grayscale value of every sampled pixel (JPEGs are decoded at reduced size)
+            sampled = sample_grayscale(img, sample_rate, draft=not isinstance(source, Image.Image))
 
-        # Sample pixels to create optimized matrix
-        matrix = []
-        for y in range(0, height, sample_rate):
-            row = []
-            for x in range(0, width, sample_rate):
-                pixel = img.getpixel((x, y))
-                row.append(pixel < threshold)  # Black pixels become True
-            matrix.append(row)
+        # Convert to binary (threshold from the image, see ingest.binarize)
+        matrix, self.threshold_used = binarize(sampled, self.threshold)
 
         # Return sampled dimensions
         sampled_width = len(matrix[0]) if matrix else 0
@@ -183,6 +329,51 @@ class QRModelGenerator:
 
         return matrix, sampled_width, sampled_height
 
+    def verify_input(self, matrix):
+        """
+        Check finder and timing patterns of the matrix (see qr_check) before any rendering.
+
+        Matrices from metadata (preset_matrix) were checked when first generated.
+
+        Raises:
+            ValueError: If the check fails (and check_input is set)
+        """
+        from .qr_check import check_matrix
+
+        if not self.check_input or self.preset_matrix is not None:
+            return
+        self.input_check = check_matrix(matrix)
+        if self.threshold_used:
+            self.input_check['threshold'] = self.threshold_used
+        if not self.input_check['ok']:
+            raise ValueError("QR code check failed: " + "; ".join(self.input_check['problems']) +
+                             " - check the image (straight, sharp, evenly lit) or skip with --no-check")
+        print(f"  QR code check passed ({self.input_check['modules']} modules, "
+              f"{self.input_check['cells_per_module']} cells per module)")
+
+    def verify_geometry(self, matrix, dimensions):
+        """
+        Decode the top view of the model (see scan_check) before any rendering.
+
+        Raises:
+            ValueError: If the model would not scan (and check_input is set)
+        """
+        from .preview import generator_texts
+        from .scan_check import check_geometry
+
+        if not self.check_input:
+            return
+        hole = self.hole_geometry(dimensions)
+        expected = self.qr_encoding['data'] if self.qr_encoding else None
+        self.scan_check = check_geometry(self._mask_hole(matrix, dimensions, hole), dimensions, self.corner_radius,
+                                         hole, generator_texts(self, dimensions), expected)
+        if not self.scan_check['ok']:
+            raise ValueError("Scan check failed: " + "; ".join(self.scan_check['problems']) +
+                             " - the printed code would not scan (skip with --no-check)")
+        print(f"  Scan check passed (version {self.scan_check['version']}-{self.scan_check['ecc']}, "
+              f"{self.scan_check['corrected_codewords']} codewords corrected, "
+              f"quiet zone {self.scan_check['quiet_zone_modules']} modules)")
+
     def calculate_text_size(self, text, available_width):
         """
         Calculate optimal text size based on text length and available width.
@@ -352,8 +543,8 @@ class QRModelGenerator:
             'text_offset_x_top': card_width_final / 2  # Center top text (scaled)
         }
 
-    def generate_openscad(self, matrix, dimensions):
-        """Generate OpenSCAD code"""
+    def generate_openscad(self, matrix, dimensions, merge_runs=False):
+        """Generate OpenSCAD code (merge_runs: one cube per horizontal run of modules, far fewer primitives)"""
         rows = len(matrix)
         cols = len(matrix[0]) if rows > 0 else 0
 
@@ -361,11 +552,14 @@ class QRModelGenerator:
         safe_text = self.text_content.replace('"', '\\"') if self.text_content else ""
         safe_text_top = self.text_content_top.replace('"', '\\"') if self.text_content_top else ""
 
+        # Input file names are often random (temp files) - deterministic mode names the matrix instead
+        source = f"matrix {matrix_hash(matrix)[:16]}" if self.deterministic else self.input_name
+
         scad_code = f"""// QR Code 3D Model
-// Generated from: {self.image_path.name}
+// Generated from: {source}
 // Mode: {self.mode}
 
-$fn = 8;  // Smoothness of curves (optimized for speed - 8 segments sufficient for 3D printing)
+$fn = {CURVE_SEGMENTS};  // Smoothness of curves (optimized for speed - 8 segments sufficient for 3D printing)
 
 // Parameters
 card_width = {dimensions['card_width']};
@@ -450,10 +644,9 @@ difference() {{
 """
 
         # Add hole for pendant modes
-        if self.mode in ['pendant', 'pendant-text']:
-            hole_x = dimensions['card_width'] / 2
-            hole_y = self.hole_from_top * self.size_scale  # Scale hole position
-            hole_d = self.hole_diameter * self.size_scale  # Scale hole diameter
+        hole = self.hole_geometry(dimensions)
+        if hole:
+            hole_x, hole_y, hole_d = hole
             scad_code += f"""
     // Hole for chain
     translate([{hole_x}, {hole_y}, -1])
@@ -469,22 +662,136 @@ module qr_pattern() {{
 
         # Generate cubes for each black pixel
         for row in range(rows):
-            for col in range(cols):
-                if matrix[row][col]:  # Black pixel = raised
-                    x = col * dimensions['pixel_size']
-                    y = (rows - 1 - row) * dimensions['pixel_size']  # Flip Y axis
+            col = 0
+            while col < cols:
+                if not matrix[row][col]:  # White pixel = flat
+                    col += 1
+                    continue
+                start = col
+                col += 1
+                if merge_runs:
+                    while col < cols and matrix[row][col]:
+                        col += 1
+                x = start * dimensions['pixel_size']
+                y = (rows - 1 - row) * dimensions['pixel_size']  # Flip Y axis
+                if col - start == 1:
                     scad_code += f"    translate([{x:.4f}, {y:.4f}, 0]) cube([pixel_size, pixel_size, qr_relief]);\n"
+                else:
+                    scad_code += f"    translate([{x:.4f}, {y:.4f}, 0]) cube([pixel_size * {col - start}, pixel_size, qr_relief]);\n"
 
         scad_code += "}\n"
 
         return scad_code
 
+    def hole_geometry(self, dimensions):
+        """Return (x, y, diameter) of the chain hole for pendant modes, else None"""
+        if self.mode not in ['pendant', 'pendant-text']:
+            return None
+        hole_x = dimensions['card_width'] / 2
+        hole_y = self.hole_from_top * self.size_scale  # Scale hole position
+        hole_d = self.hole_diameter * self.size_scale  # Scale hole diameter
+        return hole_x, hole_y, hole_d
+
+    def build_meshes(self, matrix, dimensions):
+        """
+        Build the model natively (same geometry as generate_openscad, no OpenSCAD needed)
+
+        Returns:
+            Dict of meshes: 'base' (card incl. hole), 'relief' (QR modules), 'text' (labels)
+        """
+        return {
+            'base': self.build_base_mesh(dimensions),
+            'relief': self.build_relief_mesh(matrix, dimensions),
+            'text': self.build_text_mesh(dimensions),
+        }
+
+    def build_base_mesh(self, dimensions):
+        """Base card with rounded corners (and chain hole for pendants) - cached per preset"""
+        from .plate_cache import get_default_cache
+
+        hole = self.hole_geometry(dimensions)
+        return get_default_cache().get(dimensions['card_width'], dimensions['card_length'], self.card_height,
+                                       self.corner_radius, CURVE_SEGMENTS, hole)
+
+    def build_relief_mesh(self, matrix, dimensions):
+        """QR code pattern (raised), minus modules the hole would cut through"""
+        from .mesh import relief_mesh
+
+        masked = self._mask_hole(matrix, dimensions, self.hole_geometry(dimensions))
+        relief = relief_mesh(masked, dimensions['pixel_size'], self.qr_relief)
+        return relief.translated(dimensions['qr_offset_x'], dimensions['qr_offset_y'], self.card_height)
+
+    def build_text_mesh(self, dimensions):
+        """Text labels (glyph meshes are cached per font/glyph/size)"""
+        from .mesh import Mesh
+        from .fonts import SCAD_FONT_FILE, text_mesh
+
+        text = Mesh()
+        font = self.native_font()
+        if font is not None and font != SCAD_FONT_FILE and (dimensions['has_text'] or dimensions['has_text_top']):
+            print(f"⚠ Liberation Mono Bold not found - native text uses {font} (outlines differ from OpenSCAD's)")
+        if dimensions['has_text']:
+            label = text_mesh(self.text_content, self.text_size, self.text_height)
+            text.extend(label.rotated_z(self.text_rotation).translated(
+                dimensions['text_offset_x'], dimensions['text_offset_y'], self.card_height))
+        if dimensions['has_text_top']:
+            label = text_mesh(self.text_content_top, self.text_size, self.text_height)
+            text.extend(label.rotated_z(180).translated(
+                dimensions['text_offset_x_top'], dimensions['text_offset_y_top'], self.card_height))
+        return text
+
+    def native_font(self):
+        """File name of the font used for native text, or None if none is installed"""
+        from .fonts import find_font_file
+
+        font_path = find_font_file()
+        return Path(font_path).name if font_path else None
+
+    def build_mesh(self, matrix, dimensions, meshes=None):
+        """Build the complete model as a single mesh (native engine); meshes: parts from build_meshes() to reuse"""
+        from .mesh import Mesh
+
+        meshes = meshes or self.build_meshes(matrix, dimensions)
+        mesh = Mesh()
+        for part in ('base', 'relief', 'text'):
+            mesh.extend(meshes[part])
+        return mesh
+
+    @staticmethod
+    def _mask_hole(matrix, dimensions, hole):
+        """Clear matrix cells that intersect the chain hole (like the SCAD difference())"""
+        if not hole:
+            return matrix
+        hole_x, hole_y, hole_d = hole
+        radius = hole_d / 2
+        pixel_size = dimensions['pixel_size']
+        rows = len(matrix)
+        masked = []
+        for row, cells in enumerate(matrix):
+            y0 = dimensions['qr_offset_y'] + (rows - 1 - row) * pixel_size
+            new_row = []
+            for col, cell in enumerate(cells):
+                if cell:
+                    x0 = dimensions['qr_offset_x'] + col * pixel_size
+                    dx = max(x0 - hole_x, 0, hole_x - (x0 + pixel_size))
+                    dy = max(y0 - hole_y, 0, hole_y - (y0 + pixel_size))
+                    cell = dx * dx + dy * dy >= radius * radius
+                new_row.append(cell)
+            masked.append(new_row)
+        return masked
+
     def save_scad_file(self, scad_code, output_path):
         """Save OpenSCAD code to file"""
         with open(output_path, 'w') as f:
             f.write(scad_code)
         print(f"✓ OpenSCAD file created: {output_path}")
 
+    def save_metadata(self, metadata, json_path):
+        """Write metadata JSON (canonical key order in deterministic mode)"""
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False, sort_keys=self.deterministic)
+            f.write('\n' if self.deterministic else '')
+
     def create_metadata_json(self, dimensions, matrix, qr_input=None):
         """Create JSON metadata file with model configuration"""
         rows = len(matrix)
@@ -501,10 +808,9 @@ module qr_pattern() {{
             return obj
 
         metadata = {
-            "generated_at": datetime.now().isoformat(),
             "version": __version__,
             "mode": self.mode,
-            "qr_input": qr_input or str(self.image_path.name),
+            "qr_input": qr_input or self.input_name,
             "dimensions": {
                 "card_width_mm": dimensions['card_width'],
                 "card_length_mm": dimensions['card_length'],
@@ -554,16 +860,68 @@ module qr_pattern() {{
                     "font": "Liberation Mono:style=Bold"
                 })
 
+        if self.qr_encoding is not None:
+            metadata["qr_encoding"] = self.qr_encoding
+
+        if self.input_check is not None:
+            metadata["input_check"] = self.input_check
+
+        if self.scan_check is not None:
+            metadata["scan_check"] = self.scan_check
+
+        metadata["render"] = self.render_metadata()
+
+        # Processed module matrix: regenerate with --from-json without the image
+        metadata["qr_matrix"] = encode_matrix(matrix)
+
+        # Timestamps make identical models differ - left out in deterministic mode
+        if not self.deterministic:
+            metadata = {"generated_at": datetime.now().isoformat(), **metadata}
+
         # Round all float values to 3 decimal places for better readability
         return round_floats(metadata)
 
+    def render_metadata(self):
+        """Render engine (and OpenSCAD version/flags) for the metadata JSON"""
+        render = {"engine": self.engine}
+        if self.render_strategy is not None:
+            render["strategy"] = self.render_strategy
+        if self.engine == 'openscad':
+            from .openscad import render_info
+            render.update(render_info(find_openscad_binary()))
+            if self.openscad_flags is not None:
+                render["openscad_flags"] = self.openscad_flags  # Flags actually used
+        native = (self.engine == 'native' or self.exported_with == 'native' or self.split_bodies
+                  or (self.three_mf and self.exported_with != 'openscad'))
+        if self.split_bodies and self.exported_with == 'openscad':
+            # Separate bodies (and the 3MF parts made of them) are native; text can differ slightly from the STL
+            render["bodies_engine"] = 'native'
+        if native and 'text' in self.mode and (self.text_content or self.text_content_top):
+            render["native_font"] = self.native_font()  # Font of natively built text (STL, bodies, 3MF)
+        if self.compaction is not None:
+            render["compacted"] = self.compaction
+        return render
+
     def export_stl(self, scad_path, stl_path, background=False):
-        """Export STL using OpenSCAD command line"""
-        try:
-            openscad_bin = find_openscad_binary()
+        """
+        Export STL using OpenSCAD command line.
+
+        Synchronous renders are admitted by the process-wide RenderScheduler
+        (CPU slots and memory budget) and run under a memory rlimit.
 
-            # Build command with fast-csg optimization (requires OpenSCAD 2023+)
-            cmd = [openscad_bin, '-o', str(stl_path), '--enable=fast-csg', str(scad_path)]
+        Raises:
+            RenderBudgetExceeded: OpenSCAD ran out of its memory budget
+        """
+        from .openscad import probe_openscad, rejects_flags, render_flags
+        from .scheduler import count_primitives, estimate_memory_mb, get_scheduler
+
+        openscad_bin = find_openscad_binary()
+        self.compaction = self.compacted_mesh = None
+        try:
+            # Fastest backend/flags this OpenSCAD version supports (Manifold, lazy-union, ...)
+            flags = render_flags(probe_openscad(openscad_bin))
+            cmd = [openscad_bin, '-o', str(stl_path)] + flags + [str(scad_path)]
+            self.openscad_flags = flags
 
             if background:
                 # Start OpenSCAD in background
@@ -579,15 +937,21 @@ module qr_pattern() {{
             else:
                 # Run OpenSCAD synchronously with progress indicator
                 print(f"  Rendering 3D model... (this may take 30-60 seconds)")
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=120  # 2 minutes timeout
-                )
+                scheduler = get_scheduler()
+                primitives = count_primitives(Path(scad_path).read_text(encoding='utf-8'))
+                result = scheduler.run(cmd, estimate_memory_mb(primitives, flags),
+                                       timeout=120)  # 2 minutes timeout
+
+                if result.returncode != 0 and rejects_flags(result.stderr, flags):
+                    # Retry plain only if the probed flags are not accepted after all (other failures would repeat)
+                    print(f"⚠ OpenSCAD failed with {' '.join(flags)}, retrying without...")
+                    cmd = [openscad_bin, '-o', str(stl_path), str(scad_path)]
+                    self.openscad_flags = []
+                    result = scheduler.run(cmd, estimate_memory_mb(primitives), timeout=120)
 
                 if result.returncode == 0:
                     print(f"✓ STL file created: {stl_path}")
+                    self.exported_with = 'openscad'
                     return True
                 else:
                     print(f"⚠ OpenSCAD export failed:")
@@ -606,66 +970,288 @@ module qr_pattern() {{
             print(f"  Or open {scad_path} in OpenSCAD GUI and export to STL manually.")
             return False
         except subprocess.TimeoutExpired:
-            # If timeout, try launching in background
-            print("⚠ STL generation taking longer than expected...")
-            print(f"  Starting background export...")
-            try:
-                process = subprocess.Popen(
-                    ['openscad', '-o', str(stl_path), str(scad_path)],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-                print(f"⏳ STL export now running in background (PID: {process.pid})")
-                print(f"   File will be ready at: {stl_path}")
-                return True
-            except Exception as e:
-                print(f"⚠ Could not start background process: {e}")
+            # The scheduler killed the render; an unscheduled restart would bypass its budget and rlimit
+            print("⚠ OpenSCAD export timed out after 2 minutes")
+            print(f"  Use --engine native, or open {scad_path} in OpenSCAD GUI and export manually.")
+            return False
+
+    def compact_openscad_stl(self, stl_path):
+        """Rewrite OpenSCAD's STL as welded, merged binary STL (keeps the original if that fails)"""
+        from .stl_compact import compact_stl
+
+        if not self.compact_output:
+            return
+        start = time.perf_counter()
+        try:
+            stats = compact_stl(stl_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠ STL not compacted: {e}")
+            return
+        self.compacted_mesh = stats.pop('mesh')
+        self.compaction = stats
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"✓ STL compacted: {stats['triangles_before']:,} → {stats['triangles']:,} triangles, "
+              f"{stats['bytes_before'] / 1024:.0f} → {stats['bytes'] / 1024:.0f} KB ({elapsed_ms:.0f} ms)")
+
+    def export_governed_stl(self, matrix, dimensions, scad_path, stl_path):
+        """
+        Export STL with OpenSCAD, stepping down to cheaper strategies when a
+        render exceeds its memory budget: merged module runs, then the native engine.
+        """
+        from .scheduler import RenderBudgetExceeded
+
+        self.render_strategy = 'scad'
+        try:
+            return self.export_stl(scad_path, stl_path)
+        except RenderBudgetExceeded as e:
+            print(f"⚠ {e}")
+
+        print("  Retrying with merged QR modules (fewer primitives)...")
+        self.render_strategy = 'scad-merged'
+        self.save_scad_file(self.generate_openscad(matrix, dimensions, merge_runs=True), scad_path)
+        try:
+            return self.export_stl(scad_path, stl_path)
+        except RenderBudgetExceeded as e:
+            print(f"⚠ {e}")
+
+        print("  Falling back to the native engine...")
+        self.render_strategy = 'native'
+        return self.export_native_stl(matrix, dimensions, stl_path)
+
+    def export_native_stl(self, matrix, dimensions, stl_path, scad_path=None, meshes=None):
+        """Export STL with the native mesh builder (falls back to OpenSCAD if that fails)"""
+        try:
+            start = time.perf_counter()
+            mesh = self.build_mesh(matrix, dimensions, meshes)
+            mesh.write_stl(stl_path, name=Path(stl_path).stem)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"✓ STL file created: {stl_path} ({mesh.triangle_count:,} triangles, {elapsed_ms:.0f} ms)")
+            self.exported_with = 'native'
+            return True
+        except FileNotFoundError as e:
+            print(f"⚠ Native export not possible: {e}")
+            if scad_path is None:
                 return False
+            print("  Falling back to OpenSCAD...")
+            return self.export_stl(scad_path, stl_path)
+
+    @staticmethod
+    def body_paths(stl_path):
+        """STL paths of the separate bodies next to the model STL (NAME-base.stl, NAME-relief.stl)"""
+        stl_path = Path(stl_path)
+        return {body: stl_path.with_name(f"{stl_path.stem}-{body}.stl") for body in BODIES}
+
+    def export_bodies(self, matrix, dimensions, stl_path):
+        """
+        Write the bodies of the model as separate STLs for two-colour printing.
+
+        The bodies are built natively from the same meshes as the model (no extra
+        OpenSCAD render); they touch at the top of the card and import into a
+        slicer as parts of one object.
+
+        Returns:
+            Dict of meshes from build_meshes() (to reuse for the model STL), or None if not possible
+        """
+        from .mesh import Mesh
+
+        try:
+            meshes = self.build_meshes(matrix, dimensions)
+        except FileNotFoundError as e:
+            print(f"⚠ Separate bodies not possible: {e}")
+            return None
+        for body, path in self.body_paths(stl_path).items():
+            mesh = Mesh()
+            for part in BODIES[body]:
+                mesh.extend(meshes[part])
+            mesh.write_stl(path, name=path.stem)
+            print(f"✓ Body STL created: {path} ({mesh.triangle_count:,} triangles)")
+        return meshes
+
+    def extra_paths(self, stl_path):
+        """Optional output files requested next to the model STL (separate bodies, 3MF)"""
+        paths = list(self.body_paths(stl_path).values()) if self.split_bodies else []
+        if self.three_mf:
+            paths.append(Path(stl_path).with_suffix('.3mf'))
+        return paths
+
+    def export_3mf(self, matrix, dimensions, path, metadata, meshes=None, stl_path=None):
+        """
+        Write the model as 3MF with its metadata embedded.
+
+        Holds the same mesh as the model STL: OpenSCAD's (compacted) output, or the
+        native meshes. With separate bodies the base and relief/text are parts of
+        one object, built natively like the body STLs (see render.bodies_engine).
+
+        Returns:
+            True if written
+        """
+        from .mesh import Mesh
+        from .stl_compact import read_stl
+        from .threemf import write_3mf
+
+        try:
+            start = time.perf_counter()
+            if self.compacted_mesh is not None and not self.split_bodies:
+                parts = {'model': self.compacted_mesh}
+            elif self.exported_with == 'openscad' and stl_path is not None and not self.split_bodies:
+                parts = {'model': read_stl(stl_path)}  # Not compacted (--no-compact)
+            else:
+                if meshes is None:
+                    meshes = self.build_meshes(matrix, dimensions)
+                parts = {}
+                for body, names in (BODIES.items() if self.split_bodies else [('model', tuple(meshes))]):
+                    parts[body] = Mesh()
+                    for name in names:
+                        parts[body].extend(meshes[name])
+            written = write_3mf(path, parts, name=Path(path).stem, metadata=metadata)
+        except (OSError, ValueError) as e:
+            print(f"⚠ 3MF export not possible: {e}")
+            return False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"✓ 3MF file created: {path} ({written['vertices']:,} vertices, {written['triangles']:,} triangles, "
+              f"{Path(path).stat().st_size / 1024:.0f} KB, {elapsed_ms:.0f} ms)")
+        return True
 
     def generate(self, qr_input=None):
         """Main generation process"""
-        print(f"Processing: {self.image_path.name}")
+        print(f"Processing: {self.input_name}")
         print(f"Mode: {self.mode}")
+        self.reused = False
 
         # Auto-adjust QR relief for thin models
-        if self.card_height <= 0.6:
-            self.qr_relief = 0.7
+        if self.auto_adjust_relief():
             print(f"→ Thin model detected (height={self.card_height}mm), setting QR relief to 0.7mm")
 
-        # Get unique output directory
-        base_name = self.output_name or self.image_path.stem  # Use provided name or filename without extension
-        model_dir = self.get_unique_output_dir(self.output_dir, base_name, self.card_height, self.size_scale)
-        final_name = model_dir.name
-
-        model_dir.mkdir(parents=True, exist_ok=True)
-        print(f"→ Output directory: {model_dir}")
+        if self.store is not None:
+            self.deterministic = True  # Stored models must be reproducible
 
         # Load and process image
         print("→ Loading image...")
         matrix, width, height = self.load_and_process_image()
         print(f"  QR code matrix: {width}x{height} pixels")
+        self.verify_input(matrix)
 
         # Calculate dimensions
         dimensions = self.calculate_dimensions(width)
         print(f"  Model size: {dimensions['card_width']}x{dimensions['card_length']}x{self.card_height}mm")
+        self.verify_geometry(matrix, dimensions)
+
+        if self.reuse:
+            existing = self.find_existing(matrix, qr_input)
+            if existing is not None and not all(path.exists() for path in self.extra_paths(existing['stl_path'])):
+                existing = None  # Generated without separate bodies or 3MF
+            if existing is not None:
+                print(f"\n✅ Identical model already generated: {existing['dir']}")
+                self.reused = True
+                return existing['scad_path'], existing['stl_path'], existing['json_path']
+
+        base_name = self.output_name or Path(self.input_name).stem  # Use provided name or filename without extension
+        if self.store is not None:
+            result = self.generate_stored(base_name, matrix, dimensions, qr_input)
+        else:
+            # Get unique output directory
+            model_dir = self.get_unique_output_dir(self.output_dir, base_name, self.card_height, self.size_scale)
+            model_dir.mkdir(parents=True, exist_ok=True)
+            print(f"→ Output directory: {model_dir}")
+
+            result = self.write_model(model_dir, model_dir.name, matrix, dimensions, qr_input)
+            print(f"\n✅ Done! All files in: {model_dir}")
+
+        self.record_in_catalog(result[0].parent, matrix, qr_input)
+        return result
+
+    def find_existing(self, matrix, qr_input=None):
+        """Catalog entry of an identical model in the output directory (same parameters and QR matrix), or None"""
+        import sqlite3
+        from .catalog import Catalog, model_params
+
+        url = qr_input if qr_input and self.is_url(qr_input) else None
+        try:
+            return Catalog(self.output_dir).find_model(model_params(self), matrix_hash(matrix), url)
+        except sqlite3.Error as e:
+            print(f"⚠ Model catalog not available ({e})")
+            return None
+
+    def record_in_catalog(self, model_dir, matrix, qr_input=None):
+        """Add a generated model to the output directory's catalog (best effort)"""
+        import sqlite3
+        from .catalog import Catalog, model_params
+
+        try:
+            Catalog(self.output_dir).record_model(model_dir, qr_input or self.input_name, model_params(self),
+                                                  matrix_hash(matrix), self.exported_with or self.engine, self.export_seconds)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠ Model not added to the catalog: {e}")
+
+    def generate_stored(self, base_name, matrix, dimensions, qr_input=None):
+        """Generate through the content-addressed store: render only unknown requests, then link"""
+        import shutil
+        from .store import request_key
+
+        key = request_key(self, matrix, qr_input)
+        object_dir = self.store.lookup(key)
+        if object_dir is not None:
+            print(f"✓ Identical model in store ({key[:12]}), no render needed")
+            self.reused = True
+        else:
+            work_dir = self.store.work_dir()
+            self.write_model(work_dir, 'model', matrix, dimensions, qr_input)
+            if self.exported_with is None:
+                # No finished STL (OpenSCAD missing, background export) - keep as a regular output directory
+                model_dir = self.get_unique_output_dir(self.output_dir, base_name, self.card_height, self.size_scale)
+                model_dir.mkdir(parents=True, exist_ok=True)
+                for path in work_dir.iterdir():
+                    shutil.move(str(path), str(model_dir / path.name.replace('model', model_dir.name, 1)))
+                shutil.rmtree(work_dir, ignore_errors=True)
+                print(f"⚠ Model not stored (no STL). Files in: {model_dir}")
+                return tuple(model_dir / f"{model_dir.name}{suffix}" for suffix in ('.scad', '.stl', '.json'))
+            object_dir = self.store.commit(key, work_dir)
+            print(f"✓ Model stored: {object_dir}")
+
+        final_name = self.get_output_name(base_name, self.card_height, self.size_scale)
+        model_dir = self.store.linked_dir(object_dir, self.output_dir, final_name)
+        if model_dir is None:
+            model_dir = self.get_unique_output_dir(self.output_dir, base_name, self.card_height, self.size_scale)
+        result = self.store.link(object_dir, model_dir)
+        print(f"\n✅ Done! All files in: {model_dir}")
+        return result
 
+    def write_model(self, model_dir, final_name, matrix, dimensions, qr_input=None):
+        """Write QR image, metadata, SCAD code and STL into model_dir; returns (scad, stl, json) paths"""
         # Determine output filenames (all in model subdirectory, use final_name for consistency)
         qr_file = model_dir / f"{final_name}.png"
         scad_file = model_dir / f"{final_name}.scad"
         stl_file = model_dir / f"{final_name}.stl"
         json_file = model_dir / f"{final_name}.json"
+        threemf_file = model_dir / f"{final_name}.3mf"
 
         # Move QR code image to model directory (if it's not already there)
-        if self.image_path.parent != model_dir:
+        input_file = qr_file
+        if self.image_path is not None and is_vector(self.image_path):
+            # Vector input: PNG of the exact matrix, the SVG is kept next to it
+            self.save_matrix_image(matrix, qr_file)
+            input_file = model_dir / f"{final_name}{self.image_path.suffix.lower()}"
+        if self.image_path is None or (self.preset_matrix is not None and not self.image_path.exists()):
+            # In-memory input or matrix from metadata: nothing to move
+            self.save_matrix_image(matrix, qr_file)
+            print(f"✓ QR code image written from matrix: {qr_file}")
+        elif self.image_path.parent != model_dir:
             import shutil
-            shutil.move(str(self.image_path), str(qr_file))
-            print(f"✓ QR code moved to: {qr_file}")
+            if self.move_input:
+                shutil.move(str(self.image_path), str(input_file))
+                print(f"✓ QR code moved to: {input_file}")
+            else:
+                shutil.copyfile(str(self.image_path), str(input_file))
+                print(f"✓ QR code copied to: {input_file}")
 
         # Create metadata JSON first (before time-consuming STL generation)
         print("→ Creating metadata JSON...")
         metadata = self.create_metadata_json(dimensions, matrix, qr_input=qr_input)
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        if self.split_bodies:
+            metadata["bodies"] = {body: path.name for body, path in self.body_paths(stl_file).items()}
+        if self.three_mf:
+            metadata["3mf"] = threemf_file.name
+        self.save_metadata(metadata, json_file)
         print(f"✓ Metadata saved: {json_file}")
 
         # Generate OpenSCAD code
@@ -675,11 +1261,51 @@ module qr_pattern() {{
         # Save SCAD file
         self.save_scad_file(scad_code, scad_file)
 
+        meshes = None
+        if self.split_bodies:
+            print("→ Exporting separate bodies...")
+            meshes = self.export_bodies(matrix, dimensions, stl_file)
+            if meshes is None:
+                metadata.pop("bodies")
+                self.save_metadata(metadata, json_file)
+
         # Try to export STL (most time-consuming step)
         print("→ Exporting STL...")
-        self.export_stl(scad_file, stl_file)
+        export_start = time.perf_counter()
+        if self.engine == 'native':
+            self.export_native_stl(matrix, dimensions, stl_file, scad_path=scad_file, meshes=meshes)
+        else:
+            self.export_governed_stl(matrix, dimensions, scad_file, stl_file)
+
+        self.export_seconds = time.perf_counter() - export_start
+        if self.exported_with == 'openscad':
+            self.compact_openscad_stl(stl_file)
+
+        # Record the timing for render cost estimates (see planner.py)
+        if self.exported_with is not None and stl_file.exists():
+            from .planner import record_timing
+            from .scheduler import count_primitives
+            # SCAD code actually rendered (merged module runs after a budget fallback)
+            rendered = scad_file.read_text(encoding='utf-8') if self.exported_with == 'openscad' else scad_code
+            record_timing(self.exported_with, self.openscad_flags or [], count_primitives(rendered),
+                          self.export_seconds, stl_file.stat().st_size,
+                          binary=self.exported_with == 'native' or self.compaction is not None)
+
+        if meshes is not None and self.exported_with == 'openscad' and (self.text_content or self.text_content_top):
+            print("⚠ Separate bodies are built natively: their text may differ slightly from the OpenSCAD STL")
+
+        # Record the render settings actually used (e.g. after a fallback)
+        render = self.render_metadata()
+        if render != metadata["render"]:
+            metadata["render"] = render
+            self.save_metadata(metadata, json_file)
+
+        if self.three_mf:
+            print("→ Exporting 3MF...")
+            if not self.export_3mf(matrix, dimensions, threemf_file, metadata, meshes, stl_file):
+                metadata.pop("3mf")
+                self.save_metadata(metadata, json_file)
 
-        print(f"\n✅ Done! All files in: {model_dir}")
         return scad_file, stl_file, json_file
 
 
@@ -693,10 +1319,12 @@ Examples:
   %(prog)s celox.png --mode pendant
   %(prog)s https://example.com --mode pendant --name mylink
   %(prog)s "https://github.com/user/repo" --output ./output
+  %(prog)s a.png b.png https://example.com --plan
+  %(prog)s --jobs orders.jsonl --workers 4
         """
     )
 
-    parser.add_argument('input', type=str, nargs='?', help='QR code image file (PNG/JPG) or URL to encode (optional if --place-id is used)')
+    parser.add_argument('input', type=str, nargs='*', help='QR code image file(s) (PNG/JPG, or SVG read as exact vector modules) or URL(s) to encode (optional if --place-id or --jobs is used)')
     parser.add_argument('--mode', type=str, choices=['square', 'pendant', 'rectangle-text', 'pendant-text', 'rectangle-text-2x'], default='square',
                         help='Model type: square (default), pendant (with hole), rectangle-text (with text bottom), pendant-text (pendant with text), rectangle-text-2x (text top AND bottom)')
     parser.add_argument('--text', '-t', type=str, default='',
@@ -705,6 +1333,26 @@ Examples:
                         help='Text to display above QR code (max 20 characters, only for rectangle-text-2x mode)')
     parser.add_argument('--text-rotation', type=int, choices=[0, 180], default=0,
                         help='Rotate text 180 degrees in Z-axis (default: 0, automatic for pendant-text mode, always 180 for rectangle-text-2x)')
+    parser.add_argument('--engine', type=str, choices=ENGINES, default='openscad',
+                        help='Render engine: openscad (default, exact CSG) or native (built in Python, no OpenSCAD needed, milliseconds)')
+    parser.add_argument('--ecc', type=str, choices=['auto', 'L', 'M', 'Q', 'H'], default='H',
+                        help='QR error correction for URL inputs (default: H); auto picks the fewest modules with at least M')
+    parser.add_argument('--min-feature', type=float, default=0.8, metavar='MM',
+                        help='Smallest printable module size in mm, checked for URL inputs (default: 0.8)')
+    parser.add_argument('--threshold', type=str, default='auto', metavar='{auto,otsu,adaptive,0-255}',
+                        help='Binarization of image inputs: auto (default: Otsu, adaptive for uneven lighting), otsu, adaptive or a fixed value')
+    parser.add_argument('--no-check', action='store_true',
+                        help='Skip the QR structure check (finder and timing patterns) and the scan check '
+                             'of the model (decoding its top view) before rendering')
+    parser.add_argument('--bodies', action='store_true',
+                        help='Also write base and relief/text as separate STLs (NAME-base.stl, NAME-relief.stl) '
+                             'for two-colour printing, built from the same geometry without a second render')
+    parser.add_argument('--no-compact', action='store_true',
+                        help="Keep OpenSCAD's STL as written (default: weld vertices, merge coplanar facets "
+                             "and rewrite it as binary STL)")
+    parser.add_argument('--3mf', dest='three_mf', action='store_true',
+                        help='Also write NAME.3mf: indexed, compressed mesh (several times smaller than STL) with '
+                             'the metadata embedded; with --bodies the bodies are parts of one object')
     parser.add_argument('--output', '-o', type=str, default=str(DEFAULT_OUTPUT_DIR),
                         help=f'Output directory for generated files (default: {DEFAULT_OUTPUT_DIR})')
     parser.add_argument('--name', '-n', type=str, default=None,
@@ -714,15 +1362,75 @@ Examples:
     parser.add_argument('--place-id', type=str, default=None,
                         help='Google Place ID (ChIJ...) for direct review link generation')
 
+    # Batch options
+    parser.add_argument('--jobs', type=str, default=None,
+                        help='Job manifest (JSON list or JSON Lines) with keys input, mode, text, text_top, name, engine, height, ...')
+    parser.add_argument('--plan', action='store_true',
+                        help='Dry run: print matrix size, primitives, triangles, predicted render time and size per job, longest first')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parallel worker processes for multiple jobs (default: CPU count - 1)')
+    parser.add_argument('--journal', type=str, nargs='?', const='', default=None,
+                        help='Journal of finished jobs (default: OUTPUT/.qrly-journal.jsonl); re-running the same jobs skips those with intact outputs')
+
+    # Numbered series options
+    parser.add_argument('--range', type=str, default=None, metavar='START-END[:STEP]',
+                        help='Numbered series: input, --text, --text-top and --name are templates with {n}, e.g. "https://x.io/a/{n:05d}" --text "#{n}" --range 1-500')
+    parser.add_argument('--plate', type=str, default=None, metavar='WIDTHxLENGTH',
+                        help='With --range: pack the cards onto print plates of this size in mm (one STL per plate, native meshes)')
+
+    # Reproducible output options
+    parser.add_argument('--deterministic', action='store_true',
+                        help='Byte-identical output for identical requests (no timestamps, sorted JSON keys)')
+    parser.add_argument('--store', type=str, nargs='?', const='', default=None,
+                        help='Content-addressed model store (default: OUTPUT/.store); identical requests are linked, not rendered again. Implies --deterministic')
+
+    parser.add_argument('--from-json', type=str, default=None, metavar='JSON',
+                        help='Regenerate a model from its metadata JSON (embedded QR matrix and parameters, no image needed); combine with --engine to re-render')
+
+    # Catalog options
+    parser.add_argument('--reuse', action='store_true',
+                        help='Return an identical model (same input and parameters) from the output directory catalog instead of generating it again')
+    parser.add_argument('--import-catalog', action='store_true',
+                        help='Add all existing models in the output directory to its catalog (from their metadata JSON) and exit')
+
+    # Cache options
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='Precompute base plate meshes for all size/thickness/mode presets and exit')
+
     args = parser.parse_args()
+    if args.threshold not in THRESHOLDS:
+        if not args.threshold.isdigit() or int(args.threshold) > 255:
+            parser.error(f"--threshold must be auto, otsu, adaptive or a value from 0 to 255 (got '{args.threshold}')")
+        args.threshold = int(args.threshold)
 
-    # Validate input or place_id is provided
-    if not args.input and not args.place_id:
-        parser.error("Either 'input' or '--place-id' must be provided")
+    if args.warm_cache:
+        from .plate_cache import get_default_cache, warm_up
+        count = warm_up()
+        print(f"✓ Base plate cache ready: {count} presets in {get_default_cache().cache_dir}")
+        return
 
     # Expand user path and create output directory if needed
     output_dir = Path(args.output).expanduser()
+
+    if args.import_catalog:
+        from .catalog import Catalog
+        catalog = Catalog(output_dir)
+        count = catalog.import_metadata()
+        print(f"✓ {count} models added to the catalog: {catalog.path}")
+        return
+
+    # Validate input or place_id is provided
+    if not args.input and not args.place_id and not args.jobs and not args.from_json:
+        parser.error("Either 'input', '--place-id', '--jobs' or '--from-json' must be provided")
+
     output_dir.mkdir(parents=True, exist_ok=True)
+    if args.store is not None:
+        args.store = str(Path(args.store).expanduser() if args.store else output_dir / '.store')
+        args.deterministic = True
+
+    if args.from_json:
+        regenerate_from_json(args, output_dir)
+        return
 
     # Google Review Processing (Place ID only)
     if args.place_id:
@@ -743,16 +1451,27 @@ Examples:
 
         # Generate review URL
         review_url = generate_review_url(args.place_id)
-        args.input = review_url
+        args.input = [review_url]
 
         print(f"✅ Google Review Link generated!")
         print(f"   Place ID: {args.place_id}")
         print(f"   Review:   {review_url}")
         print()
 
+    # Several jobs (or planning): estimate, then run longest-first on a worker pool
+    if args.range:
+        run_series(args, output_dir)
+        return
+
+    if args.plan or args.jobs or len(args.input) > 1 or args.journal is not None:
+        run_jobs(args, output_dir)
+        return
+
     # Check if input is URL or file
+    args.input = args.input[0]
     input_path = args.input
     temp_file = None
+    encoding = None
 
     # Determine output name
     output_name = None
@@ -766,9 +1485,18 @@ Examples:
         # Generate QR code from URL - save to temp location
         print(f"📡 Generating QR code from URL: {args.input}")
 
+        # Pick error correction/version for the QR area of this mode
+        from .qr_encode import encoding_for, qr_matrix
+        encoding = encoding_for(QRModelGenerator(args.input, args.mode), args.input, args.ecc, args.min_feature)
+
         # Generate QR to temporary file (generate() will handle final placement)
-        input_path = QRModelGenerator.generate_qr_image(args.input)
-        print(f"✓ QR code generated")
+        input_path = QRModelGenerator.generate_qr_image(encoding['data'], ecc=encoding['ecc'],
+                                                        version=encoding['version'])
+        print(f"✓ QR code generated (version {encoding['version']}, ECC {encoding['ecc']}, "
+              f"{encoding['modules']} modules, {encoding['module_mm']} mm per module)")
+        if not encoding['printable']:
+            print(f"⚠️  Warning: Modules are smaller than {args.min_feature} mm - the code may not print reliably. "
+                  f"Use a shorter URL, --ecc auto or a larger --mode.")
         temp_file = input_path
     else:
         # Validate file exists
@@ -800,6 +1528,20 @@ Examples:
         generator = QRModelGenerator(input_path, args.mode, str(output_dir), output_name=output_name)
         generator.text_content = text_content
         generator.text_content_top = text_content_top
+        generator.engine = args.engine
+        generator.deterministic = args.deterministic
+        generator.reuse = args.reuse
+        generator.qr_encoding = encoding
+        if encoding is not None:
+            generator.preset_matrix = qr_matrix(encoding)  # Exact modules, not sampled from the PNG
+        generator.threshold = args.threshold
+        generator.check_input = not args.no_check
+        generator.split_bodies = args.bodies
+        generator.three_mf = args.three_mf
+        generator.compact_output = not args.no_compact
+        if args.store:
+            from .store import ModelStore
+            generator.store = ModelStore(args.store)
 
         # Set text rotation (automatic for pendant-text and rectangle-text-2x)
         if args.mode in ['pendant-text', 'rectangle-text-2x']:
@@ -811,6 +1553,147 @@ Examples:
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    finally:
+        # Generated QR image is moved into the model directory - unless the model came from the store
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def regenerate_from_json(args, output_dir):
+    """Rebuild a model from a metadata JSON file (--from-json)"""
+    try:
+        generator, qr_input = QRModelGenerator.from_metadata(args.from_json, str(output_dir), output_name=args.name)
+        generator.engine = args.engine
+        generator.deterministic = args.deterministic
+        generator.reuse = args.reuse
+        generator.split_bodies = args.bodies
+        generator.three_mf = args.three_mf
+        generator.compact_output = not args.no_compact
+        if args.store:
+            from .store import ModelStore
+            generator.store = ModelStore(args.store)
+        generator.generate(qr_input=qr_input)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+def run_series(args, output_dir):
+    """Generate a numbered series (--range) from input/text templates, optionally packed on plates"""
+    from .job_queue import DONE, default_workers, run_batch
+    from .pipeline import DEFAULT_PARAMS
+    from .planner import job_settings
+    from .series import parse_plate, parse_range, series_items, series_jobs
+
+    if len(args.input) != 1:
+        print("❌ Error: --range needs exactly one input template, e.g. \"https://x.io/a/{n:05d}\"")
+        sys.exit(1)
+    try:
+        numbers = parse_range(args.range)
+        items = series_items(numbers, args.input[0], args.text, args.text_top, args.name)
+        plate = parse_plate(args.plate) if args.plate else None
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    for item in items:
+        for text in (item['text_content'], item['text_content_top']):
+            if len(text) > 20:
+                print(f"❌ Error: Text too long for {item['n']} ({len(text)} characters). Maximum is 20 characters.")
+                sys.exit(1)
+
+    settings = job_settings({'input': items[0]['input'], 'mode': args.mode, 'text_rotation': args.text_rotation,
+                             'ecc': args.ecc, 'min_feature': args.min_feature, 'threshold': args.threshold},
+                            output_dir, args.engine)
+    settings['deterministic'] = args.deterministic
+    settings['check'] = not args.no_check
+    settings['bodies'] = args.bodies
+    settings['3mf'] = args.three_mf
+    settings['compact'] = not args.no_compact
+    workers = args.workers or default_workers()
+
+    plate_dir = None
+    if plate:
+        plate_dir = QRModelGenerator.get_unique_output_dir(output_dir, f"plates-{numbers[0]}-{numbers[-1]}",
+                                                           DEFAULT_PARAMS['height'], DEFAULT_PARAMS['size_scale'])
+        plate_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        jobs = series_jobs(settings, items, workers, plate, plate_dir)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    journal = None
+    if args.journal is not None:
+        from .journal import Journal
+        journal = Journal(args.journal or output_dir / '.qrly-journal.jsonl')
+    print(f"→ {len(items)} item(s) in {len(jobs)} job(s) on {workers} worker(s)...")
+    finished = run_batch(jobs, workers, journal=journal)
+    done = sum(1 for job in finished if job.state == DONE)
+    print(f"\n✅ {done}/{len(jobs)} job(s) finished in {plate_dir or output_dir}")
+    if done < len(jobs):
+        sys.exit(1)
+
+
+def run_jobs(args, output_dir):
+    """Plan (--plan) or run several jobs from the command line and/or a --jobs manifest"""
+    from .job_queue import DONE, default_workers, run_batch
+    from .planner import load_jobs, plan_jobs, print_plan, job_settings
+
+    jobs = [{'input': item, 'mode': args.mode, 'text': args.text, 'text_top': args.text_top,
+             'text_rotation': args.text_rotation, 'name': args.name if len(args.input) == 1 else None}
+            for item in args.input]
+    if args.jobs:
+        try:
+            jobs.extend(load_jobs(args.jobs))
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: Could not read job manifest: {e}")
+            sys.exit(1)
+    for job in jobs:
+        job.setdefault('ecc', args.ecc)  # Manifest entries may choose their own
+        job.setdefault('min_feature', args.min_feature)
+        job.setdefault('threshold', args.threshold)
+
+    settings = [job_settings(job, output_dir, args.engine) for job in jobs]
+    for item in settings:
+        item['deterministic'] = args.deterministic
+        item['reuse'] = args.reuse
+        item['check'] = not args.no_check
+        item['bodies'] = args.bodies
+        item['3mf'] = args.three_mf
+        item['compact'] = not args.no_compact
+        if args.store:
+            item['store'] = args.store
+    for item in settings:
+        for text in (item['text_content'], item['text_content_top']):
+            if len(text) > 20:
+                print(f"❌ Error: Text too long in job '{item['output_name']}' ({len(text)} characters). Maximum is 20 characters.")
+                sys.exit(1)
+
+    workers = args.workers or default_workers()
+    print(f"→ Estimating {len(settings)} job(s)...")
+    planned = plan_jobs(settings)
+    if args.plan:
+        print_plan(planned, workers)
+        return
+
+    failed = [item for item, estimate in planned if 'error' in estimate]
+    for item, estimate in planned:
+        if 'error' in estimate:
+            print(f"❌ {item['output_name']}: {estimate['error']}")
+        else:
+            item['memory_mb'] = estimate['memory_mb']  # Admission against the memory budget
+
+    runnable = [item for item, estimate in planned if 'error' not in estimate]
+    print(f"→ Running {len(runnable)} job(s) longest-first on {workers} worker(s)...")
+    journal = None
+    if args.journal is not None:
+        from .journal import Journal
+        journal = Journal(args.journal or output_dir / '.qrly-journal.jsonl')
+    finished = run_batch(runnable, workers, journal=journal)
+    done = sum(1 for job in finished if job.state == DONE)
+    print(f"\n✅ {done}/{len(settings)} models generated in {output_dir}")
+    if failed or done < len(runnable):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,186 @@
+"""
+Image ingestion
+
+QR matrices are sampled from about 50 cells per side (see
+QRModelGenerator.load_and_process_image), so input images never need to be
+converted at full resolution:
+
+- JPEG photos are decoded with draft mode (DCT scaling by 1/2, 1/4 or 1/8) at
+  the smallest size that still has DRAFT_PIXELS_PER_CELL pixels per sampled
+  cell - a 48 MP phone photo decodes at 1/8 scale in a fraction of the time
+  and memory
+- Other formats (PNG, TIFF, ...) are sampled with one nearest-neighbour affine
+  transform in C, and only the sampled cells are converted to grayscale (no
+  full-resolution grayscale copy)
+
+Sampling positions are the same as reading every sample_rate-th pixel, so
+images that are not draft-decoded give identical matrices.
+
+Inputs may be files or in-memory images (see open_image), so services holding
+uploads in memory never write temporary files.
+
+The sampled cells are binarized with a threshold from the image itself (Otsu)
+or, for photos with shadows or uneven lighting, against the local mean of the
+surrounding cells (box filter). Both run in C on the sampled image.
+"""
+
+import contextlib
+import io
+import os
+
+from PIL import Image, ImageChops, ImageFilter
+
+# Sampling target: cells per side (~800-1200 cubes instead of ~10000)
+TARGET_GRID = 50
+
+# Decoded pixels per sampled cell kept by JPEG draft mode
+DRAFT_PIXELS_PER_CELL = 4
+
+# Threshold methods: 'auto' (Otsu, adaptive if the QR check fails), 'otsu', 'adaptive' or a fixed 0-255 value
+THRESHOLDS = ['auto', 'otsu', 'adaptive']
+
+# Adaptive threshold: cells darker than the local mean by this much are dark
+ADAPTIVE_OFFSET = 10
+
+
+def is_path(source):
+    """True for file paths (str or os.PathLike), False for in-memory images"""
+    return isinstance(source, (str, os.PathLike))
+
+
+def open_image(source):
+    """
+    Context manager yielding a PIL image for a file or an in-memory image.
+
+    Args:
+        source: Path, bytes/bytearray/memoryview with encoded image data, binary
+                file-like object, PIL Image or array (anything with __array_interface__,
+                e.g. a NumPy array: 2D grayscale, 2D bool with True = dark, or 3D RGB/RGBA)
+
+    Images and file objects passed in are not closed.
+    """
+    if is_path(source):
+        return Image.open(source)
+    if isinstance(source, Image.Image):
+        return contextlib.nullcontext(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(source))
+    if hasattr(source, 'read'):
+        return contextlib.nullcontext(Image.open(source))
+    if hasattr(source, '__array_interface__'):
+        img = Image.fromarray(source)
+        if source.__array_interface__['typestr'] == '|b1':
+            img = img.convert('L').point(lambda value: 255 - value)  # True = dark module, like QR matrices
+        return contextlib.nullcontext(img)
+    raise TypeError(f"Unsupported image input: {type(source).__name__} "
+                    "(expected path, bytes, file-like object, PIL Image or array)")
+
+
+def sampling_rate(width, height, target_grid=TARGET_GRID):
+    """Pixel stride for sampling an image of this size (at least 1)"""
+    return max(1, max(width, height) // target_grid)
+
+
+def sample_grayscale(img, sample_rate, draft=True):
+    """
+    Grayscale image with one pixel per sampled cell.
+
+    Cell (x, y) is the pixel at (x * sample_rate, y * sample_rate) of the full
+    resolution image (or the corresponding pixel of a draft-decoded JPEG).
+
+    Args:
+        img: Opened (not yet loaded) PIL image
+        sample_rate: Pixel stride (see sampling_rate)
+        draft: Allow JPEG draft mode (changes img - only for images opened here)
+
+    Returns:
+        Mode 'L' image of ceil(width / sample_rate) x ceil(height / sample_rate) pixels
+    """
+    width, height = img.size
+    columns = -(-width // sample_rate)
+    rows = -(-height // sample_rate)
+
+    if draft and img.format == 'JPEG' and sample_rate >= 2 * DRAFT_PIXELS_PER_CELL:
+        img.draft('L', (columns * DRAFT_PIXELS_PER_CELL, rows * DRAFT_PIXELS_PER_CELL))
+    step_x = sample_rate * img.size[0] / width
+    step_y = sample_rate * img.size[1] / height
+
+    # Output pixel centers (x + 0.5) map to x * step + 0.5, which nearest sampling floors to x * step
+    data = (step_x, 0, 0.5 - step_x / 2, 0, step_y, 0.5 - step_y / 2)
+    try:
+        sampled = img.transform((columns, rows), Image.Transform.AFFINE, data, resample=Image.Resampling.NEAREST)
+    except ValueError:
+        # Modes without transform support (e.g. 16 bit): convert first
+        sampled = img.convert('L').transform((columns, rows), Image.Transform.AFFINE, data,
+                                             resample=Image.Resampling.NEAREST)
+    return sampled.convert('L')
+
+
+def otsu_threshold(img):
+    """
+    Otsu threshold of a grayscale image: values below it are dark.
+
+    The middle of the range of equally good splits is used, so black and white
+    images get 128 (the previous fixed threshold).
+    """
+    histogram = img.histogram()
+    total = sum(histogram)
+    weighted_total = sum(value * count for value, count in enumerate(histogram))
+    best, splits = -1.0, []
+    count_dark = weighted_dark = 0
+    for value in range(255):
+        count_dark += histogram[value]
+        weighted_dark += value * histogram[value]
+        count_light = total - count_dark
+        if count_dark == 0 or count_light == 0:
+            continue
+        mean_dark = weighted_dark / count_dark
+        mean_light = (weighted_total - weighted_dark) / count_light
+        variance = count_dark * count_light * (mean_dark - mean_light) ** 2
+        if variance > best * (1 + 1e-9):
+            best, splits = variance, [value]
+        elif variance >= best * (1 - 1e-9):
+            splits.append(value)
+    if not splits:
+        return 128  # Single gray value
+    return (splits[0] + splits[-1]) // 2 + 1
+
+
+def _to_matrix(mask):
+    """Rows of booleans from a mode 'L' mask (non-zero = dark)"""
+    width, height = mask.size
+    data = mask.tobytes()
+    return [[value != 0 for value in data[y * width:(y + 1) * width]] for y in range(height)]
+
+
+def binarize(sampled, threshold='auto'):
+    """
+    Module matrix (True = dark) of a sampled grayscale image.
+
+    Args:
+        sampled: Mode 'L' image from sample_grayscale()
+        threshold: 'otsu', 'adaptive', 'auto' (Otsu, or adaptive if that passes the
+                   QR check and Otsu does not) or a fixed value (dark below it)
+
+    Returns:
+        (matrix, description of the threshold used, e.g. 'otsu 128')
+    """
+    if threshold == 'adaptive':
+        # Local mean over about a third of the image (several modules), from a box filter
+        radius = max(2, max(sampled.size) // 6)
+        local_mean = sampled.filter(ImageFilter.BoxBlur(radius))
+        darker = ImageChops.subtract(local_mean, sampled)  # max(mean - value, 0)
+        return _to_matrix(darker.point(lambda value: 255 if value > ADAPTIVE_OFFSET else 0)), 'adaptive'
+    if threshold in ('auto', 'otsu'):
+        level = otsu_threshold(sampled)
+        matrix = _to_matrix(sampled.point(lambda value: 255 if value < level else 0))
+        if threshold == 'auto':
+            from .qr_check import check_matrix
+
+            if not check_matrix(matrix)['ok']:
+                adaptive, description = binarize(sampled, 'adaptive')
+                if check_matrix(adaptive)['ok']:
+                    return adaptive, description
+        return matrix, f"otsu {level}"
+    level = int(threshold)
+    return _to_matrix(sampled.point(lambda value: 255 if value < level else 0)), f"fixed {level}"
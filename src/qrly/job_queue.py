@@ -0,0 +1,320 @@
+"""
+Generation job queue
+
+Each job is a snapshot of all generation settings. Jobs run in separate worker
+processes (OpenSCAD rendering is CPU-bound), at most `max_workers` at a time.
+Workers report progress and results over a pipe; `JobQueue.poll()` collects
+them without blocking, so a GUI can call it from a timer.
+
+Jobs are also admitted against the memory budget of a RenderScheduler, using
+each job's estimated render memory (settings key 'memory_mb').
+"""
+
+import contextlib
+import multiprocessing
+import os
+import signal
+import time
+from pathlib import Path
+
+from .scheduler import BASE_MEMORY_MB, RenderScheduler
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+def default_workers():
+    """Default worker count: all CPUs but one (at least one)"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def run_generation_job(settings, conn):
+    """
+    Worker process entry point: generate one model and report over `conn`.
+
+    Args:
+        settings: Job settings (input, output_name, output_dir, optional engine, store, quiet and
+                  stages - results of the submitting pipeline, see ModelPipeline.export_stages -
+                  and pipeline parameters; or a numbered series chunk, see series.py)
+        conn: Pipe end; receives ('progress', message), then ('done', stl_path, message)
+              or ('failed', message)
+    """
+    # Own process group, so cancelling the job also kills its OpenSCAD child
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+    from .pipeline import ModelPipeline
+
+    pipeline = ModelPipeline()
+    quiet = open(os.devnull, 'w') if settings.get('quiet') else None
+    try:
+        # Generator progress output of parallel workers would interleave - drop it in batch runs
+        with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+            if 'series' in settings:
+                from .series import generate_series
+                generate_series(pipeline, settings, conn)
+            else:
+                _generate(pipeline, settings, conn)
+    except Exception as e:
+        conn.send(('failed', f"Error: {str(e)}"))
+    finally:
+        pipeline.cleanup()
+        conn.close()
+        if quiet:
+            quiet.close()
+
+
+def _generate(pipeline, settings, conn):
+    from .generator import QRModelGenerator
+
+    if settings.get('stages'):
+        pipeline.import_stages(settings['stages'])  # Matrix, dimensions and SCAD as already computed
+    elif QRModelGenerator.is_url(settings['input']):
+        conn.send(('progress', "Generating QR code from URL..."))
+    pipeline.get('input', settings)
+
+    conn.send(('progress', "Generating 3D model..."))
+    generator = pipeline.make_generator(settings, settings['output_dir'], output_name=settings['output_name'])
+    generator.engine = settings.get('engine', generator.engine)
+    generator.reuse = settings.get('reuse', False)
+    if settings.get('store'):
+        from .store import ModelStore
+        generator.store = ModelStore(settings['store'])
+    scad_path, stl_path, _ = generator.generate(qr_input=settings['input'])
+
+    if not Path(stl_path).exists() or (generator.exported_with is None and not generator.reused):
+        # generate() keeps the SCAD file when the STL export fails or is skipped
+        conn.send(('failed', f"No STL written (export failed), SCAD file: {Path(scad_path).name}"))
+        return
+    conn.send(('done', str(stl_path), f"Generated: {Path(stl_path).name}"))
+
+
+class Job:
+    """One queued generation (settings snapshot plus state)"""
+
+    def __init__(self, job_id, settings):
+        self.id = job_id
+        self.settings = settings
+        self.state = QUEUED
+        self.message = "Queued"
+        self.stl_path = None
+        self.attempts = 0
+        self.memory_mb = settings.get('memory_mb', BASE_MEMORY_MB)
+        self.reserved = False  # Holds a scheduler reservation while running
+        self.process = None
+        self.conn = None
+
+    @property
+    def name(self):
+        return self.settings.get('output_name') or self.settings['input']
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+
+class JobQueue:
+    """Runs generation jobs in worker processes, `max_workers` at a time"""
+
+    def __init__(self, max_workers=None, target=run_generation_job, scheduler=None):
+        self.max_workers = max_workers or default_workers()
+        self.target = target
+        self.scheduler = scheduler or RenderScheduler()
+        self.jobs = []
+        self._next_id = 1
+        # 'spawn' avoids forking a process that runs GUI threads
+        self._context = multiprocessing.get_context('spawn')
+
+    def submit(self, settings):
+        """Queue a job; returns the Job"""
+        job = Job(self._next_id, dict(settings))
+        self._next_id += 1
+        self.jobs.append(job)
+        self._start_queued()
+        return job
+
+    def get(self, job_id):
+        for job in self.jobs:
+            if job.id == job_id:
+                return job
+        raise KeyError(f"Unknown job: {job_id}")
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job (kills the worker and its OpenSCAD process)"""
+        job = self.get(job_id)
+        if job.finished:
+            return job
+        if job.state == RUNNING:
+            self._kill(job)
+        job.state = CANCELLED
+        job.message = "Cancelled"
+        self._start_queued()
+        return job
+
+    def retry(self, job_id):
+        """Queue a failed or cancelled job again"""
+        job = self.get(job_id)
+        if job.state in (FAILED, CANCELLED):
+            job.state = QUEUED
+            job.message = "Queued"
+            self._start_queued()
+        return job
+
+    def clear_finished(self):
+        """Forget finished jobs"""
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+    @property
+    def active(self):
+        """True while jobs are queued or running"""
+        return any(job.state in (QUEUED, RUNNING) for job in self.jobs)
+
+    def poll(self):
+        """
+        Collect worker messages and start queued jobs (non-blocking).
+
+        Returns:
+            List of jobs whose state or message changed
+        """
+        changed = []
+        for job in self.jobs:
+            if job.state == RUNNING and self._read(job):
+                changed.append(job)
+        changed.extend(self._start_queued())
+        return changed
+
+    def shutdown(self):
+        """Cancel all queued and running jobs"""
+        for job in self.jobs:
+            if not job.finished:
+                self.cancel(job.id)
+
+    # Helpers
+
+    def _start_queued(self):
+        started = []
+        running = sum(1 for job in self.jobs if job.state == RUNNING)
+        for job in self.jobs:
+            if running >= self.max_workers:
+                break
+            if job.state == QUEUED:
+                if not self.scheduler.try_acquire(job.memory_mb):
+                    break  # Memory budget exhausted - wait (in order) for running jobs
+                job.reserved = True
+                self._start(job)
+                started.append(job)
+                running += 1
+        return started
+
+    def _start(self, job):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        job.process = self._context.Process(target=self.target, args=(job.settings, child_conn), daemon=True)
+        job.process.start()
+        child_conn.close()  # Only the worker writes; EOF once it exits
+        job.conn = parent_conn
+        job.attempts += 1
+        job.state = RUNNING
+        job.message = "Starting..."
+        job.stl_path = None
+
+    def _read(self, job):
+        """Apply pending messages of a running job; returns True if anything changed"""
+        changed = False
+        try:
+            while job.conn.poll():
+                message = job.conn.recv()
+                changed = True
+                if message[0] == 'progress':
+                    job.message = message[1]
+                elif message[0] == 'done':
+                    job.state, job.stl_path, job.message = DONE, message[1], message[2]
+                else:
+                    job.state, job.message = FAILED, message[1]
+        except (EOFError, OSError):
+            # Worker gone without a final message (crashed or killed)
+            if job.state == RUNNING:
+                job.process.join(timeout=1)
+                job.state = FAILED
+                job.message = f"Worker exited unexpectedly (code {job.process.exitcode})"
+                changed = True
+
+        if job.finished:
+            self._release(job)
+        return changed
+
+    def _kill(self, job):
+        process = job.process
+        if process is not None and process.is_alive():
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()  # No process groups (Windows) or group not created yet
+        self._release(job)
+
+    def _release(self, job):
+        if job.reserved:
+            self.scheduler.release(job.memory_mb)
+            job.reserved = False
+        if job.process is not None:
+            job.process.join(timeout=5)
+            job.process = None
+        if job.conn is not None:
+            job.conn.close()
+            job.conn = None
+
+
+def run_batch(jobs_settings, max_workers=None, poll_interval=0.2, journal=None):
+    """
+    Run jobs (in the given order) on a worker pool and print results as they finish.
+
+    Args:
+        jobs_settings: List of job settings
+        max_workers: Parallel worker processes
+        poll_interval: Seconds between polls of the workers
+        journal: Optional journal.Journal - jobs with verified outputs from an earlier
+                 run are skipped, results of this run are recorded
+
+    Returns:
+        List of finished Jobs (skipped jobs count as DONE)
+    """
+    queue = JobQueue(max_workers)
+    skipped = []
+    for settings in jobs_settings:
+        outputs = journal.completed(settings) if journal else None
+        if outputs is not None:
+            job = Job(None, settings)
+            job.state = DONE
+            job.message = "Already done"
+            job.stl_path = outputs['stl']['path']
+            skipped.append(job)
+            continue
+        queue.submit(dict(settings, quiet=True))
+    if skipped:
+        print(f"✓ {len(skipped)} job(s) already done in an earlier run (journal: {journal.path})")
+
+    try:
+        while queue.active:
+            for job in queue.poll():
+                if job.state == DONE and (job.stl_path is None or not Path(job.stl_path).exists()):
+                    # Never journal a job as done without its STL (it would count as finished)
+                    job.state = FAILED
+                    job.message = "No STL written"
+                if job.state == DONE:
+                    print(f"✓ #{job.id} {job.name}: {job.message}")
+                    if journal:
+                        journal.record_done(job.settings, job.stl_path, job.name)
+                elif job.state == FAILED:
+                    print(f"❌ #{job.id} {job.name}: {job.message}")
+                    if journal:
+                        journal.record_failed(job.settings, job.message, job.name)
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        queue.shutdown()
+        raise
+    return skipped + queue.jobs
@@ -0,0 +1,123 @@
+"""
+Job journal for resumable multi-job runs
+
+An append-only JSON Lines file with one record per job state change:
+
+    {"job": "<settings hash>", "state": "done", "name": "...", "outputs": {...}, "time": ...}
+
+Each record is a single O_APPEND write followed by fsync, so a crash (OpenSCAD
+abort, OOM kill, reboot) leaves at most one partially written last line, which
+is ignored when loading. Re-running the same job list skips jobs whose last
+record is "done" and whose output files still exist with the recorded size
+and SHA-256.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+# Settings that do not change a job's output
+TRANSIENT_KEYS = {'quiet', 'memory_mb'}
+
+# Files recorded per finished job (next to the STL, same stem)
+OUTPUT_SUFFIXES = ['.stl', '.scad', '.json']
+
+DONE = 'done'
+FAILED = 'failed'
+
+
+def job_key(settings):
+    """SHA-256 of a job's settings (canonical JSON, transient keys left out)"""
+    relevant = {key: value for key, value in settings.items() if key not in TRANSIENT_KEYS}
+    canonical = json.dumps(relevant, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def describe_outputs(stl_path):
+    """Path, size and SHA-256 of the files of a finished job"""
+    stl_path = Path(stl_path)
+    outputs = {}
+    for suffix in OUTPUT_SUFFIXES:
+        path = stl_path.with_suffix(suffix)
+        if path.exists():
+            outputs[suffix.lstrip('.')] = {'path': str(path), 'bytes': path.stat().st_size,
+                                           'sha256': file_sha256(path)}
+    return outputs
+
+
+def verify_outputs(outputs):
+    """True if all recorded files exist, are not empty and have their recorded hash"""
+    if 'stl' not in outputs:
+        return False
+    for output in outputs.values():
+        path = Path(output['path'])
+        try:
+            if path.stat().st_size != output['bytes'] or output['bytes'] == 0:
+                return False
+        except OSError:
+            return False
+        if file_sha256(path) != output['sha256']:
+            return False
+    return True
+
+
+class Journal:
+    """Append-only journal of job results"""
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+        self.records = self._load()
+
+    def _load(self):
+        """Last record per job key"""
+        records = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line of an interrupted run
+                    records[record['job']] = record
+        except OSError:
+            pass
+        return records
+
+    def append(self, key, state, name=None, **fields):
+        """Write one record durably (single append + fsync)"""
+        record = {'job': key, 'state': state, 'name': name, 'time': round(time.time(), 3), **fields}
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.records[key] = record
+
+    def completed(self, settings):
+        """Outputs of a verified earlier run of this job, or None"""
+        record = self.records.get(job_key(settings))
+        if record is None or record['state'] != DONE:
+            return None
+        if not verify_outputs(record.get('outputs', {})):
+            print(f"⚠ {record.get('name')}: recorded output missing or changed - generating again")
+            return None
+        return record['outputs']
+
+    def record_done(self, settings, stl_path, name=None):
+        self.append(job_key(settings), DONE, name, outputs=describe_outputs(stl_path))
+
+    def record_failed(self, settings, message, name=None):
+        self.append(job_key(settings), FAILED, name, message=message)
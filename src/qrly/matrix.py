@@ -0,0 +1,75 @@
+"""
+Helpers for QR module matrices (lists of rows of booleans, True = raised)
+"""
+
+import base64
+import hashlib
+
+# Packing of embedded matrices (see encode_matrix)
+MATRIX_ENCODING = 'bits-msb-rows+base64'
+
+
+def pack_matrix(matrix):
+    """Pack a boolean matrix row by row into bytes (MSB first, rows padded to full bytes)"""
+    packed = bytearray()
+    for row in matrix:
+        byte = 0
+        bits = 0
+        for cell in row:
+            byte = (byte << 1) | (1 if cell else 0)
+            bits += 1
+            if bits == 8:
+                packed.append(byte)
+                byte = bits = 0
+        if bits:
+            packed.append(byte << (8 - bits))
+    return bytes(packed)
+
+
+def unpack_matrix(data, width, height):
+    """Inverse of pack_matrix()"""
+    row_bytes = (width + 7) // 8
+    if len(data) < row_bytes * height:
+        raise ValueError(f"Packed matrix too short: {len(data)} bytes for {width}x{height}")
+    matrix = []
+    for y in range(height):
+        row_data = data[y * row_bytes:(y + 1) * row_bytes]
+        matrix.append([bool(row_data[x >> 3] & (0x80 >> (x & 7))) for x in range(width)])
+    return matrix
+
+
+def matrix_hash(matrix):
+    """Content hash of a matrix (SHA-256 over its size and packed bits)"""
+    height = len(matrix)
+    width = len(matrix[0]) if height else 0
+    digest = hashlib.sha256(f"{width}x{height}:".encode('ascii'))
+    digest.update(pack_matrix(matrix))
+    return digest.hexdigest()
+
+
+def encode_matrix(matrix):
+    """Matrix as a JSON-serializable dict: size, packed bits (base64) and hash"""
+    height = len(matrix)
+    width = len(matrix[0]) if height else 0
+    return {
+        'width': width,
+        'height': height,
+        'encoding': MATRIX_ENCODING,
+        'data': base64.b64encode(pack_matrix(matrix)).decode('ascii'),
+        'sha256': matrix_hash(matrix),
+    }
+
+
+def decode_matrix(encoded):
+    """
+    Inverse of encode_matrix().
+
+    Raises:
+        ValueError: Unknown encoding, or the data does not match its hash
+    """
+    if encoded.get('encoding') != MATRIX_ENCODING:
+        raise ValueError(f"Unknown matrix encoding: {encoded.get('encoding')}")
+    matrix = unpack_matrix(base64.b64decode(encoded['data']), encoded['width'], encoded['height'])
+    if matrix_hash(matrix) != encoded['sha256']:
+        raise ValueError("Embedded matrix does not match its hash")
+    return matrix
@@ -0,0 +1,369 @@
+"""
+Minimal triangle mesh toolkit for the native (OpenSCAD-free) render path
+
+Builds the same primitives the generated SCAD code uses - rounded card
+plate, pendant hole, raised QR modules, extruded text - directly in Python
+and writes them as binary STL.
+"""
+
+import math
+import struct
+
+
+class Mesh:
+    """Indexed triangle mesh (vertices as (x, y, z) tuples, faces as index triples)"""
+
+    def __init__(self, vertices=None, faces=None):
+        self.vertices = list(vertices or [])
+        self.faces = list(faces or [])
+
+    @property
+    def triangle_count(self):
+        return len(self.faces)
+
+    def copy(self):
+        """Return an independent copy of this mesh"""
+        return Mesh(self.vertices, self.faces)
+
+    def extend(self, other):
+        """Append another mesh (no boolean union - shells may touch or overlap)"""
+        offset = len(self.vertices)
+        self.vertices.extend(other.vertices)
+        self.faces.extend((a + offset, b + offset, c + offset) for a, b, c in other.faces)
+        return self
+
+    def translated(self, dx=0.0, dy=0.0, dz=0.0):
+        """Return a translated copy (faces are shared, they are never mutated in place)"""
+        vertices = [(x + dx, y + dy, z + dz) for x, y, z in self.vertices]
+        return Mesh(vertices, self.faces)
+
+    def rotated_z(self, degrees):
+        """Return a copy rotated around the Z axis through the origin"""
+        if degrees % 360 == 0:
+            return self.copy()
+        if degrees % 360 == 180:
+            # Exact for the common case (text labels are rotated by 180°)
+            return Mesh([(-x, -y, z) for x, y, z in self.vertices], self.faces)
+        angle = math.radians(degrees)
+        c, s = math.cos(angle), math.sin(angle)
+        vertices = [(x * c - y * s, x * s + y * c, z) for x, y, z in self.vertices]
+        return Mesh(vertices, self.faces)
+
+    def bounds(self):
+        """Return ((min_x, min_y, min_z), (max_x, max_y, max_z)) or None for an empty mesh"""
+        if not self.vertices:
+            return None
+        xs, ys, zs = zip(*self.vertices)
+        return (min(xs), min(ys), min(zs)), (max(xs), max(ys), max(zs))
+
+    def triangles(self):
+        """Iterate over triangles as triples of vertex tuples"""
+        vertices = self.vertices
+        for a, b, c in self.faces:
+            yield vertices[a], vertices[b], vertices[c]
+
+    def write_stl(self, path, name='qrly'):
+        """Write mesh as binary STL"""
+        header = name.encode('ascii', 'replace')[:80].ljust(80, b' ')
+        pack = struct.Struct('<12fH').pack
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(struct.pack('<I', len(self.faces)))
+            chunk = []
+            for v0, v1, v2 in self.triangles():
+                nx, ny, nz = _face_normal(v0, v1, v2)
+                chunk.append(pack(nx, ny, nz, *v0, *v1, *v2, 0))
+                if len(chunk) >= 4096:
+                    f.write(b''.join(chunk))
+                    chunk = []
+            f.write(b''.join(chunk))
+
+
+def _face_normal(v0, v1, v2):
+    ax, ay, az = v1[0] - v0[0], v1[1] - v0[1], v1[2] - v0[2]
+    bx, by, bz = v2[0] - v0[0], v2[1] - v0[1], v2[2] - v0[2]
+    nx, ny, nz = ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx
+    length = math.sqrt(nx * nx + ny * ny + nz * nz)
+    if length == 0:
+        return 0.0, 0.0, 0.0
+    return nx / length, ny / length, nz / length
+
+
+def signed_area(ring):
+    """Signed area of a 2D polygon (positive = counter-clockwise)"""
+    area = 0.0
+    n = len(ring)
+    for i in range(n):
+        x0, y0 = ring[i]
+        x1, y1 = ring[(i + 1) % n]
+        area += x0 * y1 - x1 * y0
+    return area / 2
+
+
+def point_in_polygon(point, ring):
+    """Even-odd point-in-polygon test"""
+    x, y = point
+    inside = False
+    n = len(ring)
+    for i in range(n):
+        x0, y0 = ring[i]
+        x1, y1 = ring[(i + 1) % n]
+        if (y0 > y) != (y1 > y):
+            if x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+                inside = not inside
+    return inside
+
+
+def clean_ring(ring, eps=1e-9):
+    """Drop repeated and collinear points from a closed ring"""
+    points = []
+    for p in ring:
+        if not points or abs(p[0] - points[-1][0]) > eps or abs(p[1] - points[-1][1]) > eps:
+            points.append((float(p[0]), float(p[1])))
+    while len(points) > 1 and abs(points[0][0] - points[-1][0]) <= eps and abs(points[0][1] - points[-1][1]) <= eps:
+        points.pop()
+
+    changed = True
+    while changed and len(points) > 3:
+        changed = False
+        for i in range(len(points)):
+            a, b, c = points[i - 1], points[i], points[(i + 1) % len(points)]
+            cross = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+            if abs(cross) <= eps:
+                del points[i]
+                changed = True
+                break
+    return points
+
+
+def _bridge_holes(outer, holes):
+    """Merge holes into the outer ring with zero-width bridges (for ear clipping)"""
+    ring = list(outer)
+    # Process holes from right to left so that bridges never cross each other
+    for hole in sorted(holes, key=lambda h: -max(p[0] for p in h)):
+        hi = max(range(len(hole)), key=lambda i: (hole[i][0], hole[i][1]))
+        hx, hy = hole[hi]
+
+        # Find the closest ring vertex the hole's rightmost vertex can see
+        best = None
+        best_dist = None
+        for i, (px, py) in enumerate(ring):
+            dist = (px - hx) ** 2 + (py - hy) ** 2
+            if best_dist is not None and dist >= best_dist:
+                continue
+            if _segment_is_clear((hx, hy), (px, py), ring, holes):
+                best, best_dist = i, dist
+        if best is None:
+            best = min(range(len(ring)), key=lambda i: (ring[i][0] - hx) ** 2 + (ring[i][1] - hy) ** 2)
+
+        rotated_hole = hole[hi:] + hole[:hi]
+        ring = ring[:best + 1] + rotated_hole + [rotated_hole[0], ring[best]] + ring[best + 1:]
+    return ring
+
+
+def _segments_cross(p1, p2, q1, q2):
+    def orient(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    d1, d2 = orient(q1, q2, p1), orient(q1, q2, p2)
+    d3, d4 = orient(p1, p2, q1), orient(p1, p2, q2)
+    return ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)) and d1 and d2 and d3 and d4
+
+
+def _segment_is_clear(a, b, ring, holes):
+    for polygon in [ring] + list(holes):
+        n = len(polygon)
+        for i in range(n):
+            q1, q2 = polygon[i], polygon[(i + 1) % n]
+            if q1 in (a, b) or q2 in (a, b):
+                continue
+            if _segments_cross(a, b, q1, q2):
+                return False
+    return True
+
+
+def triangulate_polygon(outer, holes=()):
+    """
+    Triangulate a simple polygon with optional holes (ear clipping).
+
+    Args:
+        outer: Outer ring as list of (x, y), counter-clockwise
+        holes: Hole rings as lists of (x, y), clockwise
+
+    Returns:
+        List of triangles, each a triple of (x, y) points (counter-clockwise)
+    """
+    ring = _bridge_holes(list(outer), [list(h) for h in holes]) if holes else list(outer)
+    indices = list(range(len(ring)))
+    triangles = []
+
+    def cross(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    def contains(a, b, c, p):
+        return cross(a, b, p) >= 0 and cross(b, c, p) >= 0 and cross(c, a, p) >= 0
+
+    guard = 0
+    while len(indices) > 3 and guard < len(indices):
+        n = len(indices)
+        for k in range(n):
+            ia, ib, ic = indices[k - 1], indices[k], indices[(k + 1) % n]
+            a, b, c = ring[ia], ring[ib], ring[ic]
+            area = cross(a, b, c)
+            if area <= 0:
+                continue
+            # An ear must not contain any other (distinct) vertex
+            blocked = False
+            for j in indices:
+                p = ring[j]
+                if j in (ia, ib, ic) or p == a or p == b or p == c:
+                    continue
+                if contains(a, b, c, p):
+                    blocked = True
+                    break
+            if blocked:
+                continue
+            triangles.append((a, b, c))
+            del indices[k]
+            guard = 0
+            break
+        else:
+            # No ear found (degenerate input) - drop the flattest vertex and carry on
+            k = min(range(n), key=lambda k: abs(cross(ring[indices[k - 1]], ring[indices[k]], ring[indices[(k + 1) % n]])))
+            del indices[k]
+            guard += 1
+
+    if len(indices) == 3:
+        a, b, c = (ring[i] for i in indices)
+        if cross(a, b, c) > 0:
+            triangles.append((a, b, c))
+    return triangles
+
+
+def extrude_polygon(outer, holes=(), height=1.0, z=0.0, triangles=None):
+    """
+    Extrude a 2D polygon (with holes) into a closed solid.
+
+    Args:
+        outer: Outer ring (counter-clockwise)
+        holes: Hole rings (clockwise)
+        height: Extrusion height
+        z: Z coordinate of the bottom face
+        triangles: Optional precomputed triangulation of the cap
+
+    Returns:
+        Mesh
+    """
+    if triangles is None:
+        triangles = triangulate_polygon(outer, holes)
+
+    mesh = Mesh()
+    vertices = mesh.vertices
+    faces = mesh.faces
+    index = {}
+
+    def vid(x, y, zz):
+        key = (x, y, zz)
+        i = index.get(key)
+        if i is None:
+            i = index[key] = len(vertices)
+            vertices.append(key)
+        return i
+
+    top = z + height
+    for a, b, c in triangles:
+        faces.append((vid(a[0], a[1], top), vid(b[0], b[1], top), vid(c[0], c[1], top)))
+        faces.append((vid(a[0], a[1], z), vid(c[0], c[1], z), vid(b[0], b[1], z)))
+
+    for ring in [outer] + list(holes):
+        n = len(ring)
+        for i in range(n):
+            (ax, ay), (bx, by) = ring[i], ring[(i + 1) % n]
+            a0, b0 = vid(ax, ay, z), vid(bx, by, z)
+            a1, b1 = vid(ax, ay, top), vid(bx, by, top)
+            faces.append((a0, b0, b1))
+            faces.append((a0, b1, a1))
+    return mesh
+
+
+def box(x, y, z, sx, sy, sz):
+    """Axis-aligned box with its minimum corner at (x, y, z)"""
+    outer = [(x, y), (x + sx, y), (x + sx, y + sy), (x, y + sy)]
+    return extrude_polygon(outer, height=sz, z=z, triangles=[(outer[0], outer[1], outer[2]), (outer[0], outer[2], outer[3])])
+
+
+def _convex_hull(points):
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 1e-12:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 1e-12:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def circle_points(cx, cy, radius, segments=8):
+    """Regular polygon matching OpenSCAD's circle/cylinder with $fn=segments (counter-clockwise)"""
+    return [(cx + radius * math.cos(2 * math.pi * i / segments),
+             cy + radius * math.sin(2 * math.pi * i / segments)) for i in range(segments)]
+
+
+def rounded_rectangle(width, length, radius, segments=8):
+    """
+    Outline of the SCAD `rounded_square` module (hull of four corner cylinders).
+
+    Returns:
+        Counter-clockwise list of (x, y) points
+    """
+    if radius <= 0:
+        return [(0.0, 0.0), (width, 0.0), (width, length), (0.0, length)]
+    points = []
+    for cx, cy in ((radius, radius), (width - radius, radius),
+                   (radius, length - radius), (width - radius, length - radius)):
+        points.extend(circle_points(cx, cy, radius, segments))
+    return _convex_hull(points)
+
+
+def relief_mesh(matrix, pixel_size, height):
+    """
+    Raised QR modules as boxes, merged into maximal rectangles.
+
+    Uses the same layout as the SCAD `qr_pattern` module (row 0 at the top,
+    i.e. Y is flipped), so the result can be placed at (qr_offset_x, qr_offset_y).
+    """
+    rows = len(matrix)
+    cols = len(matrix[0]) if rows > 0 else 0
+    mesh = Mesh()
+
+    # Greedy merge: horizontal runs first, then extend identical runs downwards
+    used = [[False] * cols for _ in range(rows)]
+    for row in range(rows):
+        col = 0
+        while col < cols:
+            if not matrix[row][col] or used[row][col]:
+                col += 1
+                continue
+            end = col
+            while end < cols and matrix[row][end] and not used[row][end]:
+                end += 1
+            bottom = row + 1
+            while bottom < rows and all(matrix[bottom][c] and not used[bottom][c] for c in range(col, end)):
+                bottom += 1
+            for r in range(row, bottom):
+                for c in range(col, end):
+                    used[r][c] = True
+            x = col * pixel_size
+            y = (rows - bottom) * pixel_size  # Flip Y axis
+            mesh.extend(box(x, y, 0.0, (end - col) * pixel_size, (bottom - row) * pixel_size, height))
+            col = end
+    return mesh
@@ -0,0 +1,121 @@
+"""
+OpenSCAD capability probing
+
+Runs the OpenSCAD binary once per process (`--version`, `--help`) and picks the
+fastest render options it supports:
+
+    --backend=manifold   (OpenSCAD 2024.10+ / recent nightlies)
+    --enable=manifold    (2023-2024 nightlies)
+    --enable=fast-csg    (2022-2023 nightlies)
+    --enable=lazy-union  (where available, in addition)
+
+Older releases (e.g. 2021.01) get no extra flags.
+"""
+
+import re
+import subprocess
+from functools import lru_cache
+
+# Seconds to wait for `openscad --version` / `--help`
+PROBE_TIMEOUT = 10
+
+# Messages of OpenSCAD (option parser, --enable/--backend checks) for flags it does not support
+FLAG_ERRORS = ('unrecognised option', 'unrecognized option', 'unknown option', 'invalid option',
+               'unknown feature', 'unknown backend', 'not supported')
+
+
+def parse_version(text):
+    """Version tuple from `openscad --version` output, e.g. (2021, 1) or (2024, 12, 6); None if unknown"""
+    match = re.search(r'version\s+(\d{4})\.(\d+)(?:\.(\d+))?', text, re.IGNORECASE)
+    if not match:
+        return None
+    return tuple(int(part) for part in match.groups() if part is not None)
+
+
+def _option_block(help_text, option):
+    """Description text of one option in `openscad --help` output (continuation lines included)"""
+    match = re.search(rf'^\s*{re.escape(option)}\b(.*(?:\n(?!\s*-).*)*)', help_text, re.MULTILINE)
+    return match.group(1) if match else ''
+
+
+def parse_help(help_text):
+    """
+    Render backends and experimental features listed in `openscad --help` output.
+
+    Returns:
+        (backends, features) - sets of lowercase names
+    """
+    backends = set()
+    block = _option_block(help_text, '--backend')
+    if block:
+        backends = {name.lower() for name in re.findall(r"'([A-Za-z]+)'", block)}
+
+    features = set()
+    block = _option_block(help_text, '--enable')
+    if ':' in block:
+        features = set(re.findall(r'[a-z][a-z0-9-]*[a-z0-9]', block.split(':', 1)[1]))
+    return backends, features
+
+
+@lru_cache(maxsize=None)
+def probe_openscad(binary):
+    """
+    Query version and features of an OpenSCAD binary (cached per binary and process).
+
+    Returns:
+        Dict with keys binary, version (tuple or None), backends, features (sets);
+        None if the binary cannot be run
+    """
+    try:
+        version = subprocess.run([binary, '--version'], capture_output=True, text=True,
+                                 timeout=PROBE_TIMEOUT)
+        usage = subprocess.run([binary, '--help'], capture_output=True, text=True,
+                               timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    # Older versions print version and help to stderr
+    backends, features = parse_help(usage.stdout + usage.stderr)
+    return {
+        'binary': binary,
+        'version': parse_version(version.stdout + version.stderr),
+        'backends': backends,
+        'features': features,
+    }
+
+
+def render_flags(capabilities):
+    """Fastest supported render flags for probed capabilities (empty list if none/unknown)"""
+    if not capabilities:
+        return []
+
+    flags = []
+    if 'manifold' in capabilities['backends']:
+        flags.append('--backend=manifold')
+    elif 'manifold' in capabilities['features']:
+        flags.append('--enable=manifold')
+    elif 'fast-csg' in capabilities['features']:
+        flags.append('--enable=fast-csg')
+
+    # Skips the implicit top-level union; the model is a single top-level object anyway
+    if 'lazy-union' in capabilities['features']:
+        flags.append('--enable=lazy-union')
+    return flags
+
+
+def rejects_flags(stderr, flags):
+    """True if a failed render's stderr says one of the render flags is unknown or unsupported"""
+    text = (stderr or '').lower()
+    if not flags or not any(message in text for message in FLAG_ERRORS):
+        return False
+    return any(flag.split('=')[0] in text or flag.split('=')[-1] in text for flag in flags)
+
+
+def render_info(binary):
+    """Render settings for metadata: OpenSCAD version and chosen flags"""
+    capabilities = probe_openscad(binary)
+    version = capabilities['version'] if capabilities else None
+    return {
+        'openscad_version': '.'.join([str(version[0])] + [f"{part:02d}" for part in version[1:]]) if version else None,
+        'openscad_flags': render_flags(capabilities),
+    }
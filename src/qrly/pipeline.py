@@ -0,0 +1,404 @@
+"""
+Incremental model pipeline
+
+The model is built as a small graph of memoized stages:
+
+    input → matrix → dimensions → base / relief / text meshes → model
+                                → scad
+                                → preview (rasterized image)
+
+Each stage is keyed on exactly the parameters (and upstream results) it uses,
+so changing one parameter only recomputes the stages downstream of it:
+changing the text never resamples the image, changing the corner radius
+never rebuilds the QR relief.
+
+The graph is shared between threads (GUI, preview and job preparation): its
+lock only guards the memo tables, stages are computed outside it, and callers
+asking for a key that is being computed wait for that key only.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .generator import QRModelGenerator
+from .matrix import matrix_hash
+from .mesh import Mesh
+from .qr_encode import DEFAULT_MIN_FEATURE_MM, encoding_for, qr_matrix
+
+# Parameters understood by the pipeline (GUI parameter names)
+DEFAULT_PARAMS = {
+    'input': '',
+    'mode': 'square',
+    'text_content': '',
+    'text_content_top': '',
+    'text_rotation': 0,
+    'height': 0.5,
+    'margin': 2.0,
+    'relief': 0.5,
+    'corner_radius': 2,
+    'size_scale': 1.0,
+    'ecc': 'H',  # QR error correction for URL inputs: 'L', 'M', 'Q', 'H' or 'auto' (see qr_encode)
+    'min_feature': DEFAULT_MIN_FEATURE_MM,
+    'threshold': 'auto',  # Binarization of image inputs (see ingest.binarize)
+}
+
+# Parameters the SCAD code depends on (job settings carry more, e.g. output_name or shared stages)
+SCAD_PARAMS = tuple(DEFAULT_PARAMS) + ('deterministic',)
+
+# Stages handed to job workers with the settings (small and picklable, see export_stages)
+SHARED_STAGES = ('input', 'matrix', 'dimensions', 'scad')
+
+
+class _InFlight:
+    """Result of a stage key being computed by another thread"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class StageGraph:
+    """Memoized stages with explicit keys; each stage keeps its last few results"""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._stages = {}
+        self._memo = {}
+        self._in_flight = {}  # Stage key → _InFlight while it is computed
+        self._lock = threading.Lock()  # Guards _memo, _in_flight and computed (never held while computing)
+        self.computed = []  # Names of (re)computed stages, in order - useful for debugging and tests
+
+    def add_stage(self, name, key, compute):
+        """
+        Register a stage.
+
+        Args:
+            name: Stage name
+            key: key(params, get) -> hashable key of everything the stage depends on
+            compute: compute(params, get) -> stage value
+
+        `get(name)` returns the value of another stage for the same parameters.
+        """
+        self._stages[name] = (key, compute)
+        self._memo[name] = OrderedDict()
+
+    def key(self, name, params):
+        """Key of a stage for the given parameters (computes upstream stages if needed)"""
+        key_fn, _ = self._stages[name]
+        return (name, key_fn(params, lambda dep: self.get(dep, params)))
+
+    def get(self, name, params):
+        """Value of a stage, recomputed only if its key changed"""
+        _, compute_fn = self._stages[name]
+        key = self.key(name, params)
+        with self._lock:
+            memo = self._memo[name]
+            if key in memo:
+                memo.move_to_end(key)
+                return memo[key]
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = _InFlight()
+        if not owner:
+            return pending.result()  # Computed by another thread
+
+        try:
+            value = compute_fn(params, lambda dep: self.get(dep, params))
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            pending.error = e
+            pending.done.set()
+            raise
+        with self._lock:
+            self.computed.append(name)
+            self._store(key, value)
+            del self._in_flight[key]
+        pending.value = value
+        pending.done.set()
+        return value
+
+    def _store(self, key, value):
+        memo = self._memo[key[0]]
+        memo[key] = value
+        memo.move_to_end(key)
+        if len(memo) > self.max_entries:
+            memo.popitem(last=False)
+
+    def seed(self, key, value):
+        """Store a value computed elsewhere under its stage key (as returned by key())"""
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, name=None):
+        """Drop memoized results of one stage (or all stages)"""
+        with self._lock:
+            for stage, memo in self._memo.items():
+                if name is None or stage == name:
+                    memo.clear()
+
+
+class PipelineGenerator(QRModelGenerator):
+    """QRModelGenerator that takes matrix, dimensions, meshes and SCAD code from a pipeline"""
+
+    def __init__(self, pipeline, params, image_path, mode='square', output_dir='.', output_name=None):
+        super().__init__(image_path, mode, output_dir, output_name)
+        self.pipeline = pipeline
+        self.params = params
+
+    def load_and_process_image(self):
+        result = self.pipeline.get('matrix', self.params)
+        self.threshold_used = result['threshold']
+        return result['matrix'], result['width'], result['height']
+
+    def calculate_dimensions(self, qr_pixels):
+        result = self.pipeline.get('dimensions', self.params)
+        self.text_size = result['text_size']
+        self._scaled_text_margin = result['scaled_text_margin']
+        return dict(result['dimensions'])
+
+    def build_meshes(self, matrix, dimensions):
+        return {part: self.pipeline.get(part, self.params) for part in ('base', 'relief', 'text')}
+
+    def build_mesh(self, matrix, dimensions, meshes=None):
+        return self.pipeline.get('model', self.params)
+
+    def generate_openscad(self, matrix, dimensions, merge_runs=False):
+        if merge_runs:
+            return super().generate_openscad(matrix, dimensions, merge_runs=True)
+        return self.pipeline.get('scad', self.params)
+
+
+class ModelPipeline:
+    """Memoized input → matrix → dimensions → meshes/SCAD pipeline (one per GUI window)"""
+
+    def __init__(self):
+        self.graph = StageGraph()
+        self._work_dir = None
+        self._work_dir_lock = threading.Lock()  # Stages run concurrently (see StageGraph)
+        self._encodings = {}  # Generated QR image path → encoding chosen for it
+
+        self.graph.add_stage('input', self._input_key, self._compute_input)
+        self.graph.add_stage('matrix', self._matrix_key, self._compute_matrix)
+        self.graph.add_stage('dimensions', self._dimensions_key, self._compute_dimensions)
+        self.graph.add_stage('base', self._base_key, self._compute_base)
+        self.graph.add_stage('relief', self._relief_key, self._compute_relief)
+        self.graph.add_stage('text', self._text_key, self._compute_text)
+        self.graph.add_stage('model', self._model_key, self._compute_model)
+        self.graph.add_stage('scad', self._scad_key, self._compute_scad)
+        self.graph.add_stage('preview', self._preview_key, self._compute_preview)
+
+    @staticmethod
+    def normalize(params):
+        """Fill in defaults for missing parameters"""
+        merged = dict(DEFAULT_PARAMS)
+        merged.update(params)
+        return merged
+
+    def get(self, stage, params):
+        """Value of a stage ('input', 'matrix', 'dimensions', 'base', 'relief', 'text', 'model', 'scad', 'preview')"""
+        return self.graph.get(stage, self.normalize(params))
+
+    def make_generator(self, params, output_dir='.', output_name=None):
+        """Generator configured from params that reuses this pipeline's stages"""
+        params = self.normalize(params)
+        generator = PipelineGenerator(self, params, self.get('input', params), params['mode'],
+                                      output_dir, output_name)
+        self._configure(generator, params)
+        generator.move_input = False  # Keep the (cached) input for later runs
+        generator.qr_encoding = self._encodings.get(str(generator.image_path))
+        return generator
+
+    def export_stages(self, params, stages=SHARED_STAGES):
+        """
+        Stage results for params (computed if needed) to seed a worker's pipeline.
+
+        Returns:
+            Picklable dict for import_stages()
+        """
+        params = self.normalize(params)
+        exported = [(self.graph.key(name, params), self.graph.get(name, params)) for name in stages]
+        input_path = str(self.get('input', params))
+        encodings = {input_path: self._encodings[input_path]} if input_path in self._encodings else {}
+        return {'stages': exported, 'encodings': encodings}
+
+    def import_stages(self, exported):
+        """Reuse stage results of another pipeline (see export_stages) instead of recomputing them"""
+        for key, value in exported['stages']:
+            self.graph.seed(key, value)
+        self._encodings.update(exported['encodings'])
+
+    def cleanup(self):
+        """Remove temporary files (QR images generated from URLs)"""
+        if self._work_dir is not None:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+            self._work_dir = None
+            self._encodings.clear()
+        self.graph.invalidate()
+
+    # Helpers
+
+    @staticmethod
+    def _configure(generator, params):
+        generator.mode = params['mode']
+        generator.text_content = params['text_content']
+        generator.text_content_top = params['text_content_top']
+        generator.text_rotation = params['text_rotation']
+        generator.deterministic = params.get('deterministic', False)
+        generator.check_input = params.get('check', True)
+        generator.split_bodies = params.get('bodies', False)
+        generator.three_mf = params.get('3mf', False)
+        generator.compact_output = params.get('compact', True)
+        generator.apply_params(params)
+        generator.auto_adjust_relief()
+        return generator
+
+    def _generator(self, params, get):
+        generator = QRModelGenerator(get('input'), params['mode'])
+        return self._configure(generator, params)
+
+    def _hole(self, params, get):
+        dimensions = get('dimensions')['dimensions']
+        return self._generator(params, get).hole_geometry(dimensions)
+
+    # Stages
+
+    @staticmethod
+    def _input_key(params, get):
+        text = params['input']
+        if QRModelGenerator.is_url(text):
+            if params['ecc'] == 'auto':
+                # Optimized for the QR area size (mode, size, margin) and printer resolution
+                return ('url', text, 'auto', params['min_feature'], params['mode'], params['size_scale'],
+                        params['margin'])
+            return ('url', text, params['ecc'])
+        try:
+            stat = os.stat(text)
+        except OSError:
+            return ('file', text, None)
+        return ('file', os.path.abspath(text), stat.st_mtime_ns, stat.st_size)
+
+    def _compute_input(self, params, get):
+        text = params['input']
+        if QRModelGenerator.is_url(text):
+            with self._work_dir_lock:
+                if self._work_dir is None:
+                    self._work_dir = Path(tempfile.mkdtemp(prefix='qrly_pipeline_'))
+            name = hashlib.sha1(repr(self._input_key(params, get)).encode('utf-8')).hexdigest()[:16]
+            probe = self._configure(QRModelGenerator(text, params['mode']), params)
+            encoding = encoding_for(probe, text, params['ecc'], params['min_feature'])
+            path = QRModelGenerator.generate_qr_image(encoding['data'], self._work_dir / f"{name}.png",
+                                                      encoding['ecc'], encoding['version'])
+            self._encodings[str(path)] = encoding
+            return path
+        if not os.path.exists(text):
+            raise FileNotFoundError(f"Image file not found: {text}")
+        return text
+
+    @classmethod
+    def _matrix_key(cls, params, get):
+        return cls._input_key(params, get) + (params['threshold'],)
+
+    def _compute_matrix(self, params, get):
+        encoding = self._encodings.get(str(get('input')))
+        if encoding is not None:
+            # Generated from a URL: the encoder's exact matrix (the image is only for reference)
+            matrix = qr_matrix(encoding)
+            return {'matrix': matrix, 'width': len(matrix[0]), 'height': len(matrix), 'hash': matrix_hash(matrix),
+                    'threshold': None}
+        generator = QRModelGenerator(get('input'))
+        generator.threshold = params['threshold']
+        matrix, width, height = generator.load_and_process_image()
+        return {'matrix': matrix, 'width': width, 'height': height, 'hash': matrix_hash(matrix),
+                'threshold': generator.threshold_used}
+
+    @staticmethod
+    def _dimensions_key(params, get):
+        return (get('matrix')['width'], params['mode'], params['size_scale'], params['margin'],
+                params['text_content'], params['text_content_top'], params['text_rotation'])
+
+    def _compute_dimensions(self, params, get):
+        generator = self._generator(params, get)
+        dimensions = generator.calculate_dimensions(get('matrix')['width'])
+        return {'dimensions': dimensions, 'text_size': generator.text_size,
+                'scaled_text_margin': generator._scaled_text_margin}
+
+    def _base_key(self, params, get):
+        dimensions = get('dimensions')['dimensions']
+        return (dimensions['card_width'], dimensions['card_length'], params['height'],
+                params['corner_radius'], self._hole(params, get))
+
+    def _compute_base(self, params, get):
+        generator = self._generator(params, get)
+        return generator.build_base_mesh(get('dimensions')['dimensions'])
+
+    def _relief_key(self, params, get):
+        dimensions = get('dimensions')['dimensions']
+        generator = self._generator(params, get)
+        return (get('matrix')['hash'], dimensions['pixel_size'], dimensions['qr_offset_x'],
+                dimensions['qr_offset_y'], generator.qr_relief, params['height'], self._hole(params, get))
+
+    def _compute_relief(self, params, get):
+        generator = self._generator(params, get)
+        return generator.build_relief_mesh(get('matrix')['matrix'], get('dimensions')['dimensions'])
+
+    @staticmethod
+    def _text_key(params, get):
+        result = get('dimensions')
+        dimensions = result['dimensions']
+        return (dimensions['has_text'], dimensions['has_text_top'], params['text_content'],
+                params['text_content_top'], params['text_rotation'], result['text_size'],
+                params['relief'], params['height'],
+                dimensions['text_offset_x'], dimensions['text_offset_y'],
+                dimensions['text_offset_x_top'], dimensions['text_offset_y_top'])
+
+    def _compute_text(self, params, get):
+        generator = self._generator(params, get)
+        result = get('dimensions')
+        generator.text_size = result['text_size']
+        return generator.build_text_mesh(result['dimensions'])
+
+    def _model_key(self, params, get):
+        return tuple(self.graph.key(part, params) for part in ('base', 'relief', 'text'))
+
+    def _compute_model(self, params, get):
+        mesh = Mesh()
+        for part in ('base', 'relief', 'text'):
+            mesh.extend(get(part))
+        return mesh
+
+    def _scad_key(self, params, get):
+        return (self._input_key(params, get), get('matrix')['hash'],
+                tuple((name, params.get(name)) for name in SCAD_PARAMS))
+
+    def _compute_scad(self, params, get):
+        generator = self._generator(params, get)
+        result = get('dimensions')
+        generator.text_size = result['text_size']
+        return generator.generate_openscad(get('matrix')['matrix'], result['dimensions'])
+
+    @staticmethod
+    def _preview_key(params, get):
+        return (get('matrix')['hash'],
+                tuple(sorted((name, value) for name, value in params.items() if name != 'input')))
+
+    def _compute_preview(self, params, get):
+        from .preview import render_generator_preview
+
+        generator = self._generator(params, get)
+        result = get('dimensions')
+        generator.text_size = result['text_size']
+        return render_generator_preview(generator, get('matrix')['matrix'], dict(result['dimensions']))
@@ -0,0 +1,279 @@
+"""
+Render cost estimation and batch planning
+
+Estimates matrix size, primitive count, triangle count, render time and STL
+size of a job without rendering it. Render time and output size come from a
+linear model (value = a + b × primitives) fitted per engine to the timings of
+previous runs, recorded in ~/.cache/qrly/timings.jsonl after every export.
+Until enough timings exist, built-in defaults are used.
+"""
+
+import csv
+import json
+import re
+import time
+from pathlib import Path
+
+from .scheduler import BASE_MEMORY_MB, count_primitives, estimate_memory_mb
+
+TIMINGS_PATH = Path.home() / ".cache" / "qrly" / "timings.jsonl"
+
+# Recent timings used for calibration (per engine)
+MAX_TIMINGS = 200
+
+# Default models (intercept, slope per primitive) until calibrated
+DEFAULT_SECONDS = {'openscad-cgal': (2.0, 0.05), 'openscad-manifold': (0.5, 0.001), 'native': (0.05, 0.00005)}
+DEFAULT_BYTES_PER_TRIANGLE = {'binary': 50, 'ascii': 250}  # Native and compacted OpenSCAD STL / OpenSCAD as written
+
+# Numeric manifest columns (CSV values are strings)
+NUMERIC_KEYS = {'height': float, 'margin': float, 'relief': float, 'corner_radius': float,
+                'size_scale': float, 'text_rotation': int, 'min_feature': float}
+
+
+def engine_key(engine, flags=()):
+    """Calibration key: native, or OpenSCAD by backend"""
+    if engine == 'native':
+        return 'native'
+    return 'openscad-manifold' if any('manifold' in flag for flag in flags) else 'openscad-cgal'
+
+
+def record_timing(engine, flags, primitives, seconds, output_bytes, path=None, binary=True):
+    """
+    Append one render timing (best effort - a failing write never breaks generation).
+
+    Args:
+        primitives: Primitives of the SCAD code actually rendered
+        seconds: Render time (without post-processing such as STL compaction)
+        output_bytes: Size of the final STL
+        binary: False for OpenSCAD's ASCII STL as written (not compacted)
+    """
+    path = Path(path or TIMINGS_PATH)
+    entry = {'engine': engine_key(engine, flags), 'primitives': primitives,
+             'seconds': round(seconds, 3), 'bytes': output_bytes, 'binary': binary, 'time': int(time.time())}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+    except OSError:
+        pass
+
+
+def load_timings(path=None):
+    """Recorded timings grouped by engine key (most recent MAX_TIMINGS each)"""
+    path = Path(path or TIMINGS_PATH)
+    timings = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partially written line
+                timings.setdefault(entry['engine'], []).append(entry)
+    except OSError:
+        return {}
+    return {key: entries[-MAX_TIMINGS:] for key, entries in timings.items()}
+
+
+def fit_linear(points):
+    """Least-squares fit y = a + b·x; None if fewer than 2 distinct x values"""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    slope = max(slope, 0.0)  # Bigger models never render faster
+    return mean_y - slope * mean_x, slope
+
+
+class CostModel:
+    """Render time and output size predictions calibrated from recorded timings"""
+
+    def __init__(self, timings=None):
+        self.timings = load_timings() if timings is None else timings
+        self.seconds = {}
+        self.bytes = {}
+        for key, entries in self.timings.items():
+            seconds = fit_linear([(e['primitives'], e['seconds']) for e in entries])
+            if seconds:
+                self.seconds[key] = seconds
+            for binary in (True, False):
+                # Entries without the flag were written before OpenSCAD output was compacted (ASCII)
+                size = fit_linear([(e['primitives'], e['bytes']) for e in entries
+                                   if e.get('binary', key == 'native') == binary])
+                if size:
+                    self.bytes[key, binary] = size
+
+    def calibrated(self, key):
+        return key in self.seconds
+
+    def predict_seconds(self, key, primitives):
+        intercept, slope = self.seconds.get(key, DEFAULT_SECONDS[key])
+        return max(0.0, intercept + slope * primitives)
+
+    def predict_bytes(self, key, primitives, triangles, binary=True):
+        if (key, binary) in self.bytes:
+            intercept, slope = self.bytes[key, binary]
+            return int(max(0.0, intercept + slope * primitives))
+        return 84 + triangles * DEFAULT_BYTES_PER_TRIANGLE['binary' if binary else 'ascii']
+
+
+def estimate_job(pipeline, settings, model, flags=()):
+    """
+    Estimate one job without rendering (matrix, SCAD code and native mesh are computed).
+
+    Returns:
+        Dict with matrix, primitives, triangles, seconds, bytes, memory_mb, card (mm), calibrated
+    """
+    matrix = pipeline.get('matrix', settings)
+    dimensions = pipeline.get('dimensions', settings)['dimensions']
+    if settings.get('check', True):
+        # Bad inputs and models that would not scan fail before rendering
+        generator = pipeline.make_generator(settings)
+        generator.verify_input(matrix['matrix'])
+        generator.verify_geometry(matrix['matrix'], dimensions)
+    primitives = count_primitives(pipeline.get('scad', settings))
+
+    try:
+        triangles = pipeline.get('model', settings).triangle_count
+    except FileNotFoundError:
+        # No font for the native text mesh - count card and relief only
+        triangles = sum(pipeline.get(part, settings).triangle_count for part in ('base', 'relief'))
+
+    key = engine_key(settings.get('engine', 'openscad'), flags)
+    binary = key == 'native' or settings.get('compact', True)
+    return {
+        'matrix': f"{matrix['width']}x{matrix['height']}",
+        'primitives': primitives,
+        'triangles': triangles,
+        'seconds': model.predict_seconds(key, primitives),
+        'bytes': model.predict_bytes(key, primitives, triangles, binary),
+        'memory_mb': BASE_MEMORY_MB if key == 'native' else estimate_memory_mb(primitives, flags),
+        'card': f"{dimensions['card_width']:g}x{dimensions['card_length']:g}",
+        'calibrated': model.calibrated(key),
+    }
+
+
+def job_settings(job, output_dir, engine='openscad'):
+    """
+    Pipeline/worker settings for a job description.
+
+    Args:
+        job: Dict with CLI-style keys (input, mode, text, text_top, text_rotation, name, engine)
+             and optional pipeline parameters (height, margin, relief, corner_radius, size_scale)
+        output_dir: Output directory
+        engine: Default render engine
+    """
+    from .generator import QRModelGenerator
+    from .pipeline import DEFAULT_PARAMS
+
+    mode = job.get('mode', 'square')
+    rotation = job.get('text_rotation', 0)
+    if mode in ['pendant-text', 'rectangle-text-2x']:
+        rotation = 180  # Always rotated for these modes (like the single-job CLI)
+
+    name = job.get('name')
+    if not name and QRModelGenerator.is_url(job['input']):
+        name = re.sub(r'[^\w\-]', '_', job['input'])[:50]
+
+    settings = {key: job[key] for key in DEFAULT_PARAMS if key in job}
+    settings.update({
+        'input': job['input'],
+        'mode': mode,
+        'text_content': job.get('text', '').strip(),
+        'text_content_top': job.get('text_top', '').strip() if mode == 'rectangle-text-2x' else '',
+        'text_rotation': rotation,
+        'output_name': name or Path(job['input']).stem,
+        'output_dir': str(output_dir),
+        'engine': job.get('engine', engine),
+    })
+    return settings
+
+
+def load_jobs(path):
+    """Jobs from a manifest: JSON list of objects, JSON Lines (one object per line) or CSV with a header row"""
+    text = Path(path).read_text(encoding='utf-8-sig')
+    if Path(path).suffix.lower() == '.csv':
+        jobs = []
+        for row in csv.DictReader(text.splitlines()):
+            job = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for key, convert in NUMERIC_KEYS.items():
+                if key in job:
+                    job[key] = convert(job[key])
+            jobs.append(job)
+    elif text.lstrip().startswith('['):
+        jobs = json.loads(text)
+    else:
+        jobs = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for number, job in enumerate(jobs, 1):
+        if 'input' not in job:
+            raise ValueError(f"Job {number} in {path} has no 'input'")
+    return jobs
+
+
+def plan_jobs(jobs_settings, model=None):
+    """
+    Estimate all jobs and order them longest-first.
+
+    Returns:
+        List of (settings, estimate) pairs; estimate has an 'error' key if the job cannot be built
+    """
+    from .generator import find_openscad_binary
+    from .openscad import probe_openscad, render_flags
+    from .pipeline import ModelPipeline
+
+    model = model or CostModel()
+    flags = []
+    if any(settings.get('engine', 'openscad') == 'openscad' for settings in jobs_settings):
+        flags = render_flags(probe_openscad(find_openscad_binary()))
+
+    planned = []
+    pipeline = ModelPipeline()
+    try:
+        for settings in jobs_settings:
+            try:
+                estimate = estimate_job(pipeline, settings, model, flags)
+            except Exception as e:
+                estimate = {'error': str(e), 'seconds': 0.0}
+            planned.append((settings, estimate))
+    finally:
+        pipeline.cleanup()
+
+    planned.sort(key=lambda item: item[1]['seconds'], reverse=True)
+    return planned
+
+
+def makespan(seconds, workers):
+    """Predicted wall time of jobs run longest-first on a worker pool (greedy packing)"""
+    loads = [0.0] * max(1, workers)
+    for duration in sorted(seconds, reverse=True):
+        loads[loads.index(min(loads))] += duration
+    return max(loads)
+
+
+def print_plan(planned, workers=1):
+    """Print a plan table (longest job first) with totals"""
+    print(f"{'#':>3}  {'Job':<30} {'Matrix':>7} {'Card mm':>9} {'Primitives':>10} "
+          f"{'Triangles':>10} {'Time':>8} {'Size':>9}")
+    for number, (settings, estimate) in enumerate(planned, 1):
+        name = settings['output_name'][:30]
+        if 'error' in estimate:
+            print(f"{number:>3}  {name:<30} ❌ {estimate['error']}")
+            continue
+        marker = '' if estimate['calibrated'] else '*'
+        print(f"{number:>3}  {name:<30} {estimate['matrix']:>7} {estimate['card']:>9} "
+              f"{estimate['primitives']:>10,} {estimate['triangles']:>10,} "
+              f"{estimate['seconds']:>7.1f}s{marker} {estimate['bytes'] / (1024 * 1024):>6.1f} MB")
+
+    ok = [estimate for _, estimate in planned if 'error' not in estimate]
+    total = sum(estimate['seconds'] for estimate in ok)
+    size = sum(estimate['bytes'] for estimate in ok)
+    print()
+    print(f"Total: {len(ok)} jobs, {size / (1024 * 1024):.1f} MB, {total:.1f}s sequential, "
+          f"~{makespan([e['seconds'] for e in ok], workers):.1f}s on {workers} worker(s)")
+    if any(not estimate['calibrated'] for estimate in ok):
+        print("* Default estimate (no recorded timings for this engine yet)")
@@ -0,0 +1,195 @@
+"""
+Base plate mesh cache
+
+The card plate (rounded_square hull plus pendant hole) only depends on a few
+parameters and there are only a handful of presets in practice, so plates are
+cached in memory and on disk and reused for every model.
+"""
+
+import hashlib
+import os
+import struct
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from .mesh import Mesh, circle_points, extrude_polygon, rounded_rectangle
+
+# Default on-disk cache location in user's home folder
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "qrly" / "plates"
+
+# Presets offered by the GUI (size buttons, thickness buttons, model types)
+PRESET_SIZES = [0.5, 1.0, 2.0]
+PRESET_THICKNESSES = [0.5, 1.0, 1.5]
+PRESET_MODES = ['square', 'pendant', 'rectangle-text', 'pendant-text', 'rectangle-text-2x']
+
+# Longest text label accepted by the CLI and GUI
+MAX_TEXT_LENGTH = 20
+
+_MAGIC = b'QRLYPLT1'
+
+
+def plate_key(card_width, card_length, card_height, corner_radius, segments, hole=None):
+    """Stable cache key for a plate (floats rounded to 1 µm)"""
+    values = [card_width, card_length, card_height, corner_radius, segments]
+    if hole:
+        values.extend(hole)
+    text = ','.join(f"{float(v):.3f}" for v in values)
+    return hashlib.sha1(text.encode('ascii')).hexdigest()[:20]
+
+
+def build_plate(card_width, card_length, card_height, corner_radius, segments, hole=None):
+    """Build the base card mesh (rounded rectangle, optional chain hole as (x, y, diameter))"""
+    outline = rounded_rectangle(card_width, card_length, corner_radius, segments)
+    holes = []
+    if hole:
+        hole_x, hole_y, hole_d = hole
+        holes.append(list(reversed(circle_points(hole_x, hole_y, hole_d / 2, segments))))
+    return extrude_polygon(outline, holes, height=card_height)
+
+
+def save_mesh(mesh, path):
+    """Write mesh in a compact binary format (atomic replace)"""
+    coords = array('d', (c for v in mesh.vertices for c in v))
+    indices = array('I', (i for f in mesh.faces for i in f))
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        coords.byteswap()
+        indices.byteswap()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+    with open(tmp_path, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<II', len(mesh.vertices), len(mesh.faces)))
+        f.write(coords.tobytes())
+        f.write(indices.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_mesh(path):
+    """Read a mesh written by save_mesh()"""
+    data = Path(path).read_bytes()
+    if data[:8] != _MAGIC:
+        raise ValueError(f"Not a plate cache file: {path}")
+    num_vertices, num_faces = struct.unpack_from('<II', data, 8)
+    coords = array('d')
+    coords.frombytes(data[16:16 + 24 * num_vertices])
+    indices = array('I')
+    indices.frombytes(data[16 + 24 * num_vertices:16 + 24 * num_vertices + 12 * num_faces])
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        coords.byteswap()
+        indices.byteswap()
+    vertices = [tuple(coords[i:i + 3]) for i in range(0, len(coords), 3)]
+    faces = [tuple(indices[i:i + 3]) for i in range(0, len(indices), 3)]
+    return Mesh(vertices, faces)
+
+
+class PlateCache:
+    """Two-level (memory LRU + disk) cache of base plate meshes"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=64):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, card_width, card_length, card_height, corner_radius, segments, hole=None):
+        """
+        Get a plate mesh, building and storing it on a miss.
+
+        The returned mesh is shared - do not modify it in place.
+        """
+        key = plate_key(card_width, card_length, card_height, corner_radius, segments, hole)
+
+        mesh = self._memory.get(key)
+        if mesh is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return mesh
+
+        path = self.cache_dir / f"{key}.plate" if self.cache_dir else None
+        if path is not None and path.exists():
+            try:
+                mesh = load_mesh(path)
+                self.hits += 1
+            except (OSError, ValueError):
+                mesh = None
+
+        if mesh is None:
+            self.misses += 1
+            mesh = build_plate(card_width, card_length, card_height, corner_radius, segments, hole)
+            if path is not None:
+                try:
+                    save_mesh(mesh, path)
+                except OSError:
+                    pass  # Disk cache is best-effort
+
+        self._memory[key] = mesh
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        return mesh
+
+    def clear_memory(self):
+        """Drop in-memory entries (disk entries stay)"""
+        self._memory.clear()
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Process-wide plate cache"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PlateCache()
+    return _default_cache
+
+
+def _labels(mode):
+    """(bottom, top) label texts covering every card length a mode can have"""
+    if mode not in ['rectangle-text', 'pendant-text', 'rectangle-text-2x']:
+        return [('', '')]
+    # Card length follows the text size, which follows the label length (see calculate_text_size)
+    texts = [''] + ['X' * length for length in range(1, MAX_TEXT_LENGTH + 1)]
+    if mode == 'rectangle-text-2x':
+        return [(bottom, top) for bottom in texts for top in texts]
+    return [(bottom, '') for bottom in texts]
+
+
+def warm_up(cache=None, corner_radius=2, qr_margin=2.0):
+    """
+    Precompute plates for all preset combinations (size × thickness × mode × card length).
+
+    Text modes get a plate for every card length their labels can produce
+    (no label up to MAX_TEXT_LENGTH characters).
+
+    Returns:
+        Number of distinct plates in the cache after warm-up
+    """
+    from .generator import CURVE_SEGMENTS, QRModelGenerator
+
+    cache = cache or get_default_cache()
+    keys = set()
+    for mode in PRESET_MODES:
+        for size_scale in PRESET_SIZES:
+            for card_height in PRESET_THICKNESSES:
+                for bottom, top in _labels(mode):
+                    generator = QRModelGenerator('preset.png', mode)
+                    generator.size_scale = size_scale
+                    generator.card_height = card_height
+                    generator.corner_radius = corner_radius
+                    generator.qr_margin = qr_margin
+                    generator.text_content = bottom
+                    generator.text_content_top = top
+
+                    dimensions = generator.calculate_dimensions(50)
+                    hole = generator.hole_geometry(dimensions)
+                    args = (dimensions['card_width'], dimensions['card_length'], card_height,
+                            corner_radius, CURVE_SEGMENTS, hole)
+                    key = plate_key(*args)
+                    if key not in keys:
+                        cache.get(*args)
+                        keys.add(key)
+    return len(keys)
@@ -0,0 +1,234 @@
+"""
+Instant preview rasterizer
+
+Draws a shaded orthographic view of the model straight from the computed
+geometry (dimensions, module matrix, text labels, hole) with Pillow - no
+OpenSCAD involved, so it is fast enough to update live while parameters change.
+
+The view matches the OpenSCAD preview camera: seen from above at an angle and
+turned 180° around Z (hole at the top, 180°-rotated text readable).
+"""
+
+import math
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from .fonts import SIZE_TO_EM, TEXT_SPACING, find_font_file
+from .mesh import circle_points, rounded_rectangle
+
+# Colors (white card with black QR code and text on a dark background)
+BACKGROUND_COLOR = (40, 44, 60)
+CARD_TOP_COLOR = (245, 245, 245)
+CARD_SIDE_COLOR = (180, 180, 186)
+RELIEF_TOP_COLOR = (30, 30, 30)
+RELIEF_SIDE_COLOR = (90, 90, 95)
+
+# Camera tilt from straight top-down view (degrees)
+VIEW_TILT = 35
+
+# Supersampling factor for anti-aliasing
+SUPERSAMPLE = 2
+
+
+class _View:
+    """Orthographic projection: model (x, y, z) in mm → image pixels"""
+
+    def __init__(self, card_width, card_length, max_z, size):
+        self.card_width = card_width
+        self.card_length = card_length
+        self.cos_t = math.cos(math.radians(VIEW_TILT))
+        self.sin_t = math.sin(math.radians(VIEW_TILT))
+        width, height = size
+
+        view_height = card_length * self.cos_t + max_z * self.sin_t
+        self.scale = 0.85 * min(width / card_width, height / view_height)
+        self.origin_x = (width - card_width * self.scale) / 2
+        self.origin_y = (height + view_height * self.scale) / 2
+
+    def point(self, x, y, z):
+        # Turned 180° around Z like the OpenSCAD preview camera
+        vx = self.card_width - x
+        vy = self.card_length - y
+        return (self.origin_x + vx * self.scale,
+                self.origin_y - (vy * self.cos_t + z * self.sin_t) * self.scale)
+
+    def polygon(self, points, z):
+        return [self.point(x, y, z) for x, y in points]
+
+    def rect(self, x0, y0, x1, y1, z):
+        """Screen rectangle [left, top, right, bottom] of a model rectangle at height z"""
+        u0, v0 = self.point(x0, y0, z)
+        u1, v1 = self.point(x1, y1, z)
+        return [min(u0, u1), min(v0, v1), max(u0, u1), max(v0, v1)]
+
+
+def _runs(matrix):
+    """Horizontal runs of raised modules as (row, start_col, end_col)"""
+    for row, cells in enumerate(matrix):
+        col = 0
+        cols = len(cells)
+        while col < cols:
+            if cells[col]:
+                start = col
+                while col < cols and cells[col]:
+                    col += 1
+                yield row, start, col
+            else:
+                col += 1
+
+
+def _text_tile(text, size_px, font_path):
+    """
+    Render a text label as an L-mode mask laid out like OpenSCAD's text().
+
+    Args:
+        text: Label text
+        size_px: text() size in pixels (rendered at size_px * SIZE_TO_EM em, like OpenSCAD)
+        font_path: TTF file
+
+    Returns:
+        (mask, width_px, height_px) - width is the advance width (halign=center),
+        height is the ink height (valign=bottom)
+    """
+    font = ImageFont.truetype(font_path, max(1, int(round(size_px * SIZE_TO_EM))))
+    advances = [font.getlength(char) * TEXT_SPACING for char in text]
+    width = max(1, int(math.ceil(sum(advances))))
+    ascent, descent = font.getmetrics()
+    pad = int(size_px) // 2 + 1  # Room for glyph overhangs while drawing
+
+    tile = Image.new('L', (width + pad * 2, ascent + descent), 0)
+    draw = ImageDraw.Draw(tile)
+    pen = pad
+    for char, advance in zip(text, advances):
+        draw.text((pen, 0), char, fill=255, font=font)
+        pen += advance
+
+    bbox = tile.getbbox()
+    if bbox is None:
+        return None, width, 0
+    # Keep advance-based horizontal extent, crop vertically to the ink
+    tile = tile.crop((pad, bbox[1], pad + width, bbox[3]))
+    return tile, width, bbox[3] - bbox[1]
+
+
+def render_preview(matrix, dimensions, card_height, qr_relief, corner_radius=2,
+                   hole=None, texts=(), size=(800, 800)):
+    """
+    Render a shaded preview image of the model.
+
+    Args:
+        matrix: Module matrix (rows of booleans, True = raised)
+        dimensions: Output of QRModelGenerator.calculate_dimensions()
+        card_height: Base card thickness in mm
+        qr_relief: Height of the raised QR modules in mm
+        corner_radius: Corner radius of the card in mm
+        hole: Optional (x, y, diameter) of the chain hole
+        texts: Iterable of dicts with keys text, size, height, x, y, rotation
+        size: Output image size in pixels
+
+    Returns:
+        RGB PIL Image
+    """
+    card_width = dimensions['card_width']
+    card_length = dimensions['card_length']
+    max_relief = max([qr_relief] + [t['height'] for t in texts])
+
+    render_size = (size[0] * SUPERSAMPLE, size[1] * SUPERSAMPLE)
+    view = _View(card_width, card_length, card_height + max_relief, render_size)
+    image = Image.new('RGB', render_size, BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+
+    # Base card: bottom outline in side color, top outline over it
+    outline = rounded_rectangle(card_width, card_length, corner_radius, 32)
+    draw.polygon(view.polygon(outline, 0.0), fill=CARD_SIDE_COLOR)
+    draw.polygon(view.polygon(outline, card_height), fill=CARD_TOP_COLOR)
+
+    # Chain hole: inner wall where top and bottom openings overlap, background below
+    if hole:
+        hole_x, hole_y, hole_d = hole
+        ring = circle_points(hole_x, hole_y, hole_d / 2, 32)
+        draw.polygon(view.polygon(ring, card_height), fill=CARD_SIDE_COLOR)
+        top_mask = Image.new('L', render_size, 0)
+        ImageDraw.Draw(top_mask).polygon(view.polygon(ring, card_height), fill=255)
+        bottom_mask = Image.new('L', render_size, 0)
+        ImageDraw.Draw(bottom_mask).polygon(view.polygon(ring, 0.0), fill=255)
+        image.paste(BACKGROUND_COLOR, (0, 0), ImageChops.multiply(top_mask, bottom_mask))
+
+    # QR relief: side sweeps first, then tops (rectangles stay rectangles in this view)
+    pixel_size = dimensions['pixel_size']
+    offset_x = dimensions['qr_offset_x']
+    offset_y = dimensions['qr_offset_y']
+    rows = len(matrix)
+    top_z = card_height + qr_relief
+    rects = []
+    for row, start, end in _runs(matrix):
+        x0 = offset_x + start * pixel_size
+        x1 = offset_x + end * pixel_size
+        y0 = offset_y + (rows - 1 - row) * pixel_size  # Flip Y axis (like the SCAD code)
+        rects.append((x0, y0, x1, y0 + pixel_size))
+    for x0, y0, x1, y1 in rects:
+        u0, v0, u1, _ = view.rect(x0, y0, x1, y1, top_z)
+        _, _, _, v1 = view.rect(x0, y0, x1, y1, card_height)
+        draw.rectangle([u0, v0, u1, v1], fill=RELIEF_SIDE_COLOR)
+    for x0, y0, x1, y1 in rects:
+        draw.rectangle(view.rect(x0, y0, x1, y1, top_z), fill=RELIEF_TOP_COLOR)
+
+    # Text labels
+    font_path = find_font_file()
+    for label in texts:
+        if font_path and label['text']:
+            _draw_text(image, view, label, card_height, font_path)
+
+    if SUPERSAMPLE > 1:
+        image = image.resize(size, Image.Resampling.BOX)
+    return image
+
+
+def _draw_text(image, view, label, card_height, font_path):
+    """Draw an extruded text label (side color swept up to the top, then top color)"""
+    tile, width_px, height_px = _text_tile(label['text'], label['size'] * view.scale, font_path)
+    if tile is None:
+        return
+
+    # Text box in model coordinates (text() with halign=center, valign=bottom, then rotated)
+    width = width_px / view.scale
+    height = height_px / view.scale
+    x, y = label['x'], label['y']
+    if label['rotation'] % 360 == 180:
+        box = (x - width / 2, y - height, x + width / 2, y)
+    else:
+        box = (x - width / 2, y, x + width / 2, y + height)
+        # Seen from the turned camera, unrotated text is upside down
+        tile = tile.transpose(Image.Transpose.ROTATE_180)
+
+    # Foreshorten to the tilted view
+    tile = tile.resize((tile.width, max(1, int(round(tile.height * view.cos_t)))), Image.Resampling.BILINEAR)
+
+    top_z = card_height + label['height']
+    steps = max(2, int(label['height'] * view.sin_t * view.scale / 2))
+    for i in range(steps + 1):
+        z = card_height + label['height'] * i / steps
+        u0, v0, _, _ = view.rect(*box, z)
+        color = RELIEF_TOP_COLOR if z == top_z else RELIEF_SIDE_COLOR
+        image.paste(color, (int(round(u0)), int(round(v0))), tile)
+
+
+def generator_texts(generator, dimensions):
+    """Text labels of a configured QRModelGenerator as dicts for render_preview (texts)"""
+    texts = []
+    if dimensions['has_text']:
+        texts.append({'text': generator.text_content, 'size': generator.text_size,
+                      'height': generator.text_height, 'x': dimensions['text_offset_x'],
+                      'y': dimensions['text_offset_y'], 'rotation': generator.text_rotation})
+    if dimensions['has_text_top']:
+        texts.append({'text': generator.text_content_top, 'size': generator.text_size,
+                      'height': generator.text_height, 'x': dimensions['text_offset_x_top'],
+                      'y': dimensions['text_offset_y_top'], 'rotation': 180})
+    return texts
+
+
+def render_generator_preview(generator, matrix, dimensions, size=(800, 800)):
+    """Render a preview for a configured QRModelGenerator (after calculate_dimensions)"""
+    texts = generator_texts(generator, dimensions)
+    return render_preview(matrix, dimensions, generator.card_height, generator.qr_relief,
+                          generator.corner_radius, generator.hole_geometry(dimensions), texts, size)
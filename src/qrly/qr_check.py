@@ -0,0 +1,135 @@
+"""
+Structural self-check of sampled QR matrices
+
+Sampled matrices have about 1-2 cells per module (see
+QRModelGenerator.load_and_process_image). Before any rendering time is spent,
+the matrix is checked for what every QR code has:
+
+- three finder patterns (dark:light:dark:light:dark in 1:1:3:1:1 ratio, both
+  across and down) in the top-left, top-right and bottom-left corners of the
+  dark area
+- a size of 17 + 4 × version modules
+- timing patterns (alternating modules in row and column 6 between the
+  finders) with exactly one run per module - fewer runs mean modules were lost
+  when sampling (image too coarse, blurred or badly thresholded)
+
+Codes must be roughly axis-aligned (scans, screenshots, generated images,
+photos taken straight on).
+"""
+
+# Side lengths of QR versions 1-40 in modules
+QR_SIZES = [17 + 4 * version for version in range(1, 41)]
+
+# Finder pattern run lengths in modules (dark, light, dark, light, dark)
+FINDER_RUNS = [1, 1, 3, 1, 1]
+
+
+def runs(cells):
+    """Run lengths of a sequence of booleans as [(value, length), ...]"""
+    result = []
+    for cell in cells:
+        if result and result[-1][0] == cell:
+            result[-1][1] += 1
+        else:
+            result.append([cell, 1])
+    return [(value, length) for value, length in result]
+
+
+def finder_matches(cells, module):
+    """True if cells (starting at the outer edge of a finder pattern) show the 1:1:3:1:1 pattern"""
+    found = runs(cells)
+    if found and not found[0][0] and found[0][1] <= module + 1:
+        found = found[1:]  # Edge of a blurred or slightly skewed finder inside the dark area
+    found = found[:5]
+    if len(found) < 5 or [value for value, _ in found] != [True, False, True, False, True]:
+        return False
+    # One cell of slack per run for sampling aliasing
+    return all(abs(length - expected * module) <= 0.5 * module + 1
+               for (_, length), expected in zip(found, FINDER_RUNS))
+
+
+def timing_runs(cells, module):
+    """
+    Number of runs of a line through a timing pattern (finder edge, short alternating
+    runs, finder edge), or None if the line does not look like one.
+    """
+    found = runs(cells)
+    while found and not found[0][0]:
+        found = found[1:]
+    while found and not found[-1][0]:
+        found = found[:-1]
+    if len(found) < 7:
+        return None
+    if any(abs(edge - 7 * module) > module + 1 for edge in (found[0][1], found[-1][1])):
+        return None
+    if any(length > module + 1 for _, length in found[1:-1]):
+        return None
+    return len(found)
+
+
+def check_matrix(matrix):
+    """
+    Check finder patterns, size and timing patterns of a sampled matrix.
+
+    Returns:
+        Dict with ok (bool), problems (list of messages), modules (modules per
+        side read from the timing patterns, or None) and cells_per_module (or None)
+    """
+    problems = []
+    result = {'ok': False, 'problems': problems, 'modules': None, 'cells_per_module': None}
+    dark_rows = [y for y, row in enumerate(matrix) if any(row)]
+    dark_columns = [x for x in range(len(matrix[0]) if matrix else 0) if any(row[x] for row in matrix)]
+    if not dark_rows:
+        problems.append("no dark modules")
+        return result
+    top, bottom, left, right = dark_rows[0], dark_rows[-1], dark_columns[0], dark_columns[-1]
+    width, height = right - left + 1, bottom - top + 1
+    if abs(width - height) > max(2, 0.05 * width):
+        problems.append(f"dark area is not square ({width}x{height} cells)")
+        return result
+
+    def row_cells(y):
+        return matrix[y][left:right + 1]
+
+    def column_cells(x):
+        return [matrix[y][x] for y in range(top, bottom + 1)]
+
+    # Finder patterns: lines through their centers (3 modules wide, so a rough module size is enough)
+    rough = runs(row_cells(top))[0][1] / 7
+    near, far = round(3.5 * rough - 0.5), round(3.5 * rough + 0.5)
+    corners = {
+        'top-left': (row_cells(top + near), column_cells(left + near)),
+        'top-right': (row_cells(top + near)[::-1], column_cells(right - far)),
+        'bottom-left': (row_cells(bottom - far), column_cells(left + near)[::-1]),
+    }
+    spans = []
+    for name, lines in corners.items():
+        if not all(finder_matches(cells, rough) for cells in lines):
+            problems.append(f"no finder pattern in the {name} corner")
+        spans += [sum(length for value, length in runs(cells[cells.index(True):])[:5]) for cells in lines
+                  if True in cells]
+    if problems:
+        return result
+    module = sum(spans) / len(spans) / 7
+
+    # Row and column 6 read finder, separator, timing modules 8 .. size-9, separator, finder:
+    # size - 12 runs. Modules lost in sampling merge runs.
+    sizes = {}
+    for name, cells, first, last in (('row', row_cells, top, bottom), ('column', column_cells, left, right)):
+        positions = range(first + int(5.5 * module), min(last, first + int(7.5 * module)) + 1)
+        counts = [timing_runs(cells(position), module) for position in positions]
+        sizes[name] = max((count + 12 for count in counts if count), default=0)
+    modules = sizes['row']
+    if sizes['row'] != sizes['column'] or modules not in QR_SIZES:
+        problems.append(f"timing patterns read {sizes['row']}x{sizes['column']} modules, not a QR size")
+    elif abs(modules - width / module) > modules / (7 * module) + 1:  # Finder spans are +-1 cell
+        problems.append(f"timing patterns read {modules} modules, finder patterns suggest "
+                        f"{width / module:.0f} (modules lost in sampling)")
+    else:
+        result['modules'] = modules
+        result['cells_per_module'] = round(width / modules, 2)
+        if width < modules:
+            problems.append(f"fewer than one cell per module ({modules} modules in {width} cells)")
+
+    result['ok'] = not problems
+    return result
@@ -0,0 +1,297 @@
+"""
+Pure-Python QR decoder for module grids
+
+Decodes a QR code from its modules (rows of booleans, True = dark, one entry
+per module, no quiet zone) - the grid read back from a model by scan_check:
+
+- format information (ECC level and mask) from either copy, accepted within
+  MAX_BIT_ERRORS of a valid BCH(15,5) code word
+- version information (versions 7+) the same way from the BCH(18,6) blocks
+- data codewords in zig-zag order, unmasked, de-interleaved into their
+  Reed-Solomon blocks and error-corrected (Berlekamp-Massey, Chien search, Forney)
+- numeric, alphanumeric, byte and Kanji segments
+
+Block structure, masks, pattern positions and GF(256) tables come from the
+qrcode package that generates the codes, so encoder and decoder cannot disagree.
+"""
+
+from qrcode import util
+from qrcode.base import EXP_TABLE, LOG_TABLE, rs_blocks
+
+from .qr_encode import ECC_LEVELS
+
+# Valid format and version code words (with mask) → decoded value
+FORMAT_CODES = {util.BCH_type_info(data): data for data in range(32)}
+VERSION_CODES = {util.BCH_type_number(version): version for version in range(7, 41)}
+
+# Bit errors corrected in format and version information (both BCH codes have distance 7+)
+MAX_BIT_ERRORS = 3
+
+ECC_NAMES = {value: name for name, value in ECC_LEVELS.items()}
+
+
+def nearest_code(codes, word):
+    """(value, bit errors) of the valid code word closest to word"""
+    return min(((value, bin(code ^ word).count('1')) for code, value in codes.items()), key=lambda item: item[1])
+
+
+def read_format(modules):
+    """
+    ECC level and mask pattern from the format information.
+
+    Returns:
+        (ecc, mask, bit errors) - ecc as 'L', 'M', 'Q' or 'H'
+
+    Raises:
+        ValueError: If neither copy is within MAX_BIT_ERRORS of a valid code word
+    """
+    size = len(modules)
+    vertical = horizontal = 0
+    for i in range(15):
+        # Bit positions as written by qrcode's setup_type_info
+        row = i if i < 6 else i + 1 if i < 8 else size - 15 + i
+        column = size - i - 1 if i < 8 else 15 - i if i < 9 else 14 - i
+        vertical |= modules[row][8] << i
+        horizontal |= modules[8][column] << i
+    data, errors = min(nearest_code(FORMAT_CODES, vertical), nearest_code(FORMAT_CODES, horizontal),
+                       key=lambda item: item[1])
+    if errors > MAX_BIT_ERRORS:
+        raise ValueError(f"format information unreadable ({errors} bit errors)")
+    return ECC_NAMES[data >> 3], data & 7, errors
+
+
+def read_version(modules):
+    """
+    Version from the module count, confirmed by the version information (versions 7+).
+
+    Raises:
+        ValueError: If the size is not a QR size or the version information disagrees
+    """
+    size = len(modules)
+    version, remainder = divmod(size - 17, 4)
+    if remainder or not 1 <= version <= 40 or any(len(row) != size for row in modules):
+        raise ValueError(f"{len(modules[0])}x{size} modules is not a QR code size")
+    if version >= 7:
+        first = second = 0
+        for i in range(18):
+            first |= modules[i // 3][i % 3 + size - 11] << i
+            second |= modules[i % 3 + size - 11][i // 3] << i
+        read, errors = min(nearest_code(VERSION_CODES, first), nearest_code(VERSION_CODES, second),
+                           key=lambda item: item[1])
+        if errors > MAX_BIT_ERRORS or read != version:
+            raise ValueError(f"version information does not match {size} modules")
+    return version
+
+
+def function_modules(version):
+    """Grid of booleans marking finder, timing, alignment, format and version modules (no data)"""
+    size = 17 + 4 * version
+    reserved = [[False] * size for _ in range(size)]
+
+    def mark(top, left, height, width):
+        for row in range(max(top, 0), min(top + height, size)):
+            for column in range(max(left, 0), min(left + width, size)):
+                reserved[row][column] = True
+
+    # Finders with separators and format information (incl. the dark module)
+    mark(0, 0, 9, 9)
+    mark(0, size - 8, 9, 8)
+    mark(size - 8, 0, 8, 9)
+    # Timing patterns
+    mark(6, 0, 1, size)
+    mark(0, 6, size, 1)
+    positions = util.pattern_position(version)
+    corners = {(positions[0], positions[0]), (positions[0], positions[-1]), (positions[-1], positions[0])} if positions else ()
+    for row in positions:
+        for column in positions:
+            if (row, column) not in corners:
+                mark(row - 2, column - 2, 5, 5)
+    if version >= 7:
+        mark(0, size - 11, 6, 3)
+        mark(size - 11, 0, 3, 6)
+    return reserved
+
+
+def read_codewords(modules, version, mask):
+    """Unmasked codewords in placement order (zig-zag from the bottom right, like qrcode's map_data)"""
+    size = len(modules)
+    reserved = function_modules(version)
+    masked = util.mask_func(mask)
+    bits = []
+    upward = True
+    for right in range(size - 1, 0, -2):
+        if right <= 6:
+            right -= 1  # Skip the vertical timing pattern
+        for row in (range(size - 1, -1, -1) if upward else range(size)):
+            for column in (right, right - 1):
+                if not reserved[row][column]:
+                    bits.append(modules[row][column] != masked(row, column))
+        upward = not upward
+    return [sum(bit << (7 - index) for index, bit in enumerate(bits[start:start + 8]))
+            for start in range(0, len(bits) - 7, 8)]
+
+
+def _multiply(a, b):
+    return 0 if a == 0 or b == 0 else EXP_TABLE[(LOG_TABLE[a] + LOG_TABLE[b]) % 255]
+
+
+def _divide(a, b):
+    return 0 if a == 0 else EXP_TABLE[(LOG_TABLE[a] - LOG_TABLE[b]) % 255]
+
+
+def _evaluate(poly, x):
+    """Value of a polynomial (lowest degree first) at x"""
+    result = 0
+    for coefficient in reversed(poly):
+        result = _multiply(result, x) ^ coefficient
+    return result
+
+
+def correct_block(block, ec_count):
+    """
+    Reed-Solomon error correction of one block (data + EC codewords, first codeword = highest power).
+
+    Returns:
+        (corrected block, number of corrected codewords)
+
+    Raises:
+        ValueError: If the block has more errors than ec_count / 2
+    """
+    n = len(block)
+    # Generator roots are alpha^0 .. alpha^(ec_count - 1) (see qrcode.base)
+    syndromes = [_evaluate(block[::-1], EXP_TABLE[i]) for i in range(ec_count)]
+    if not any(syndromes):
+        return list(block), 0
+
+    # Berlekamp-Massey: error locator (lowest degree first)
+    locator, previous, errors, shift, scale = [1], [1], 0, 1, 1
+    for step in range(ec_count):
+        discrepancy = syndromes[step]
+        for i in range(1, min(errors, len(locator) - 1) + 1):
+            discrepancy ^= _multiply(locator[i], syndromes[step - i])
+        if discrepancy == 0:
+            shift += 1
+            continue
+        factor = _divide(discrepancy, scale)
+        updated = locator + [0] * max(0, len(previous) + shift - len(locator))
+        for i, coefficient in enumerate(previous):
+            updated[i + shift] ^= _multiply(factor, coefficient)
+        if 2 * errors <= step:
+            previous, errors, scale, shift = locator, step + 1 - errors, discrepancy, 1
+        else:
+            shift += 1
+        locator = updated
+
+    # Chien search: X = alpha^power is an error location if locator(X^-1) = 0
+    powers = [power for power in range(n) if _evaluate(locator, EXP_TABLE[(255 - power) % 255]) == 0]
+    if 2 * errors > ec_count or len(powers) != errors:
+        raise ValueError("too many damaged codewords")
+
+    # Forney: magnitudes from the evaluator S(x) * locator(x) mod x^ec_count
+    evaluator = [0] * ec_count
+    for i, s in enumerate(syndromes):
+        for j, coefficient in enumerate(locator[:ec_count - i]):
+            evaluator[i + j] ^= _multiply(s, coefficient)
+    derivative = [coefficient if i % 2 else 0 for i, coefficient in enumerate(locator)][1:]
+    corrected = list(block)
+    for power in powers:
+        inverse = EXP_TABLE[(255 - power) % 255]
+        magnitude = _multiply(EXP_TABLE[power], _divide(_evaluate(evaluator, inverse), _evaluate(derivative, inverse)))
+        corrected[n - 1 - power] ^= magnitude
+    if any(_evaluate(corrected[::-1], EXP_TABLE[i]) for i in range(ec_count)):
+        raise ValueError("too many damaged codewords")
+    return corrected, errors
+
+
+def parse_segments(data, version):
+    """Text of the data codewords (numeric, alphanumeric, byte and Kanji segments)"""
+    bits = ''.join(f'{byte:08b}' for byte in data)
+    position = 0
+
+    def read(count):
+        nonlocal position
+        if count == 0:
+            return 0
+        if position + count > len(bits):
+            raise ValueError("data segment runs past the end of the data")
+        value = int(bits[position:position + count], 2)
+        position += count
+        return value
+
+    parts = []
+    while len(bits) - position >= 4:
+        mode = read(4)
+        if mode == 0:
+            break
+        if mode == 7:  # ECI designator: assignment number in 1-3 bytes, data stays bytes
+            first = read(8)
+            read(8 if first >> 6 == 2 else 16 if first >> 5 == 6 else 0)
+            continue
+        if mode not in (util.MODE_NUMBER, util.MODE_ALPHA_NUM, util.MODE_8BIT_BYTE, util.MODE_KANJI):
+            raise ValueError(f"unsupported data mode {mode}")
+        count = read(util.length_in_bits(mode, version))
+        if mode == util.MODE_NUMBER:
+            digits = []
+            for start in range(0, count, 3):
+                width = min(3, count - start)
+                digits.append(f'{read((4, 7, 10)[width - 1]):0{width}d}')
+            parts.append(''.join(digits).encode())
+        elif mode == util.MODE_ALPHA_NUM:
+            chars = bytearray()
+            for _ in range(count // 2):
+                chars += bytes(util.ALPHA_NUM[index] for index in divmod(read(11), 45))
+            if count % 2:
+                chars.append(util.ALPHA_NUM[read(6)])
+            parts.append(bytes(chars))
+        elif mode == util.MODE_8BIT_BYTE:
+            parts.append(bytes(read(8) for _ in range(count)))
+        else:
+            chars = bytearray()
+            for _ in range(count):
+                value = read(13)
+                code = (value // 0xC0) << 8 | value % 0xC0
+                code += 0x8140 if code < 0x1F00 else 0xC140
+                chars += code.to_bytes(2, 'big')
+            parts.append(bytes(chars).decode('shift_jis', errors='replace').encode())
+    raw = b''.join(parts)
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def decode_modules(modules):
+    """
+    Decode a module grid.
+
+    Returns:
+        Dict with text, version, ecc, mask and corrected_codewords
+
+    Raises:
+        ValueError: If the grid cannot be decoded (message says why)
+    """
+    version = read_version(modules)
+    ecc, mask, _ = read_format(modules)
+    codewords = read_codewords(modules, version, mask)
+    blocks = rs_blocks(version, ECC_LEVELS[ecc])
+
+    # De-interleave (data codewords round-robin over the blocks, then EC codewords)
+    data_parts = [[] for _ in blocks]
+    ec_parts = [[] for _ in blocks]
+    index = 0
+    for parts, counts in ((data_parts, [block.data_count for block in blocks]),
+                          (ec_parts, [block.total_count - block.data_count for block in blocks])):
+        for i in range(max(counts)):
+            for part, count in zip(parts, counts):
+                if i < count:
+                    part.append(codewords[index])
+                    index += 1
+
+    data = []
+    corrected = 0
+    for block, data_part, ec_part in zip(blocks, data_parts, ec_parts):
+        fixed, errors = correct_block(data_part + ec_part, len(ec_part))
+        data += fixed[:block.data_count]
+        corrected += errors
+    return {'text': parse_segments(data, version), 'version': version, 'ecc': ecc, 'mask': mask,
+            'corrected_codewords': corrected}
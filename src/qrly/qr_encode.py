@@ -0,0 +1,131 @@
+"""
+QR encoding optimizer
+
+Picks error correction level, version and data variant for a QR code so the
+printed code has as few modules as possible while still meeting a robustness
+target (minimum ECC level), and checks that the resulting module size is
+printable:
+
+    module size (mm) = QR area (from calculate_dimensions) / (modules + 2 × border)
+
+The divisor is the width of the printed matrix: URL inputs are built from the
+exact module matrix of the encoding (qr_matrix), never from a resampled image.
+
+Fewer modules mean larger, more reliably printed modules and faster renders.
+URLs may also be encoded with upper-case scheme and host (case-insensitive),
+which lets the encoder use the denser alphanumeric mode for more of the URL.
+"""
+
+from urllib.parse import urlsplit, urlunsplit
+
+import qrcode
+
+ECC_LEVELS = {
+    'L': qrcode.constants.ERROR_CORRECT_L,  # ~7% recovery
+    'M': qrcode.constants.ERROR_CORRECT_M,  # ~15%
+    'Q': qrcode.constants.ERROR_CORRECT_Q,  # ~25%
+    'H': qrcode.constants.ERROR_CORRECT_H,  # ~30%
+}
+ECC_ORDER = ['L', 'M', 'Q', 'H']
+
+# Smallest module edge a typical FDM printer (0.4 mm nozzle) resolves cleanly
+DEFAULT_MIN_FEATURE_MM = 0.8
+
+# Robustness target of the optimizer (lowest acceptable ECC level)
+DEFAULT_MIN_ECC = 'M'
+
+# Quiet zone of generated images in modules (see QRModelGenerator.generate_qr_image)
+BORDER = 1
+
+
+def uppercase_url(data):
+    """URL with upper-case scheme and host (both case-insensitive); other text unchanged"""
+    parts = urlsplit(data)
+    if not parts.scheme or not parts.netloc or '@' in parts.netloc:
+        return data
+    return urlunsplit((parts.scheme.upper(), parts.netloc.upper(), parts.path, parts.query, parts.fragment))
+
+
+def qr_version(data, ecc):
+    """Smallest QR version that holds data at the given ECC level"""
+    qr = qrcode.QRCode(version=None, error_correction=ECC_LEVELS[ecc], border=BORDER)
+    qr.add_data(data)
+    return qr.best_fit()
+
+
+def module_count(version):
+    return 17 + 4 * version
+
+
+def printed_cells(version):
+    """Width in cells of the printed matrix (modules plus quiet zone, see qr_matrix)"""
+    return module_count(version) + 2 * BORDER
+
+
+def qr_matrix(encoding):
+    """
+    Exact module matrix of an encoding (as returned by choose_encoding/encoding_for).
+
+    Returns:
+        Matrix (list of rows of booleans, True = dark) with a BORDER quiet zone
+    """
+    qr = qrcode.QRCode(version=encoding['version'], error_correction=ECC_LEVELS[encoding['ecc']], border=BORDER)
+    qr.add_data(encoding['data'])
+    qr.make(fit=False)
+    return qr.get_matrix()
+
+
+def choose_encoding(data, qr_size_mm, min_ecc=DEFAULT_MIN_ECC, min_feature_mm=DEFAULT_MIN_FEATURE_MM):
+    """
+    Fewest-module encoding that meets the ECC target (highest ECC for that size).
+
+    If no encoding at min_ecc gives printable modules, lower ECC levels are
+    tried before giving up (printable is then False).
+
+    Returns:
+        Dict with data, ecc, version, modules, module_mm, printable
+    """
+    variants = [data]
+    if uppercase_url(data) != data:
+        variants.append(uppercase_url(data))
+
+    candidates = []
+    for variant_index, variant in enumerate(variants):
+        for ecc in ECC_ORDER:
+            version = qr_version(variant, ecc)
+            module_mm = qr_size_mm / printed_cells(version)
+            candidates.append({'data': variant, 'ecc': ecc, 'version': version,
+                               'modules': module_count(version), 'module_mm': round(module_mm, 3),
+                               'printable': module_mm >= min_feature_mm, '_variant': variant_index})
+
+    def preference(candidate):
+        # Fewest modules, then highest ECC, then unchanged data
+        return candidate['modules'], -ECC_ORDER.index(candidate['ecc']), candidate['_variant']
+
+    target = ECC_ORDER.index(min_ecc)
+    robust = [c for c in candidates if ECC_ORDER.index(c['ecc']) >= target]
+    printable = [c for c in candidates if c['printable']]
+    if any(c['printable'] for c in robust):
+        best = min((c for c in robust if c['printable']), key=preference)
+    elif printable:
+        best = min(printable, key=lambda c: (-ECC_ORDER.index(c['ecc']),) + preference(c))
+    else:
+        best = min(candidates, key=preference)
+    best.pop('_variant')
+    return best
+
+
+def encoding_for(generator, data, ecc='auto', min_feature_mm=DEFAULT_MIN_FEATURE_MM):
+    """
+    Encoding of data for a configured generator (its QR area size).
+
+    Args:
+        ecc: 'auto' (optimize, see choose_encoding) or a fixed level 'L', 'M', 'Q', 'H'
+    """
+    qr_size = generator.calculate_dimensions(1)['qr_size']
+    if ecc == 'auto':
+        return choose_encoding(data, qr_size, min_feature_mm=min_feature_mm)
+    version = qr_version(data, ecc)
+    module_mm = qr_size / printed_cells(version)
+    return {'data': data, 'ecc': ecc, 'version': version, 'modules': module_count(version),
+            'module_mm': round(module_mm, 3), 'printable': module_mm >= min_feature_mm}
@@ -0,0 +1,237 @@
+"""
+Scannability check of the generated geometry
+
+Proves that a model still decodes before it is printed: the top of the model
+is rasterized straight from the geometry (module matrix with pixel_size and
+offsets from calculate_dimensions, card outline, chain hole, text labels),
+seen from above like a phone camera sees the print, and then read back
+without knowing how it was made:
+
+- finder and timing patterns (qr_check) on the raised relief
+- module grid from the timing pattern runs (models of sampled images have
+  1-2 cells per module, so modules are not all the same width)
+- format information (BCH), version information, Reed-Solomon correction and
+  the data itself (qr_decode), compared with the encoded text if known
+- quiet zone: light card next to the finder patterns up to the card edge, the
+  hole or text
+
+Runs in a few milliseconds per model (Pillow drawing, a small raster and a
+pure-Python decoder), so bulk runs check every model.
+"""
+
+from PIL import Image, ImageDraw
+
+from .mesh import rounded_rectangle
+from .qr_check import check_matrix, runs, timing_runs
+from .qr_decode import decode_modules
+
+# Raster resolution in pixels per matrix cell (cell edges fall on pixel edges)
+PIXELS_PER_CELL = 3
+
+# Raster values: raised relief and text, card top, everything else (outside the card, hole)
+RELIEF = 0
+CARD = 255
+BACKGROUND = 128
+
+# Quiet zone in modules below which a model fails the check (the standard asks for 4,
+# phone scanners read codes with 1)
+MIN_QUIET_ZONE = 1
+
+
+def top_view(matrix, dimensions, corner_radius=0, hole=None, texts=(), pixels_per_cell=PIXELS_PER_CELL):
+    """
+    Raster of the model seen from above.
+
+    Args:
+        matrix: Module matrix as built into the relief (after hole masking)
+        dimensions: Output of QRModelGenerator.calculate_dimensions()
+        corner_radius: Corner radius of the card in mm
+        hole: Optional (x, y, diameter) of the chain hole
+        texts: Text labels as dicts (see preview.generator_texts)
+        pixels_per_cell: Raster resolution
+
+    Returns:
+        (mode 'L' image with RELIEF/CARD/BACKGROUND values, pixels per mm)
+    """
+    from .fonts import find_font_file
+    from .preview import _text_tile
+
+    scale = pixels_per_cell / dimensions['pixel_size']
+    card_length = dimensions['card_length']
+    size = (int(round(dimensions['card_width'] * scale)), int(round(card_length * scale)))
+    image = Image.new('L', size, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    def point(x, y):
+        return x * scale, (card_length - y) * scale  # Model Y points up, image rows down
+
+    outline = rounded_rectangle(dimensions['card_width'], card_length, corner_radius, 32)
+    draw.polygon([point(x, y) for x, y in outline], fill=CARD)
+    if hole:
+        hole_x, hole_y, hole_d = hole
+        radius = hole_d / 2
+        draw.ellipse([point(hole_x - radius, hole_y + radius), point(hole_x + radius, hole_y - radius)], fill=BACKGROUND)
+
+    # Relief on whole pixels: cell (row, col) of the code at the rounded code origin
+    rows = len(matrix)
+    left, top = (int(round(value)) for value in point(dimensions['qr_offset_x'],
+                                                       dimensions['qr_offset_y'] + rows * dimensions['pixel_size']))
+    for row, cells in enumerate(matrix):
+        for (value, length), start in _with_starts(runs(cells)):
+            if value:
+                draw.rectangle([left + start * pixels_per_cell, top + row * pixels_per_cell,
+                                left + (start + length) * pixels_per_cell - 1, top + (row + 1) * pixels_per_cell - 1],
+                               fill=RELIEF)
+
+    font_path = find_font_file()
+    for label in texts:
+        if not (font_path and label['text']):
+            continue
+        tile, width_px, height_px = _text_tile(label['text'], label['size'] * scale, font_path)
+        if tile is None:
+            continue
+        # text() with halign=center, valign=bottom; seen from above unrotated text reads normally
+        if label['rotation'] % 360 == 180:
+            tile = tile.transpose(Image.Transpose.ROTATE_180)
+            corner = point(label['x'] - width_px / scale / 2, label['y'])
+        else:
+            corner = point(label['x'] - width_px / scale / 2, label['y'] + height_px / scale)
+        image.paste(RELIEF, (int(round(corner[0])), int(round(corner[1]))), tile)
+    return image, scale
+
+
+def _with_starts(found):
+    start = 0
+    for run in found:
+        yield run, start
+        start += run[1]
+
+
+def module_centers(cells, modules, module):
+    """
+    Centers of the modules along a line through a timing pattern, in cells.
+
+    Every run between the two finder patterns is one module; the finder runs are 7.
+
+    Returns:
+        List of modules centers, or None if the line is not a timing pattern of that size
+    """
+    if timing_runs(cells, module) != modules - 12:
+        return None
+    centers = []
+    start = 0
+    for value, length in runs(cells):
+        if value or centers:
+            count = 7 if length > module + 1 else 1  # Finder edge or single timing module
+            centers += [start + (index + 0.5) * length / count for index in range(count)]
+        start += length
+    return centers[:modules]
+
+
+def _timing_centers(lines, modules, module):
+    """Module centers from the first line through the timing pattern (row or column 6)"""
+    for cells in lines:
+        centers = module_centers(cells, modules, module)
+        if centers is not None and len(centers) == modules:
+            return centers
+    return None
+
+
+def quiet_zone(image, bounds, module_px):
+    """
+    Light card next to the finder patterns in modules, on the narrowest side.
+
+    Scanners locate a code by its finder patterns, so the card edge, the hole or
+    text must keep clear of them; elsewhere they only cost modules, which the
+    decode already accounts for.
+
+    Args:
+        image: Top view (see top_view)
+        bounds: Code area (left, top, right, bottom) in pixels
+        module_px: Module size in pixels
+    """
+    left, top, right, bottom = bounds
+    width, height = image.size
+    finder = int(round(7 * module_px))
+    # Strips from the outer edges of the three finder patterns to the image edge: (box, side)
+    strips = [
+        ((left, 0, left + finder, top), 'top'), ((right - finder, 0, right, top), 'top'),
+        ((0, top, left, top + finder), 'left'), ((right, top, width, top + finder), 'right'),
+        ((0, bottom - finder, left, bottom), 'left'), ((left, bottom, left + finder, height), 'bottom'),
+    ]
+    distances = []
+    for box, side in strips:
+        strip = image.crop(box).point(lambda value: 0 if value == CARD else 255)
+        found = strip.getbbox()
+        if found is None:
+            distances.append(strip.height if side in ('top', 'bottom') else strip.width)
+        else:
+            distances.append({'top': strip.height - found[3], 'bottom': found[1],
+                              'left': strip.width - found[2], 'right': found[0]}[side])
+    return min(distances) / module_px
+
+
+def check_geometry(matrix, dimensions, corner_radius=0, hole=None, texts=(), expected=None):
+    """
+    Check that the top view of a model decodes.
+
+    Args:
+        matrix, dimensions, corner_radius, hole, texts: Model geometry (see top_view)
+        expected: Encoded text, if known (URL inputs)
+
+    Returns:
+        Dict with ok, problems, modules, version, ecc, corrected_codewords,
+        quiet_zone_modules and decoded (text)
+    """
+    problems = []
+    result = {'ok': False, 'problems': problems, 'modules': None, 'version': None, 'ecc': None,
+              'corrected_codewords': None, 'quiet_zone_modules': None, 'decoded': None}
+    image, scale = top_view(matrix, dimensions, corner_radius, hole, texts)
+
+    # Relief inside the code area (incl. the matrix border) read back at cell centers, True = raised
+    rows, columns = len(matrix), len(matrix[0]) if matrix else 0
+    left = int(round(dimensions['qr_offset_x'] * scale))
+    top = int(round((dimensions['card_length'] - dimensions['qr_offset_y']) * scale)) - rows * PIXELS_PER_CELL
+    area = image.crop((left, top, left + columns * PIXELS_PER_CELL, top + rows * PIXELS_PER_CELL))
+    relief = area.resize((columns, rows), Image.Resampling.NEAREST).point(lambda value: 255 if value == RELIEF else 0)
+    data = relief.tobytes()
+    cells = [[value != 0 for value in data[y * columns:(y + 1) * columns]] for y in range(rows)]
+
+    structure = check_matrix(cells)
+    if not structure['ok']:
+        problems += structure['problems']
+        return result
+    modules = result['modules'] = structure['modules']
+    code_left, code_top, code_right, code_bottom = relief.getbbox()
+    module = (code_right - code_left) / modules
+
+    # Module grid from the timing patterns (row and column 6)
+    positions = range(int(5.5 * module), int(7.5 * module) + 1)
+    column_centers = _timing_centers((cells[code_top + offset][code_left:code_right] for offset in positions),
+                                     modules, module)
+    row_centers = _timing_centers(([row[code_left + offset] for row in cells[code_top:code_bottom]]
+                                   for offset in positions), modules, module)
+    if column_centers is None or row_centers is None:
+        problems.append("timing patterns do not give one run per module")
+        return result
+    grid = [[cells[code_top + int(y)][code_left + int(x)] for x in column_centers] for y in row_centers]
+
+    try:
+        decoded = decode_modules(grid)
+    except ValueError as e:
+        problems.append(f"does not decode: {e}")
+    else:
+        result.update({key: decoded[key] for key in ('version', 'ecc', 'corrected_codewords')})
+        result['decoded'] = decoded['text']
+        if expected is not None and decoded['text'] != expected:
+            problems.append(f"decodes to '{decoded['text']}' instead of '{expected}'")
+
+    bounds = [origin + PIXELS_PER_CELL * value for origin, value in
+              zip((left, top, left, top), (code_left, code_top, code_right, code_bottom))]
+    zone = quiet_zone(image, bounds, module * PIXELS_PER_CELL)
+    result['quiet_zone_modules'] = round(zone, 1)
+    if zone < MIN_QUIET_ZONE:
+        problems.append(f"quiet zone of {zone:.1f} modules (card edge, hole or text too close to the code)")
+
+    result['ok'] = not problems
+    return result
@@ -0,0 +1,173 @@
+"""
+Resource governor for OpenSCAD renders
+
+OpenSCAD can allocate gigabytes for large models, so concurrent renders are
+admitted by a RenderScheduler against two budgets: CPU slots (one per core)
+and a memory budget (a share of physical RAM). Each render's memory need is
+estimated from its primitive count; on Linux the child process also gets a
+data-segment rlimit (RLIMIT_DATA: heap and private writable mappings, not
+the address space reserved by Manifold/TBB worker threads), so a render that
+runs away fails early instead of pushing the machine into the OOM killer. Such renders raise
+RenderBudgetExceeded, and the caller retries with a cheaper strategy.
+"""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+# Memory estimate per render: fixed overhead plus a cost per CSG primitive (MB).
+# Manifold needs a fraction of what CGAL needs for the same model.
+BASE_MEMORY_MB = 200
+MEMORY_PER_PRIMITIVE_MB = {'cgal': 0.5, 'manifold': 0.05}
+
+# Data limit per child: estimate × factor, but never below the minimum
+# (OpenSCAD allocates a few hundred MB of libraries, caches and thread stacks before rendering)
+LIMIT_FACTOR = 3
+MIN_LIMIT_MB = 2048
+
+# Share of physical RAM available to concurrent renders
+MEMORY_BUDGET_SHARE = 0.75
+
+
+class RenderBudgetExceeded(Exception):
+    """A render ran out of its memory budget (or was killed for it)"""
+
+
+def total_memory_mb():
+    """Physical memory in MB (4096 if it cannot be determined)"""
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+def count_primitives(scad_code):
+    """Number of CSG primitives (cubes, text, cylinders) in SCAD code"""
+    return sum(scad_code.count(name) for name in ('cube(', 'text(', 'cylinder('))
+
+
+def estimate_memory_mb(primitives, flags=()):
+    """Estimated peak memory of an OpenSCAD render in MB"""
+    backend = 'manifold' if any('manifold' in flag for flag in flags) else 'cgal'
+    return int(BASE_MEMORY_MB + primitives * MEMORY_PER_PRIMITIVE_MB[backend])
+
+
+def memory_limit_mb(memory_mb):
+    """Data-segment limit for a child with the given estimate"""
+    return max(MIN_LIMIT_MB, memory_mb * LIMIT_FACTOR)
+
+
+def _limit_memory(limit_mb):
+    """
+    preexec_fn for subprocess: cap the child's data segment (POSIX only, best effort).
+
+    RLIMIT_AS is not used: multithreaded renders reserve far more address space
+    (per-thread malloc arenas, TBB stacks) than they ever touch and fail under it.
+    """
+    def apply():
+        try:
+            import resource
+            limit = limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # Not supported (macOS ignores RLIMIT_DATA for mmap) - rely on admission only
+    return apply if os.name == 'posix' else None
+
+
+def is_out_of_memory(returncode, stderr):
+    """True if a failed OpenSCAD run looks like it ran out of memory"""
+    if returncode == 0:
+        return False
+    if returncode == -getattr(signal, 'SIGKILL', 9):
+        return True  # OOM killer (other signals, e.g. a segfault, are plain failures)
+    # Failed allocation under the rlimit: std::bad_alloc (usually followed by SIGABRT) or ENOMEM
+    text = (stderr or '').lower()
+    return 'bad_alloc' in text or 'out of memory' in text or 'cannot allocate memory' in text
+
+
+class RenderScheduler:
+    """Admits renders while CPU slots and memory budget allow"""
+
+    def __init__(self, max_concurrent=None, memory_budget_mb=None):
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.memory_budget_mb = memory_budget_mb or int(total_memory_mb() * MEMORY_BUDGET_SHARE)
+        self.running = 0
+        self.memory_in_use_mb = 0
+        self._condition = threading.Condition()
+
+    def _fits(self, memory_mb):
+        if self.running == 0:
+            return True  # A render larger than the whole budget still runs, alone
+        return (self.running < self.max_concurrent
+                and self.memory_in_use_mb + memory_mb <= self.memory_budget_mb)
+
+    def try_acquire(self, memory_mb):
+        """Reserve a slot without waiting; returns True if admitted"""
+        with self._condition:
+            if not self._fits(memory_mb):
+                return False
+            self.running += 1
+            self.memory_in_use_mb += memory_mb
+            return True
+
+    def acquire(self, memory_mb, timeout=None):
+        """Wait for a slot; returns False if timed out"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._fits(memory_mb), timeout):
+                return False
+            self.running += 1
+            self.memory_in_use_mb += memory_mb
+            return True
+
+    def release(self, memory_mb):
+        """Return a slot reserved by acquire()/try_acquire()"""
+        with self._condition:
+            self.running -= 1
+            self.memory_in_use_mb -= memory_mb
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, memory_mb):
+        """Context manager around acquire()/release()"""
+        self.acquire(memory_mb)
+        try:
+            yield
+        finally:
+            self.release(memory_mb)
+
+    def run(self, cmd, memory_mb, timeout=None):
+        """
+        Run an OpenSCAD command once admitted, with a memory rlimit on the child.
+
+        Returns:
+            subprocess.CompletedProcess (text output captured)
+
+        Raises:
+            RenderBudgetExceeded: The render ran out of memory
+            subprocess.TimeoutExpired: The render took longer than timeout (child is killed)
+        """
+        with self.slot(memory_mb):
+            start = time.monotonic()
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout,
+                                    preexec_fn=_limit_memory(memory_limit_mb(memory_mb)))
+            if is_out_of_memory(result.returncode, result.stderr):
+                raise RenderBudgetExceeded(
+                    f"OpenSCAD exceeded its memory budget ({memory_limit_mb(memory_mb)} MB) "
+                    f"after {time.monotonic() - start:.0f}s")
+            return result
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide render scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RenderScheduler()
+        return _scheduler
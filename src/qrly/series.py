@@ -0,0 +1,197 @@
+"""
+Numbered series (asset tags, tickets)
+
+Expands templates like `https://x.io/a/{n:05d}` and `#{n}` over a range of
+numbers. Items are split into chunks; each chunk is one job on the worker pool
+(job_queue.JobQueue), and the worker runs all its items through one
+ModelPipeline. Base plate, dimensions and glyph meshes are computed once per
+chunk - per item only the QR matrix and the label geometry are rebuilt.
+
+Output is either one model directory per item, or packed plates: as many cards
+as fit on the print bed in one STL per plate, with a JSON map of which number
+sits where.
+"""
+
+import json
+import math
+import re
+from pathlib import Path
+
+# Items per job in per-item mode (small enough for progress, large enough to reuse geometry)
+MAX_CHUNK = 50
+
+# Gap between cards on a packed plate (mm)
+PLATE_GAP = 5.0
+
+
+def parse_range(text):
+    """Inclusive range "START-END" (optionally ":STEP") as a list of numbers"""
+    match = re.fullmatch(r'\s*(\d+)\s*-\s*(\d+)\s*(?::\s*(\d+)\s*)?', text)
+    if not match:
+        raise ValueError(f"Invalid range '{text}' (expected START-END or START-END:STEP, e.g. 1-500)")
+    start, end, step = int(match.group(1)), int(match.group(2)), int(match.group(3) or 1)
+    if end < start or step < 1:
+        raise ValueError(f"Invalid range '{text}': END must not be below START, STEP must be positive")
+    return list(range(start, end + 1, step))
+
+
+def parse_plate(text):
+    """Print bed size "WIDTHxLENGTH" in mm as (width, length)"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*[xX]\s*(\d+(?:\.\d+)?)\s*', text)
+    if not match:
+        raise ValueError(f"Invalid plate size '{text}' (expected WIDTHxLENGTH in mm, e.g. 220x220)")
+    return float(match.group(1)), float(match.group(2))
+
+
+def expand(template, n):
+    """Template with {n} (format spec allowed, e.g. {n:05d}) filled in"""
+    try:
+        return template.format(n=n)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Invalid template '{template}': only {{n}} is available ({e})")
+
+
+def series_items(numbers, input_template, text_template='', text_top_template='', name_template=None):
+    """
+    Expanded items of a series.
+
+    Returns:
+        List of dicts with n, input, text_content, text_content_top, output_name
+    """
+    from .generator import QRModelGenerator
+
+    items = []
+    for n in numbers:
+        url = expand(input_template, n)
+        if name_template:
+            name = expand(name_template, n)
+        elif QRModelGenerator.is_url(url):
+            name = re.sub(r'[^\w\-]', '_', url)[-50:]  # Keep the end - that is where the number is
+        else:
+            name = f"{Path(url).stem}-{n}"
+        items.append({'n': n, 'input': url, 'text_content': expand(text_template, n).strip(),
+                      'text_content_top': expand(text_top_template, n).strip(), 'output_name': name})
+    if len({item['input'] for item in items}) < len(items):
+        raise ValueError(f"Template '{input_template}' does not produce a distinct input per number")
+    return items
+
+
+def chunked(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def plate_layout(card_width, card_length, plate_width, plate_length, gap=PLATE_GAP):
+    """(columns, rows) of cards on a plate; ValueError if not even one card fits"""
+    columns = int((plate_width + gap) // (card_width + gap))
+    rows = int((plate_length + gap) // (card_length + gap))
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Card {card_width:g}x{card_length:g}mm does not fit on a "
+                         f"{plate_width:g}x{plate_length:g}mm plate")
+    return columns, rows
+
+
+def series_jobs(settings, items, workers, plate=None, plate_dir=None):
+    """
+    Job settings for a series: chunks of items sharing the base settings.
+
+    Args:
+        settings: Base job settings (see planner.job_settings); input/texts/name come from the items
+        items: series_items()
+        workers: Worker count (per-item mode makes a few chunks per worker)
+        plate: Optional (width, length) of the print bed in mm - one job per plate
+        plate_dir: Directory for plate files (required with plate)
+    """
+    from .pipeline import ModelPipeline
+
+    if plate:
+        pipeline = ModelPipeline()
+        try:
+            dimensions = pipeline.get('dimensions', dict(settings, **_item_params(items[0])))['dimensions']
+        finally:
+            pipeline.cleanup()
+        columns, rows = plate_layout(dimensions['card_width'], dimensions['card_length'], *plate)
+        chunks = chunked(items, columns * rows)
+        return [dict(settings, series=chunk, output_name=f"plate-{number:03d} ({_span(chunk)})",
+                     plate={'columns': columns, 'rows': rows, 'dir': str(plate_dir), 'name': f"plate-{number:03d}"})
+                for number, chunk in enumerate(chunks, 1)]
+
+    size = max(1, min(MAX_CHUNK, math.ceil(len(items) / (max(1, workers) * 4))))
+    return [dict(settings, series=chunk, output_name=f"series {_span(chunk)}") for chunk in chunked(items, size)]
+
+
+def _span(chunk):
+    return f"{chunk[0]['n']}-{chunk[-1]['n']}"
+
+
+def _item_params(item):
+    return {key: item[key] for key in ('input', 'text_content', 'text_content_top', 'output_name')}
+
+
+def _base_params(settings):
+    """Job settings without the series fields (pipeline stage keys must stay hashable)"""
+    return {key: value for key, value in settings.items() if key not in ('series', 'plate')}
+
+
+def generate_series(pipeline, settings, conn):
+    """Worker side: generate all items of a series job (per-item models or one packed plate)"""
+    items = settings['series']
+    if settings.get('plate'):
+        return _generate_plate(pipeline, settings, conn)
+
+    errors = []
+    last_stl = None
+    for number, item in enumerate(items, 1):
+        conn.send(('progress', f"{number}/{len(items)}: {item['output_name']}"))
+        params = dict(_base_params(settings), **_item_params(item))
+        try:
+            generator = pipeline.make_generator(params, settings['output_dir'], output_name=item['output_name'])
+            generator.engine = settings.get('engine', generator.engine)
+            _, last_stl, _ = generator.generate(qr_input=item['input'])
+        except Exception as e:
+            errors.append(f"{item['n']}: {e}")
+
+    if errors:
+        conn.send(('failed', f"{len(errors)} of {len(items)} failed - " + "; ".join(errors[:3])))
+    else:
+        conn.send(('done', str(last_stl), f"Generated {len(items)} models ({_span(items)})"))
+
+
+def _generate_plate(pipeline, settings, conn):
+    """Arrange the items' native meshes in a grid and write one STL plus a JSON map (body STLs and 3MF if requested)"""
+    from .generator import BODIES, QRModelGenerator
+    from .mesh import Mesh
+
+    items = settings['series']
+    layout = settings['plate']
+    plate = Mesh()
+    bodies = {body: Mesh() for body in BODIES} if settings.get('bodies') else {}
+    placements = []
+    for index, item in enumerate(items):
+        conn.send(('progress', f"{index + 1}/{len(items)}: {item['output_name']}"))
+        params = dict(_base_params(settings), **_item_params(item))
+        mesh = pipeline.get('model', params)
+        dimensions = pipeline.get('dimensions', params)['dimensions']
+        (min_x, min_y, _), _ = mesh.bounds()
+        column, row = index % layout['columns'], index // layout['columns']
+        x = column * (dimensions['card_width'] + PLATE_GAP)
+        y = row * (dimensions['card_length'] + PLATE_GAP)
+        plate.extend(mesh.translated(x - min_x, y - min_y, 0))
+        for body, body_mesh in bodies.items():
+            for part in BODIES[body]:
+                body_mesh.extend(pipeline.get(part, params).translated(x - min_x, y - min_y, 0))
+        placements.append({'n': item['n'], 'input': item['input'], 'text': item['text_content'],
+                           'column': column, 'row': row, 'x_mm': round(x, 3), 'y_mm': round(y, 3)})
+
+    plate_dir = Path(layout['dir'])
+    stl_path = plate_dir / f"{layout['name']}.stl"
+    plate.write_stl(stl_path, name=layout['name'])
+    if bodies:
+        for body, path in QRModelGenerator.body_paths(stl_path).items():
+            bodies[body].write_stl(path, name=path.stem)
+    plate_map = {'mode': settings['mode'], 'cards': placements}
+    with open(plate_dir / f"{layout['name']}.json", 'w', encoding='utf-8') as f:
+        json.dump(plate_map, f, indent=2, ensure_ascii=False)
+    if settings.get('3mf'):
+        from .threemf import write_3mf
+        write_3mf(stl_path.with_suffix('.3mf'), bodies or {'model': plate}, name=layout['name'], metadata=plate_map)
+    conn.send(('done', str(stl_path), f"{layout['name']}: {len(items)} cards ({_span(items)})"))
@@ -0,0 +1,301 @@
+"""
+STL compactor for OpenSCAD output
+
+OpenSCAD writes ASCII STL: every triangle repeats its vertices as text, and
+the CSG result keeps the many coplanar triangles of the unioned cubes. The
+compactor rewrites such a file without changing its shape:
+
+- the file is memory-mapped and parsed in place (ASCII or binary STL)
+- duplicate vertices are welded (exact coordinates, as OpenSCAD writes them)
+- coplanar facets are merged by removing vertices that lie inside a flat
+  region or on a straight edge between two flat regions, and
+  re-triangulating the hole; only where safe: the vertex must have a single
+  closed fan of faces (manifold), the faces must be flat within PLANE_TOLERANCE
+  and the re-triangulation must not create slivers or T-junctions - any
+  other vertex is kept
+- the result is written as binary STL (and can go into a 3MF, see threemf)
+
+Pure Python (mmap, re, struct) like the rest of the mesh code.
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+
+from .mesh import Mesh
+
+# Maximum distance in mm of a removed vertex from the plane of its neighbours
+PLANE_TOLERANCE = 1e-5
+
+# Minimum cosine between face normals of one flat region
+NORMAL_TOLERANCE = 1e-6
+
+ASCII_VERTEX = re.compile(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+BINARY_TRIANGLE = struct.Struct('<12x9f2x')
+
+
+def read_stl(path):
+    """
+    Read an STL file (ASCII or binary) as a welded mesh.
+
+    Returns:
+        Mesh with every distinct vertex once
+    """
+    index_of = {}
+    vertices = []
+    faces = []
+    corners = []
+
+    def add(point):
+        index = index_of.get(point)
+        if index is None:
+            index = index_of[point] = len(vertices)
+            vertices.append(point)
+        corners.append(index)
+        if len(corners) == 3:
+            if corners[0] != corners[1] and corners[1] != corners[2] and corners[0] != corners[2]:
+                faces.append(tuple(corners))
+            corners.clear()
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return Mesh()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            count = struct.unpack_from('<I', data, 80)[0] if len(data) >= 84 else -1
+            if len(data) == 84 + 50 * count:
+                for values in BINARY_TRIANGLE.iter_unpack(memoryview(data)[84:]):
+                    add(values[0:3])
+                    add(values[3:6])
+                    add(values[6:9])
+            else:
+                for match in ASCII_VERTEX.finditer(data):
+                    add((float(match[1]), float(match[2]), float(match[3])))
+    return Mesh(vertices, faces)
+
+
+def _sub(a, b):
+    return a[0] - b[0], a[1] - b[1], a[2] - b[2]
+
+
+def _cross(a, b):
+    return a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _normal(p0, p1, p2):
+    n = _cross(_sub(p1, p0), _sub(p2, p0))
+    length = math.sqrt(_dot(n, n))
+    return None if length == 0 else (n[0] / length, n[1] / length, n[2] / length)
+
+
+def _angle(center, a, b):
+    u, w = _sub(a, center), _sub(b, center)
+    return math.atan2(math.sqrt(_dot(_cross(u, w), _cross(u, w))), _dot(u, w))
+
+
+def _triangulate(points, chain, normal):
+    """
+    Ear clipping of the polygon chain (vertex indices, counter-clockwise around normal).
+
+    Returns:
+        List of index triples, or None if the polygon cannot be split without
+        degenerate triangles or vertices on triangle edges
+    """
+    axis = max(range(3), key=lambda k: abs(normal[k]))
+    u, w = (axis + 1) % 3, (axis + 2) % 3
+    flip = -1.0 if normal[axis] < 0 else 1.0
+    flat = {index: (points[index][u] * flip, points[index][w]) for index in chain}
+
+    def cross(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    remaining = list(chain)
+    triangles = []
+    while len(remaining) > 3:
+        for k in range(len(remaining)):
+            ia, ib, ic = remaining[k - 1], remaining[k], remaining[(k + 1) % len(remaining)]
+            a, b, c = flat[ia], flat[ib], flat[ic]
+            if cross(a, b, c) <= 0:
+                continue
+            if any(cross(a, b, flat[j]) >= 0 and cross(b, c, flat[j]) >= 0 and cross(c, a, flat[j]) >= 0
+                   for j in remaining if j not in (ia, ib, ic)):
+                continue
+            triangles.append((ia, ib, ic))
+            del remaining[k]
+            break
+        else:
+            return None
+    if cross(*(flat[index] for index in remaining)) <= 0:
+        return None
+    triangles.append(tuple(remaining))
+    return triangles
+
+
+class _Decimator:
+    """Removes vertices of flat regions and straight creases from a welded mesh"""
+
+    def __init__(self, mesh):
+        self.points = mesh.vertices
+        self.faces = list(mesh.faces)
+        self.normals = [_normal(*(self.points[i] for i in face)) for face in self.faces]
+        self.vertex_faces = [set() for _ in self.points]
+        for index, face in enumerate(self.faces):
+            for vertex in face:
+                self.vertex_faces[vertex].add(index)
+
+    def fan(self, vertex):
+        """Faces around vertex in order with their outer ring vertices, or None if not a closed manifold fan"""
+        links = {}
+        for index in self.vertex_faces[vertex]:
+            a, b, c = self.faces[index]
+            nxt, after = (b, c) if a == vertex else (c, a) if b == vertex else (a, b)
+            if nxt in links:
+                return None
+            links[nxt] = (after, index)
+        start = next(iter(links))
+        order = []
+        current = start
+        for _ in range(len(links)):
+            after, index = links.get(current, (None, None))
+            if after is None:
+                return None
+            order.append((current, index))
+            current = after
+        return order if current == start else None
+
+    def same_plane(self, first, second):
+        return _dot(self.normals[first], self.normals[second]) >= 1 - NORMAL_TOLERANCE
+
+    def flat(self, vertex, ring, normal):
+        """True if the ring lies within PLANE_TOLERANCE of the plane through vertex"""
+        center = self.points[vertex]
+        return all(abs(_dot(_sub(self.points[index], center), normal)) <= PLANE_TOLERANCE for index in ring)
+
+    def joins_existing_edge(self, vertex, ring, new_faces):
+        """True if a new inner edge already exists elsewhere (the result would not be manifold)"""
+        outer = {frozenset(pair) for pair in zip(ring, ring[1:] + ring[:1])}
+        removed = self.vertex_faces[vertex]
+        for a, b, c in new_faces:
+            for edge in ((a, b), (b, c), (c, a)):
+                if frozenset(edge) not in outer and (self.vertex_faces[edge[0]] & self.vertex_faces[edge[1]]) - removed:
+                    return True
+        return False
+
+    def replacement(self, vertex):
+        """New faces (index triples) without vertex, or None if it must stay"""
+        order = self.fan(vertex)
+        if order is None or len(order) < 3 or any(self.normals[index] is None for _, index in order):
+            return None
+        ring = [ring_vertex for ring_vertex, _ in order]
+        faces = self.retriangulate(vertex, order, ring)
+        if faces is None or self.joins_existing_edge(vertex, ring, faces):
+            return None
+        return faces
+
+    def retriangulate(self, vertex, order, ring):
+        """Triangulation of the fan's flat region(s) without vertex, or None"""
+        center = self.points[vertex]
+        # Regions: runs of consecutive coplanar faces around the vertex
+        breaks = [k for k in range(len(order)) if not self.same_plane(order[k - 1][1], order[k][1])]
+        if not breaks:
+            normal = self.normals[order[0][1]]
+            angle = sum(_angle(center, self.points[ring[k - 1]], self.points[ring[k]]) for k in range(len(ring)))
+            if abs(angle - 2 * math.pi) > 1e-6 or not self.flat(vertex, ring, normal):
+                return None
+            return _triangulate(self.points, ring, normal)
+        if len(breaks) != 2:
+            return None
+        # Straight crease: the two region borders and the vertex are collinear, vertex in between
+        first, second = (self.points[ring[k]] for k in breaks)
+        to_first, to_second = _sub(first, center), _sub(second, center)
+        span = math.sqrt(_dot(to_first, to_first) * _dot(to_second, to_second))
+        along = _cross(to_first, to_second)
+        if _dot(to_first, to_second) >= 0 or math.sqrt(_dot(along, along)) > 1e-9 * span:
+            return None
+        faces = []
+        for start, end in (breaks, breaks[::-1]):
+            count = (end - start) % len(order)
+            region = [order[(start + k) % len(order)] for k in range(count)]
+            chain = [ring_vertex for ring_vertex, _ in region] + [ring[end]]
+            normal = self.normals[region[0][1]]
+            angle = sum(_angle(center, self.points[chain[k]], self.points[chain[k + 1]]) for k in range(count))
+            if abs(angle - math.pi) > 1e-6 or not self.flat(vertex, chain, normal):
+                return None
+            region_faces = _triangulate(self.points, chain, normal)
+            if region_faces is None:
+                return None
+            faces += region_faces
+        return faces
+
+    def remove(self, vertex, new_faces):
+        for index in list(self.vertex_faces[vertex]):
+            for corner in self.faces[index]:
+                self.vertex_faces[corner].discard(index)
+            self.faces[index] = None
+        for face in new_faces:
+            index = len(self.faces)
+            self.faces.append(face)
+            self.normals.append(_normal(*(self.points[i] for i in face)))
+            for corner in face:
+                self.vertex_faces[corner].add(index)
+
+    def run(self):
+        removed = True
+        while removed:
+            removed = False
+            for vertex in range(len(self.points)):
+                if not self.vertex_faces[vertex]:
+                    continue
+                new_faces = self.replacement(vertex)
+                if new_faces is not None:
+                    self.remove(vertex, new_faces)
+                    removed = True
+        used = {}
+        vertices = []
+        faces = []
+        for face in self.faces:
+            if face is None:
+                continue
+            for corner in face:
+                if corner not in used:
+                    used[corner] = len(vertices)
+                    vertices.append(self.points[corner])
+            faces.append(tuple(used[corner] for corner in face))
+        return Mesh(vertices, faces)
+
+
+def merge_coplanar(mesh):
+    """
+    Merge coplanar facets of a welded mesh (see module docstring).
+
+    Returns:
+        New mesh with the same surface and fewer triangles
+    """
+    return _Decimator(mesh).run()
+
+
+def compact_stl(path, name=None):
+    """
+    Rewrite an STL file (e.g. OpenSCAD's ASCII output) as a welded, merged binary STL.
+
+    Args:
+        path: STL file, replaced in place
+        name: Header name (default: file stem)
+
+    Returns:
+        Dict with mesh (the compacted Mesh), triangles_before, triangles, bytes_before and bytes
+    """
+    path = str(path)
+    bytes_before = os.path.getsize(path)
+    welded = read_stl(path)
+    mesh = merge_coplanar(welded)
+    temp_path = path + '.tmp'
+    mesh.write_stl(temp_path, name=name or os.path.splitext(os.path.basename(path))[0])
+    os.replace(temp_path, path)
+    return {'mesh': mesh, 'triangles_before': len(welded.faces), 'triangles': len(mesh.faces),
+            'bytes_before': bytes_before, 'bytes': os.path.getsize(path)}
@@ -0,0 +1,138 @@
+"""
+Content-addressed model store
+
+Generated models are stored once per request under the hash of a canonical
+description of everything that determines their bytes (QR matrix, mode,
+parameters, texts, engine, version):
+
+    <store>/objects/ab/abcdef.../model.png|.scad|.stl|.json (+ model-base.stl, model-relief.stl)
+
+Human-named output directories ("acme-medium-thin/acme-medium-thin.stl", ...)
+only contain links to the stored files (symlinks, hard links where symlinks
+are not allowed, copies as last resort). Repeating an identical request
+renders nothing and adds no data - it just links (or reuses) a directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from . import __version__
+from .matrix import matrix_hash
+
+# Bump when the stored layout or key description changes
+STORE_FORMAT = 1
+
+# Files of a stored model (suffix → name in the object directory)
+MODEL_FILES = ['.png', '.scad', '.stl', '.json']
+
+
+def request_key(generator, matrix, qr_input=None):
+    """SHA-256 of the canonical request description (sorted keys, compact separators)"""
+    request = {
+        'format': STORE_FORMAT,
+        'version': __version__,
+        'engine': generator.engine,
+        'mode': generator.mode,
+        'matrix': matrix_hash(matrix),
+        'qr_input': qr_input or generator.input_name,
+        'card_height': generator.card_height,
+        'qr_margin': generator.qr_margin,
+        'qr_relief': generator.qr_relief,
+        'corner_radius': generator.corner_radius,
+        'size_scale': generator.size_scale,
+        'text_content': generator.text_content,
+        'text_content_top': generator.text_content_top,
+        'text_rotation': generator.text_rotation,
+        'text_height': generator.text_height,
+    }
+    if generator.split_bodies:
+        request['bodies'] = True  # Extra files; models without them keep their keys
+    if generator.three_mf:
+        request['3mf'] = True
+    if generator.engine == 'openscad' and not generator.compact_output:
+        request['compact'] = False  # OpenSCAD's STL as written
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def link_file(target, link):
+    """Link `link` to `target`: symlink, else hard link, else copy. Returns the method used"""
+    try:
+        os.symlink(os.path.relpath(target, link.parent), link)
+        return 'symlink'
+    except (OSError, NotImplementedError):
+        pass
+    try:
+        os.link(target, link)
+        return 'hardlink'
+    except OSError:
+        shutil.copy2(target, link)
+        return 'copy'
+
+
+class ModelStore:
+    """Content-addressed store of generated models"""
+
+    def __init__(self, root):
+        self.root = Path(root).expanduser()
+
+    def object_dir(self, key):
+        return self.root / 'objects' / key[:2] / key
+
+    def lookup(self, key):
+        """Object directory of a complete stored model, or None"""
+        path = self.object_dir(key)
+        if all((path / f"model{suffix}").exists() for suffix in MODEL_FILES):
+            return path
+        return None
+
+    def work_dir(self):
+        """Fresh scratch directory inside the store (same file system, so commit() is a rename)"""
+        tmp = self.root / 'tmp'
+        tmp.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix='render_', dir=tmp))
+
+    def commit(self, key, work_dir):
+        """Move a finished work directory into the store; returns the object directory"""
+        target = self.object_dir(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(work_dir, target)
+        except OSError:
+            # Stored concurrently by another process - keep that one
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return target
+
+    @staticmethod
+    def _links_to(model_dir, object_dir):
+        """True if a human-named directory already links to this object"""
+        try:
+            return (model_dir / f"{model_dir.name}.json").samefile(object_dir / 'model.json')
+        except OSError:
+            return False
+
+    def link(self, object_dir, model_dir):
+        """
+        Populate a human-named directory with links to a stored model.
+
+        Returns:
+            (scad_path, stl_path, json_path) inside model_dir
+        """
+        model_dir.mkdir(parents=True, exist_ok=True)
+        if not self._links_to(model_dir, object_dir):
+            # MODEL_FILES plus optional files such as separate bodies (model-base.stl → NAME-base.stl) or 3MF
+            for target in sorted(object_dir.iterdir()):
+                link = model_dir / target.name.replace('model', model_dir.name, 1)
+                if link.is_symlink() or link.exists():
+                    link.unlink()
+                link_file(target, link)
+        return tuple(model_dir / f"{model_dir.name}{suffix}" for suffix in ('.scad', '.stl', '.json'))
+
+    def linked_dir(self, object_dir, output_base_dir, final_name):
+        """The human-named directory final_name if it already links to this object, else None"""
+        model_dir = Path(output_base_dir) / final_name
+        return model_dir if self._links_to(model_dir, object_dir) else None
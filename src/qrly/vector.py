@@ -0,0 +1,277 @@
+"""
+Vector QR code input (SVG)
+
+Reads the module matrix straight from the shapes of an SVG file instead of
+rasterizing it: dark `rect` elements, filled rectilinear `path` elements
+(M/L/H/V/Z commands, as written by qrcode's SVG factories and most QR tools)
+and stroked horizontal/vertical path segments (e.g. segno) are collected as
+axis-aligned edges. The module size is the smallest distance between two edge
+coordinates (every QR code has single-module features in its timing pattern),
+and each module is dark if its center lies inside a shape.
+
+The result is the exact module matrix with a quiet zone of qr_encode.BORDER
+modules - the same layout as the images generated for URL inputs - without
+resampling or aliasing.
+"""
+
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# Input suffixes handled by this module
+VECTOR_SUFFIXES = {'.svg'}
+
+# Lengths in CSS pixels per unit
+UNITS = {'': 1.0, 'px': 1.0, 'mm': 96 / 25.4, 'cm': 96 / 2.54, 'in': 96.0, 'pt': 96 / 72, 'pc': 16.0}
+
+# Fill/stroke colors treated as background
+LIGHT_COLORS = {'none', 'transparent', 'white', '#fff', '#ffffff', 'rgb(255,255,255)'}
+
+# Relative tolerance when snapping coordinates to the module grid
+TOLERANCE = 0.05
+
+PATH_TOKEN = re.compile(r'[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def is_vector(source):
+    """True for SVG files and in-memory SVG data (bytes or seekable binary file objects)"""
+    if isinstance(source, (str, os.PathLike)):
+        return str(source).lower().endswith(tuple(VECTOR_SUFFIXES))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:1024])
+    elif hasattr(source, 'read') and hasattr(source, 'seek'):
+        position = source.tell()
+        head = source.read(1024)
+        source.seek(position)
+    else:
+        return False
+    return isinstance(head, bytes) and head.lstrip().startswith(b'<') and b'<svg' in head
+
+
+def load_svg_matrix(path, border=None):
+    """
+    Exact module matrix of a QR code SVG.
+
+    Args:
+        path: SVG file, SVG data (bytes) or binary file object
+        border: Quiet zone in modules around the code (default: qr_encode.BORDER)
+
+    Returns:
+        Matrix (list of rows of booleans, True = dark)
+
+    Raises:
+        ValueError: If the file has no dark shapes or they are not on a square module grid
+    """
+    from .qr_encode import BORDER
+
+    source = io.BytesIO(path) if isinstance(path, (bytes, bytearray, memoryview)) else path
+    try:
+        root = ET.parse(source).getroot()
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid SVG file: {e}")
+    shapes = []
+    _collect(root, _viewport(root), (1.0, 1.0, 0.0, 0.0), {'fill': 'black', 'stroke': 'none',
+                                                           'stroke-width': '1', 'fill-rule': 'nonzero'}, shapes)
+    if not shapes:
+        raise ValueError("No dark rect/path shapes found in the SVG file")
+    return rasterize(shapes, BORDER if border is None else border)
+
+
+def rasterize(shapes, border):
+    """
+    Module matrix of shapes (lists of vertical edges (x, y0, y1) plus their fill rule).
+
+    The grid origin is the top-left corner of the dark area (the finder pattern),
+    the module size the smallest distance between edge coordinates.
+    """
+    xs = sorted({round(x, 6) for edges, _ in shapes for x, _, _ in edges})
+    ys = sorted({round(y, 6) for edges, _ in shapes for _, y0, y1 in edges for y in (y0, y1)})
+    extent = max(xs[-1] - xs[0], ys[-1] - ys[0])
+    steps = [b - a for values in (xs, ys) for a, b in zip(values, values[1:]) if b - a > extent * 1e-4]
+    module = min(steps)
+    # Refine over all coordinates (one short step could be a rounding artefact)
+    module = sum(step / round(step / module) for step in steps) / len(steps)
+
+    def grid(value, origin):
+        cells = (value - origin) / module
+        if abs(cells - round(cells)) > TOLERANCE:
+            raise ValueError(f"Shapes are not on a module grid (coordinate {value:g} is {cells:.2f} modules from the origin)")
+        return int(round(cells))
+
+    min_x, min_y = xs[0], ys[0]
+    width, height = grid(xs[-1], min_x), grid(ys[-1], min_y)
+    if width != height:
+        raise ValueError(f"QR code is not square ({width}x{height} modules)")
+
+    matrix = [[False] * (width + 2 * border) for _ in range(height + 2 * border)]
+    for row in range(height):
+        center = min_y + (row + 0.5) * module
+        for edges, rule in shapes:
+            crossings = sorted((grid(x, min_x), 1 if y1 > y0 else -1)
+                               for x, y0, y1 in edges if min(y0, y1) < center < max(y0, y1))
+            winding = 0
+            for (start, direction), (end, _) in zip(crossings, crossings[1:] + [(width, 0)]):
+                winding += direction
+                inside = winding % 2 if rule == 'evenodd' else winding != 0
+                if inside:
+                    for column in range(start, end):
+                        matrix[row + border][column + border] = True
+    return matrix
+
+
+def _viewport(root):
+    """(width, height) of the root viewport in user units, for percentage lengths"""
+    view_box = root.get('viewBox')
+    if view_box:
+        values = [float(value) for value in re.split(r'[\s,]+', view_box.strip())]
+        if len(values) == 4:
+            return values[2], values[3]
+    return _length(root.get('width', '100'), 0), _length(root.get('height', '100'), 0)
+
+
+def _length(text, reference):
+    match = re.fullmatch(r'\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(%|[a-z]*)\s*', text or '0')
+    if not match:
+        raise ValueError(f"Unsupported SVG length '{text}'")
+    value, unit = float(match.group(1)), match.group(2)
+    if unit == '%':
+        return value / 100 * reference
+    if unit not in UNITS:
+        raise ValueError(f"Unsupported SVG length unit '{unit}'")
+    return value * UNITS[unit]
+
+
+def _transform(text, current):
+    """Compose a transform attribute (translate/scale/axis-aligned matrix) with (sx, sy, tx, ty)"""
+    for name, args in re.findall(r'(\w+)\s*\(([^)]*)\)', text or ''):
+        values = [float(value) for value in re.split(r'[\s,]+', args.strip()) if value]
+        if name == 'translate':
+            sx, sy, tx, ty = 1.0, 1.0, values[0], values[1] if len(values) > 1 else 0.0
+        elif name == 'scale':
+            sx, sy, tx, ty = values[0], values[1] if len(values) > 1 else values[0], 0.0, 0.0
+        elif name == 'matrix' and values[1] == 0 and values[2] == 0:
+            sx, sy, tx, ty = values[0], values[3], values[4], values[5]
+        elif name == 'rotate' and values[0] % 360 == 0:
+            continue
+        else:
+            raise ValueError(f"Unsupported SVG transform '{name}({args})' (only axis-aligned transforms)")
+        csx, csy, ctx, cty = current
+        current = (csx * sx, csy * sy, csx * tx + ctx, csy * ty + cty)
+    return current
+
+
+def _style(element, inherited):
+    style = dict(inherited)
+    for key in ('fill', 'stroke', 'stroke-width', 'fill-rule'):
+        if element.get(key) is not None:
+            style[key] = element.get(key)
+    for declaration in (element.get('style') or '').split(';'):
+        key, _, value = declaration.partition(':')
+        if key.strip() in style and value.strip():
+            style[key.strip()] = value.strip()
+    return style
+
+
+def _is_dark(color):
+    return color.replace(' ', '').lower() not in LIGHT_COLORS
+
+
+def _collect(element, viewport, transform, inherited, shapes):
+    """Append (vertical edges, fill rule) of the dark shapes below element to shapes"""
+    tag = element.tag.rsplit('}', 1)[-1]
+    if tag in ('defs', 'clipPath', 'mask', 'symbol', 'title', 'desc', 'metadata'):
+        return
+    style = _style(element, inherited)
+    transform = _transform(element.get('transform'), transform)
+    sx, sy, tx, ty = transform
+
+    def point(x, y):
+        return sx * x + tx, sy * y + ty
+
+    if tag == 'rect' and _is_dark(style['fill']):
+        x, y = _length(element.get('x'), viewport[0]), _length(element.get('y'), viewport[1])
+        width, height = _length(element.get('width'), viewport[0]), _length(element.get('height'), viewport[1])
+        if width > 0 and height > 0:
+            shapes.append((_rect_edges(point(x, y), point(x + width, y + height)), 'nonzero'))
+    elif tag == 'path':
+        subpaths = _parse_path(element.get('d', ''))
+        if _is_dark(style['fill']):
+            edges = []
+            for subpath in subpaths:
+                vertices = [point(x, y) for x, y in subpath]
+                for (x0, y0), (x1, y1) in zip(vertices, vertices[1:] + vertices[:1]):
+                    if x0 == x1 and y0 != y1:
+                        edges.append((x0, y0, y1))
+            if edges:
+                shapes.append((edges, style['fill-rule']))
+        if _is_dark(style['stroke']):
+            # Stroked segments with butt caps are rectangles of the stroke width
+            half = _length(style['stroke-width'], 0) / 2
+            for subpath in subpaths:
+                for (x0, y0), (x1, y1) in zip(subpath, subpath[1:]):
+                    if y0 == y1:
+                        corners = point(min(x0, x1), y0 - half), point(max(x0, x1), y0 + half)
+                    else:
+                        corners = point(x0 - half, min(y0, y1)), point(x0 + half, max(y0, y1))
+                    shapes.append((_rect_edges(*corners), 'nonzero'))
+    for child in element:
+        _collect(child, viewport, transform, style, shapes)
+
+
+def _rect_edges(corner, opposite):
+    (x0, y0), (x1, y1) = corner, opposite
+    return [(x0, y0, y1), (x1, y1, y0)]
+
+
+def _parse_path(d):
+    """
+    Subpaths (vertex lists) of path data with M, L, H, V and Z commands.
+
+    Raises:
+        ValueError: For curves, arcs or diagonal lines (not a module grid)
+    """
+    tokens = PATH_TOKEN.findall(d)
+    subpaths = []
+    vertices = []
+    x = y = start_x = start_y = 0.0
+    command = None
+    index = 0
+    while index < len(tokens):
+        if tokens[index].isalpha():
+            command = tokens[index]
+            index += 1
+            if command in 'Zz':
+                if vertices:
+                    subpaths.append(vertices)
+                vertices = []
+                x, y = start_x, start_y
+                continue
+        if command is None or command not in 'MmLlHhVv':
+            raise ValueError(f"Unsupported SVG path command '{command}' (only rectilinear M/L/H/V/Z paths)")
+        relative = command.islower()
+        if command in 'MmLl':
+            dx, dy = float(tokens[index]), float(tokens[index + 1])
+            index += 2
+            new_x, new_y = (x + dx, y + dy) if relative else (dx, dy)
+        elif command in 'Hh':
+            new_x, new_y = (x + float(tokens[index]) if relative else float(tokens[index])), y
+            index += 1
+        else:
+            new_x, new_y = x, (y + float(tokens[index]) if relative else float(tokens[index]))
+            index += 1
+
+        if command in 'Mm':
+            if vertices:
+                subpaths.append(vertices)
+            vertices = [(new_x, new_y)]
+            start_x, start_y = new_x, new_y
+            command = 'l' if relative else 'L'  # Further coordinate pairs are line segments
+        else:
+            if new_x != x and new_y != y:
+                raise ValueError("Diagonal SVG path segment (only horizontal and vertical lines)")
+            vertices.append((new_x, new_y))
+        x, y = new_x, new_y
+    if vertices:
+        subpaths.append(vertices)
+    return subpaths
@@ -0,0 +1,355 @@
+"""
+Watch folder (hot folder) processing
+
+`qrly watch <dir>` picks up QR images and job manifests (JSON, JSON Lines,
+CSV - see planner.load_jobs) dropped into a folder and generates their models
+on a bounded pool of worker processes (job_queue.JobQueue):
+
+    <dir>/               incoming images and manifests
+    <dir>/output/        generated models (usual per-model directories)
+    <dir>/processed/     inputs whose jobs all succeeded
+    <dir>/error/         inputs with failed jobs, plus <name>.log with the errors
+
+A file is taken once its size and modification time have not changed for
+`settle` seconds, so partially written (or copied) files are never read.
+New files are noticed through inotify on Linux; elsewhere, or with
+--polling (e.g. network shares that deliver no events), the folder is
+rescanned every `interval` seconds.
+
+Progress is kept in <dir>/.qrly-watch.json: after a restart, finished jobs of
+a partially processed manifest are not generated again.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sys
+import time
+from pathlib import Path
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.svg'}
+MANIFEST_SUFFIXES = {'.json', '.jsonl', '.csv'}
+TEMP_SUFFIXES = {'.part', '.tmp', '.crdownload', '.download'}
+
+STATE_NAME = '.qrly-watch.json'
+
+# inotify event mask (see inotify(7))
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+
+class PollingWatcher:
+    """Rescans the folder after a timeout"""
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return False
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Wakes up early on new or finished files in one directory (Linux inotify via ctypes)"""
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {path}")
+
+    def wait(self, timeout):
+        """Wait for events (at most timeout seconds); True if any arrived"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):  # Drain - the folder is rescanned anyway
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(path, polling=False):
+    """inotify watcher where available, else a polling one"""
+    if polling or not sys.platform.startswith('linux'):
+        return PollingWatcher()
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError) as e:
+        print(f"⚠ inotify not available ({e}), polling instead")
+        return PollingWatcher()
+
+
+def unique_path(directory, name):
+    """directory/name, or "stem (N).suffix" if that exists"""
+    path = directory / name
+    counter = 1
+    while path.exists():
+        path = directory / f"{Path(name).stem} ({counter}){Path(name).suffix}"
+        counter += 1
+    return path
+
+
+class WatchFolder:
+    """Hot folder: turns settled input files into generation jobs"""
+
+    def __init__(self, folder, output_dir=None, mode='square', engine='openscad', workers=None,
+                 settle=2.0, queue=None):
+        from .job_queue import JobQueue, default_workers
+
+        self.folder = Path(folder).expanduser()
+        self.output_dir = Path(output_dir).expanduser() if output_dir else self.folder / 'output'
+        self.processed_dir = self.folder / 'processed'
+        self.error_dir = self.folder / 'error'
+        self.state_path = self.folder / STATE_NAME
+        self.defaults = {'mode': mode, 'engine': engine}
+        self.settle = settle
+        self.queue = queue or JobQueue(workers or default_workers())
+
+        self.seen = {}  # path → (size, mtime_ns, first seen unchanged)
+        self.sources = {}  # path → {'key', 'files', 'jobs': {job id: index}, 'errors': []}
+        self.claimed = set()  # Images referenced by an active manifest
+        self.state = self._load_state()
+
+    # State file
+
+    def _load_state(self):
+        """Saved progress, without entries of inputs that are gone"""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {key: entry for key, entry in state.items() if (self.folder / key.rsplit(':', 2)[0]).exists()}
+
+    def _save_state(self):
+        tmp = self.state_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    @staticmethod
+    def _key(path, stat):
+        return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    # Scanning
+
+    def _candidates(self):
+        for entry in os.scandir(self.folder):
+            path = Path(entry.path)
+            suffix = path.suffix.lower()
+            if (entry.name.startswith('.') or not entry.is_file() or suffix in TEMP_SUFFIXES
+                    or entry.name.endswith('~') or suffix not in IMAGE_SUFFIXES | MANIFEST_SUFFIXES):
+                continue
+            if path in self.sources or path in self.claimed:
+                continue
+            yield path
+
+    def settled_files(self, now=None):
+        """Input files unchanged for `settle` seconds (manifests first)"""
+        now = time.monotonic() if now is None else now
+        ready = []
+        current = set()
+        for path in self._candidates():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Removed meanwhile
+            current.add(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = self.seen.get(path)
+            if previous is None or previous[:2] != signature:
+                self.seen[path] = (*signature, now)
+            elif stat.st_size > 0 and now - previous[2] >= self.settle:
+                ready.append(path)
+        self.seen = {path: value for path, value in self.seen.items() if path in current}
+        ready.sort(key=lambda path: (path.suffix.lower() not in MANIFEST_SUFFIXES, path.name))
+        return ready
+
+    @property
+    def unsettled(self):
+        """True while non-empty input files wait to settle"""
+        return any(size > 0 for size, _, _ in self.seen.values())
+
+    # Jobs
+
+    def _jobs_for(self, path):
+        """(jobs, claimed image paths) for an input file"""
+        from .generator import QRModelGenerator
+        from .planner import load_jobs
+
+        if path.suffix.lower() in IMAGE_SUFFIXES:
+            return [dict(self.defaults, input=str(path), name=path.stem)], []
+
+        jobs = []
+        claimed = []
+        for job in load_jobs(path):
+            job = dict(self.defaults, **job)
+            if not QRModelGenerator.is_url(job['input']):
+                image = Path(job['input']).expanduser()
+                if not image.is_absolute():
+                    image = path.parent / image  # Relative to the manifest
+                if image.parent == self.folder:
+                    claimed.append(image)  # Moved along with the manifest
+                job['input'] = str(image)
+            jobs.append(job)
+        return jobs, claimed
+
+    def submit(self, path):
+        """Queue the (not yet finished) jobs of a settled input file"""
+        from .planner import job_settings
+
+        if path in self.claimed or path in self.sources:
+            return 0  # Referenced by a manifest queued in the same scan
+        key = self._key(path, path.stat())
+        try:
+            jobs, claimed = self._jobs_for(path)
+        except (OSError, ValueError, KeyError) as e:
+            self._finish(path, {'key': key, 'files': [path], 'jobs': {}, 'errors': [f"Invalid manifest: {e}"]})
+            return 0
+
+        entry = self.state.setdefault(key, {'done': []})
+        source = {'key': key, 'files': [path] + claimed, 'jobs': {}, 'errors': []}
+        self.sources[path] = source
+        self.claimed.update(claimed)
+        for index, job in enumerate(jobs):
+            if index in entry['done']:
+                continue  # Finished before a restart
+            settings = dict(job_settings(job, self.output_dir, self.defaults['engine']), quiet=True)
+            source['jobs'][self.queue.submit(settings).id] = index
+        self._save_state()
+
+        skipped = len(jobs) - len(source['jobs'])
+        print(f"→ {path.name}: {len(source['jobs'])} job(s) queued" + (f", {skipped} already done" if skipped else ""))
+        if not source['jobs']:
+            self._finish(path, source)
+        return len(source['jobs'])
+
+    def collect(self):
+        """Record finished jobs; move inputs whose jobs are all finished"""
+        from .job_queue import DONE, FINISHED_STATES
+
+        for job in self.queue.poll():
+            if job.state not in FINISHED_STATES:
+                continue
+            for path, source in list(self.sources.items()):
+                if job.id not in source['jobs']:
+                    continue
+                index = source['jobs'].pop(job.id)
+                if job.state == DONE:
+                    self.state[source['key']]['done'].append(index)
+                    print(f"✓ {path.name} #{index + 1}: {job.message}")
+                else:
+                    source['errors'].append(f"Job {index + 1} ({job.name}): {job.message}")
+                    print(f"❌ {path.name} #{index + 1}: {job.message}")
+                self._save_state()
+                if not source['jobs']:
+                    self._finish(path, source)
+        self.queue.clear_finished()
+
+    def _finish(self, path, source):
+        """Move an input (and its claimed images) to processed/ or error/ and forget it"""
+        target_dir = self.error_dir if source['errors'] else self.processed_dir
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for file in source['files']:
+            if file.exists():
+                os.replace(file, unique_path(target_dir, file.name))
+            self.claimed.discard(file)
+        if source['errors']:
+            log = unique_path(target_dir, f"{path.name}.log")
+            log.write_text('\n'.join(source['errors']) + '\n', encoding='utf-8')
+            print(f"❌ {path.name} moved to {target_dir} (see {log.name})")
+        else:
+            print(f"✅ {path.name} done")
+        self.sources.pop(path, None)
+        self.state.pop(source['key'], None)
+        self._save_state()
+
+    @property
+    def busy(self):
+        return bool(self.sources) or self.queue.active
+
+    def run(self, interval=2.0, polling=False, once=False):
+        """
+        Process the folder until interrupted.
+
+        Args:
+            interval: Seconds between rescans without file system events
+            polling: Never use inotify
+            once: Exit when all files present at start (and added meanwhile) are processed
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        watcher = make_watcher(self.folder, polling)
+        print(f"👀 Watching {self.folder} (output: {self.output_dir}, {self.queue.max_workers} worker(s))")
+        try:
+            while True:
+                for path in self.settled_files():
+                    self.submit(path)
+                self.collect()
+                if once and not self.busy and not self.unsettled:
+                    break
+                if self.busy:
+                    timeout = 0.2  # Collect job results promptly
+                elif self.unsettled:
+                    timeout = min(interval, self.settle / 2)
+                else:
+                    timeout = interval
+                watcher.wait(timeout)
+        finally:
+            watcher.close()
+            self.queue.shutdown()
+
+
+def main(argv=None):
+    from .generator import ENGINES
+
+    parser = argparse.ArgumentParser(
+        prog='qrly watch',
+        description='Generate 3D QR models from images and job manifests dropped into a folder'
+    )
+    parser.add_argument('folder', type=str, help='Folder to watch')
+    parser.add_argument('--output', '-o', type=str, default=None,
+                        help='Output directory for generated models (default: FOLDER/output)')
+    parser.add_argument('--mode', type=str, choices=['square', 'pendant', 'rectangle-text', 'pendant-text', 'rectangle-text-2x'],
+                        default='square', help='Mode for images and manifest entries without one (default: square)')
+    parser.add_argument('--engine', type=str, choices=ENGINES, default='openscad',
+                        help='Render engine for entries without one (default: openscad)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parallel worker processes (default: CPU count - 1)')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='Seconds a file must stay unchanged before it is processed (default: 2)')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Seconds between folder rescans (default: 2)')
+    parser.add_argument('--polling', action='store_true',
+                        help='Poll instead of using inotify (e.g. for network shares)')
+    parser.add_argument('--once', action='store_true',
+                        help='Process the files in the folder and exit')
+    args = parser.parse_args(argv)
+
+    folder = Path(args.folder).expanduser()
+    if not folder.is_dir():
+        print(f"❌ Error: Folder not found: {folder}")
+        sys.exit(1)
+
+    watch = WatchFolder(folder, args.output, args.mode, args.engine, args.workers, args.settle)
+    try:
+        watch.run(args.interval, args.polling, args.once)
+    except KeyboardInterrupt:
+        print("\n⏹ Stopped (unfinished jobs are resumed on the next start)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Tests for the SQLite catalog (output directory allocation, model lookup)"""
+
+import multiprocessing
+
+from qrly.catalog import CATALOG_NAME, Catalog, model_params
+from qrly.matrix import matrix_hash
+
+
+def test_allocates_sequential_names(tmp_path):
+    """Repeated names get counters; a deleted plain name is free again"""
+    catalog = Catalog(tmp_path)
+    first = catalog.allocate_dir("card")
+    second = catalog.allocate_dir("card")
+    (second / "card (1).stl").write_text("solid")
+    third = catalog.allocate_dir("card")
+
+    assert [first.name, second.name, third.name] == ["card", "card (1)", "card (2)"]
+    first.rmdir()
+    assert catalog.allocate_dir("card").name == "card"
+
+
+def test_existing_directories_are_skipped(tmp_path):
+    """Directories created before the catalog existed are found by the first allocation"""
+    for name in ("card", "card (1)", "card (4)", "card-large"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "model.stl").write_text("solid")
+
+    assert Catalog(tmp_path).allocate_dir("card").name == "card (5)"
+
+
+def _allocate(output_dir):
+    return Catalog(output_dir).allocate_dir("card").name
+
+
+def test_concurrent_allocation_is_unique(tmp_path):
+    """Processes allocating the same name at once never share a directory"""
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        names = pool.map(_allocate, [str(tmp_path)] * 12)
+
+    assert len(set(names)) == 12
+    assert sorted(path.name for path in tmp_path.iterdir() if path.is_dir()) == sorted(names)
+
+
+def _generator(tmp_path, image, **attributes):
+    from qrly.generator import QRModelGenerator
+
+    generator = QRModelGenerator(image, mode='rectangle-text', output_dir=tmp_path / "out", output_name="card")
+    generator.engine = 'native'
+    generator.move_input = False
+    generator.text_content = "HELLO"
+    for key, value in attributes.items():
+        setattr(generator, key, value)
+    return generator
+
+
+def test_generated_models_are_reused(tmp_path):
+    """generate() records models; with reuse an identical request returns them, other parameters do not"""
+    from qrly.generator import QRModelGenerator
+
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = _generator(tmp_path, image)
+    first = generator.generate(qr_input="https://example.com")
+    again = _generator(tmp_path, image, reuse=True).generate(qr_input="https://example.com")
+    thicker = _generator(tmp_path, image, reuse=True, card_height=2.0).generate(qr_input="https://example.com")
+
+    assert again == first
+    assert thicker[0].parent != first[0].parent
+    matrix, _, _ = generator.load_and_process_image()
+    entry = Catalog(tmp_path / "out").find_model(model_params(generator), matrix_hash(matrix))
+    assert entry['stl_path'] == first[1] and entry['engine'] == 'native' and entry['stl_bytes'] > 0
+
+
+def test_import_existing_metadata(tmp_path):
+    """Models generated before the catalog existed are found after import_metadata()"""
+    from qrly.generator import QRModelGenerator
+
+    image = QRModelGenerator.generate_qr_image("https://example.com/menu", tmp_path / "qr.png")
+    generator = _generator(tmp_path, image)
+    _, stl_path, _ = generator.generate()
+    (tmp_path / "out" / CATALOG_NAME).unlink()
+    stl_path.with_suffix('.png').unlink()  # The matrix hash comes from the metadata's qr_matrix
+
+    catalog = Catalog(tmp_path / "out")
+    assert catalog.find_model(model_params(generator), qr_input="qr.png") is None
+    assert catalog.import_metadata() == 1
+    matrix, _, _ = generator.load_and_process_image()
+    assert catalog.find_model(model_params(generator), matrix_hash(matrix))['stl_path'] == stl_path
@@ -120,3 +120,36 @@ def test_text_parameters():
     finally:
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
+
+
+def test_encode_matrix_roundtrip():
+    """Embedded matrices decode to the same modules and reject corrupted data"""
+    from qrly.matrix import decode_matrix, encode_matrix
+
+    matrix = [[(x * y + x) % 3 == 0 for x in range(13)] for y in range(11)]
+    encoded = encode_matrix(matrix)
+    assert decode_matrix(encoded) == matrix
+
+    encoded['sha256'] = '0' * 64
+    with pytest.raises(ValueError):
+        decode_matrix(encoded)
+
+
+def test_regenerate_from_metadata(tmp_path):
+    """A model rebuilt from its metadata JSON alone has the same SCAD geometry and parameters"""
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, "rectangle-text", tmp_path / "out", output_name="card")
+    generator.engine = 'native'
+    generator.text_content = "HELLO"
+    generator.size_scale = 2.0
+    scad_path, _, json_path = generator.generate(qr_input="https://example.com")
+    (json_path.parent / f"{json_path.stem}.png").unlink()  # Only the metadata is needed
+
+    rebuilt, qr_input = QRModelGenerator.from_metadata(json_path, tmp_path / "out")
+    rebuilt.engine = 'native'
+    new_scad, new_stl, _ = rebuilt.generate(qr_input=qr_input)
+
+    assert qr_input == "https://example.com"
+    assert new_scad.parent.name == "card-large-thin (1)"
+    assert new_scad.read_text().splitlines()[4:] == scad_path.read_text().splitlines()[4:]
+    assert new_stl.exists() and new_scad.with_suffix('.png').exists()
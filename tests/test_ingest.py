@@ -0,0 +1,69 @@
+"""Tests for image ingestion (sampling without full-resolution decode)"""
+
+from PIL import Image
+
+from qrly.ingest import sample_grayscale, sampling_rate
+
+
+def _stride_samples(img, sample_rate):
+    img = img.convert('L')
+    width, height = img.size
+    return [[img.getpixel((x, y)) for x in range(0, width, sample_rate)] for y in range(0, height, sample_rate)]
+
+
+def test_sampling_matches_stride_reading(tmp_path):
+    """Non-JPEG images give exactly the pixels at multiples of the sample rate"""
+    for mode, size in (('RGB', (1001, 733)), ('P', (390, 390)), ('RGBA', (45, 45))):
+        Image.effect_noise(size, 80).convert('RGB').convert(mode).save(tmp_path / "noise.png")
+        with Image.open(tmp_path / "noise.png") as img:
+            sample_rate = sampling_rate(*img.size)
+            sampled = sample_grayscale(img, sample_rate)
+        with Image.open(tmp_path / "noise.png") as img:
+            expected = _stride_samples(img, sample_rate)
+
+        assert [[sampled.getpixel((x, y)) for x in range(sampled.size[0])] for y in range(sampled.size[1])] == expected
+
+
+def test_large_jpeg_is_draft_decoded(tmp_path):
+    """A large JPEG is decoded at reduced size and still gives the matrix of the same image stored losslessly"""
+    from qrly.generator import QRModelGenerator
+
+    image = QRModelGenerator.generate_qr_image("https://example.com/photo", tmp_path / "qr.png")
+    with Image.open(image) as img:
+        photo = img.convert('RGB').resize((2400, 2400), Image.NEAREST)
+    photo.save(tmp_path / "photo.jpg", quality=90)
+    photo.save(tmp_path / "photo.png")
+
+    with Image.open(tmp_path / "photo.jpg") as img:
+        sample_grayscale(img, sampling_rate(*img.size))
+        assert img.size == (300, 300)  # 1/8 DCT scaling
+    assert (QRModelGenerator(tmp_path / "photo.jpg").load_and_process_image()
+            == QRModelGenerator(tmp_path / "photo.png").load_and_process_image())
+
+
+def test_in_memory_inputs(tmp_path):
+    """Bytes, file objects, PIL images and arrays give the matrix of the file, without input files"""
+    import io
+
+    from qrly.generator import QRModelGenerator
+
+    image = QRModelGenerator.generate_qr_image("https://example.com/upload", tmp_path / "qr.png")
+    expected = QRModelGenerator(image).load_and_process_image()
+    data = image.read_bytes()
+    with Image.open(image) as img:
+        pil_image = img.convert('L')
+    sources = [data, memoryview(data), io.BytesIO(data), pil_image]
+    try:
+        import numpy
+        sources += [numpy.asarray(pil_image), numpy.asarray(pil_image) < 128]  # Bool arrays: True = dark
+    except ImportError:
+        pass
+
+    for source in sources:
+        assert QRModelGenerator(source, output_dir=tmp_path / "out").load_and_process_image() == expected
+
+    generator = QRModelGenerator(data, output_dir=tmp_path / "out", output_name="order-17")
+    generator.engine = 'native'
+    _, stl_path, _ = generator.generate()
+    assert stl_path.parent.name.startswith("order-17")
+    assert stl_path.exists() and (stl_path.parent / f"{stl_path.stem}.png").exists()
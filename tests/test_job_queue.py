@@ -0,0 +1,76 @@
+"""Tests for the generation job queue"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from qrly.job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+from qrly.scheduler import RenderScheduler
+
+
+def _wait(queue, timeout=60):
+    deadline = time.time() + timeout
+    while queue.active and time.time() < deadline:
+        queue.poll()
+        time.sleep(0.05)
+
+
+def test_jobs_run_in_parallel_workers():
+    """Jobs are drained by worker processes and results stream in"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        queue = JobQueue(max_workers=2, scheduler=RenderScheduler(max_concurrent=2))
+        settings = {'input': 'https://example.com', 'mode': 'square', 'engine': 'native',
+                    'output_dir': tmpdir, 'height': 1.0, 'relief': 1.0}
+        jobs = [queue.submit(dict(settings, output_name=f"job{i}")) for i in range(3)]
+
+        assert [job.state for job in jobs] == [RUNNING, RUNNING, QUEUED]
+        _wait(queue)
+
+        assert [job.state for job in jobs] == [DONE, DONE, DONE], [job.message for job in jobs]
+        assert all(Path(job.stl_path).stat().st_size > 0 for job in jobs)
+
+
+def test_cancel_and_retry():
+    """A cancelled job can be queued again"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        queue = JobQueue(max_workers=1)
+        job = queue.submit({'input': 'https://example.com', 'output_name': 'job', 'output_dir': tmpdir,
+                            'engine': 'native'})
+        queue.cancel(job.id)
+        assert job.state == CANCELLED
+        assert not queue.active
+
+        queue.retry(job.id)
+        _wait(queue)
+        assert job.state == DONE
+        assert job.attempts == 2
+
+
+def test_memory_budget_limits_admission():
+    """Jobs wait while their estimated memory does not fit the budget"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        queue = JobQueue(max_workers=2, scheduler=RenderScheduler(max_concurrent=2, memory_budget_mb=1000))
+        settings = {'input': 'https://example.com', 'output_dir': tmpdir, 'engine': 'native', 'memory_mb': 600}
+        first = queue.submit(dict(settings, output_name='big1'))
+        second = queue.submit(dict(settings, output_name='big2'))
+        assert (first.state, second.state) == (RUNNING, QUEUED)
+
+        _wait(queue)
+        assert (first.state, second.state) == (DONE, DONE)
+        assert queue.scheduler.memory_in_use_mb == 0
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="OpenSCAD is hidden through PATH")
+def test_job_without_stl_fails(tmp_path, monkeypatch):
+    """A job whose STL export fails (here: no OpenSCAD) is reported as failed, not done"""
+    monkeypatch.setenv('PATH', str(tmp_path))  # Workers inherit the environment
+    queue = JobQueue(max_workers=1)
+    job = queue.submit({'input': 'https://example.com', 'output_name': 'job', 'output_dir': str(tmp_path),
+                        'engine': 'openscad'})
+    _wait(queue)
+
+    assert job.state == FAILED and job.stl_path is None
+    assert "No STL written" in job.message
@@ -0,0 +1,62 @@
+"""Tests for the job journal"""
+
+import os
+
+import pytest
+
+from qrly.journal import Journal, job_key
+
+
+def _output(tmp_path, name, content=b"solid qr\n"):
+    stl = tmp_path / name / f"{name}.stl"
+    stl.parent.mkdir()
+    stl.write_bytes(content)
+    stl.with_suffix('.json').write_text('{}')
+    return stl
+
+
+def test_completed_jobs_are_verified(tmp_path):
+    """A done job counts as completed only while its outputs are intact"""
+    journal = Journal(tmp_path / "journal.jsonl")
+    settings = {'input': 'https://example.com', 'mode': 'square', 'output_dir': str(tmp_path)}
+    stl = _output(tmp_path, "card")
+    journal.record_done(settings, stl, "card")
+
+    resumed = Journal(tmp_path / "journal.jsonl")
+    assert resumed.completed(dict(settings, quiet=True, memory_mb=300))['stl']['path'] == str(stl)
+    assert resumed.completed(dict(settings, mode='pendant')) is None
+
+    stl.write_bytes(b"solid QR\n")  # Same size, other content
+    assert resumed.completed(settings) is None
+    stl.unlink()
+    assert resumed.completed(settings) is None
+
+
+def test_last_record_wins_and_torn_lines_are_ignored(tmp_path):
+    """A later failure replaces a done record; a partially written last line is skipped"""
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(path)
+    settings = {'input': 'https://example.com'}
+    journal.record_done(settings, _output(tmp_path, "card"), "card")
+    journal.record_failed(settings, "OpenSCAD crashed", "card")
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"job": "' + job_key(settings) + '", "state": "do')
+
+    resumed = Journal(path)
+    assert resumed.records[job_key(settings)]['state'] == 'failed'
+    assert resumed.completed(settings) is None
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="OpenSCAD is hidden through PATH")
+def test_job_without_stl_is_journaled_as_failed(tmp_path, monkeypatch):
+    """A batch job that wrote no STL (here: no OpenSCAD) is failed in the results and the journal"""
+    from qrly.job_queue import FAILED, run_batch
+
+    monkeypatch.setenv('PATH', str(tmp_path))  # Workers inherit the environment
+    journal = Journal(tmp_path / "journal.jsonl")
+    settings = {'input': 'https://example.com', 'output_name': 'card', 'output_dir': str(tmp_path),
+                'engine': 'openscad'}
+    [job] = run_batch([settings], max_workers=1, poll_interval=0.05, journal=journal)
+
+    assert job.state == FAILED
+    assert Journal(tmp_path / "journal.jsonl").records[job_key(settings)]['state'] == 'failed'
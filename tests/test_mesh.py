@@ -0,0 +1,115 @@
+"""Tests for the native mesh builder and text meshes"""
+
+import struct
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from qrly.fonts import find_font_file, glyph_mesh, text_mesh
+from qrly.generator import QRModelGenerator
+from qrly.mesh import box, extrude_polygon, relief_mesh, rounded_rectangle, signed_area, triangulate_polygon
+
+
+def is_closed(mesh):
+    """Every directed edge must have exactly one opposite edge"""
+    edges = Counter()
+    for a, b, c in mesh.faces:
+        for u, v in ((a, b), (b, c), (c, a)):
+            edges[(u, v)] += 1
+    return all(edges[(v, u)] == count for (u, v), count in edges.items())
+
+
+def test_triangulate_polygon_with_hole():
+    """Triangulation covers the polygon area minus the hole"""
+    outer = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    hole = [(3, 3), (3, 7), (7, 7), (7, 3)]  # clockwise
+
+    triangles = triangulate_polygon(outer, [hole])
+
+    assert sum(signed_area(t) for t in triangles) == pytest.approx(100 - 16)
+
+
+def test_extrude_polygon_is_closed():
+    """Extruded plate with hole is a closed solid"""
+    outline = rounded_rectangle(55, 61, 2, 8)
+    hole = [(27.5 + x, 6 + y) for x, y in reversed([(2.5, 0), (0, 2.5), (-2.5, 0), (0, -2.5)])]
+
+    mesh = extrude_polygon(outline, [hole], height=1.5)
+
+    assert is_closed(mesh)
+    (min_x, min_y, min_z), (max_x, max_y, max_z) = mesh.bounds()
+    assert (min_x, min_y, min_z) == pytest.approx((0, 0, 0))
+    assert (max_x, max_y, max_z) == pytest.approx((55, 61, 1.5))
+
+
+def test_relief_mesh_merges_modules():
+    """Adjacent modules are merged into rectangles"""
+    matrix = [
+        [True, True, False],
+        [True, True, False],
+        [False, False, True],
+    ]
+
+    mesh = relief_mesh(matrix, 2.0, 1.0)
+
+    assert mesh.triangle_count == 2 * box(0, 0, 0, 1, 1, 1).triangle_count
+    assert mesh.bounds() == ((0.0, 0.0, 0.0), (6.0, 6.0, 1.0))
+
+
+@pytest.mark.skipif(find_font_file() is None, reason="No TrueType font available")
+def test_text_mesh_layout_and_cache():
+    """Text is centered on X, starts at Y=0 and reuses cached glyphs"""
+    glyph_mesh.cache_clear()
+
+    mesh = text_mesh("ABBA", 6, 1.0)
+
+    (min_x, min_y, _), (max_x, max_y, max_z) = mesh.bounds()
+    assert min_y == pytest.approx(0)
+    assert max_z == pytest.approx(1.0)
+    assert min_x == pytest.approx(-max_x, abs=1.0)
+    # OpenSCAD size: capitals about size tall, within calculate_text_size's 0.8 × size per character
+    assert max_y == pytest.approx(6, rel=0.15)
+    assert 0.6 * 4 * 6 < max_x - min_x <= 0.8 * 4 * 6
+    assert glyph_mesh.cache_info().hits == 2
+    assert is_closed(glyph_mesh(find_font_file(), "A", 6, 1.0))
+
+
+@pytest.mark.skipif(find_font_file() is None, reason="No TrueType font available")
+def test_native_export_text_mode():
+    """Native engine writes a binary STL for text modes without OpenSCAD"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        image_path = Path(tmpdir) / "qr.png"
+        QRModelGenerator.generate_qr_image("https://example.com", image_path)
+
+        generator = QRModelGenerator(image_path, "pendant-text", tmpdir)
+        generator.text_content = "HELLO"
+        generator.text_rotation = 180
+        matrix, width, height = generator.load_and_process_image()
+        dimensions = generator.calculate_dimensions(width)
+
+        stl_path = Path(tmpdir) / "model.stl"
+        assert generator.export_native_stl(matrix, dimensions, stl_path)
+
+        data = stl_path.read_bytes()
+        triangles = struct.unpack_from('<I', data, 80)[0]
+        assert triangles > 0
+        assert len(data) == 84 + 50 * triangles
+
+
+def test_separate_bodies(tmp_path):
+    """With split_bodies the base and the relief/text are written as extra STLs that add up to the model"""
+    image_path = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image_path, "rectangle-text", tmp_path / "out", output_name="card")
+    generator.engine = 'native'
+    generator.text_content = "HELLO"
+    generator.split_bodies = True
+    _, stl_path, json_path = generator.generate()
+
+    def triangles(path):
+        return struct.unpack_from('<I', path.read_bytes(), 80)[0]
+
+    bodies = QRModelGenerator.body_paths(stl_path)
+    assert [path.name for path in bodies.values()] == ["card-medium-thin-base.stl", "card-medium-thin-relief.stl"]
+    assert triangles(bodies['base']) + triangles(bodies['relief']) == triangles(stl_path)
+    assert '"bodies"' in json_path.read_text()
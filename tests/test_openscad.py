@@ -0,0 +1,99 @@
+"""Tests for OpenSCAD capability probing"""
+
+import os
+import sys
+
+import pytest
+
+from qrly.openscad import parse_help, parse_version, probe_openscad, rejects_flags, render_flags
+
+
+HELP_2021 = """Usage: openscad [options] file.scad
+  -o [ --o ] arg       output specified file instead of running the GUI
+  --enable arg         enable experimental features: roof | input-driver-dbus
+                       | lazy-union | vertex-object-renderers
+  -h [ --help ]        print this help message and exit
+"""
+
+HELP_2025 = """Usage: openscad [options] file.scad
+  --backend arg        3D rendering backend to use: 'CGAL' (old/slow)
+                       [default] or 'Manifold' (new/fast)
+  --enable arg         enable experimental features (can be used several
+                       times): import-function | lazy-union | roof
+  -h [ --help ]        print this help message and exit
+"""
+
+
+def test_parse_version():
+    """Release and nightly version strings"""
+    assert parse_version("OpenSCAD version 2021.01\n") == (2021, 1)
+    assert parse_version("OpenSCAD version 2024.12.06\n") == (2024, 12, 6)
+    assert parse_version("command not found") is None
+
+
+def test_parse_help_and_flags():
+    """Manifold backend is preferred; old versions only get lazy-union"""
+    backends, features = parse_help(HELP_2025)
+    assert backends == {'cgal', 'manifold'}
+    assert {'lazy-union', 'roof'} <= features
+    assert render_flags({'backends': backends, 'features': features}) == \
+        ['--backend=manifold', '--enable=lazy-union']
+
+    backends, features = parse_help(HELP_2021)
+    assert backends == set()
+    assert 'lazy-union' in features and 'fast-csg' not in features
+    assert render_flags({'backends': backends, 'features': features}) == ['--enable=lazy-union']
+
+    assert render_flags({'backends': set(), 'features': {'fast-csg', 'manifold'}}) == ['--enable=manifold']
+    assert render_flags(None) == []
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Uses a shell script as fake binary")
+def test_probe_fake_binary(tmp_path):
+    """Probing runs the binary and caches the result per process"""
+    binary = tmp_path / 'openscad'
+    calls = tmp_path / 'calls'
+    binary.write_text(f"""#!/bin/sh
+echo x >> "{calls}"
+if [ "$1" = "--version" ]; then echo "OpenSCAD version 2023.06.01" >&2; exit 0; fi
+echo "  --enable arg   enable experimental features: fast-csg | manifold | lazy-union"
+""")
+    binary.chmod(0o755)
+
+    first = probe_openscad(str(binary))
+    assert first['version'] == (2023, 6, 1)
+    assert render_flags(first) == ['--enable=manifold', '--enable=lazy-union']
+    assert probe_openscad(str(binary)) is first
+    assert len(calls.read_text().split()) == 2
+    assert probe_openscad(str(tmp_path / 'missing')) is None
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Uses a shell script as fake binary")
+def test_failed_render_is_retried_only_for_rejected_flags(tmp_path, monkeypatch):
+    """Only unknown/unsupported flags trigger a plain retry; a SCAD error is reported after one render"""
+    from qrly import openscad
+    from qrly.generator import QRModelGenerator
+
+    flags = ['--backend=manifold', '--enable=lazy-union']
+    assert rejects_flags("unrecognised option '--backend=manifold'", flags)
+    assert rejects_flags("ERROR: Unknown feature 'lazy-union'", flags)
+    assert not rejects_flags("ERROR: Parser error in file model.scad, line 3", flags)
+    assert not rejects_flags("unknown option '--backend=manifold'", [])
+
+    calls = tmp_path / 'calls'
+    binary = tmp_path / 'openscad'
+    binary.write_text(f"""#!/bin/sh
+echo x >> "{calls}"
+echo "ERROR: Parser error in file model.scad, line 3" >&2
+exit 1
+""")
+    binary.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}:{os.environ.get('PATH', '')}")
+    monkeypatch.setattr(openscad, 'probe_openscad', lambda binary: None)
+    monkeypatch.setattr(openscad, 'render_flags', lambda capabilities: flags)
+
+    generator = QRModelGenerator(tmp_path / 'qr.png')
+    scad_path = tmp_path / 'model.scad'
+    scad_path.write_text("cube(1);")
+    assert not generator.export_stl(scad_path, tmp_path / 'model.stl')
+    assert len(calls.read_text().split()) == 1
@@ -0,0 +1,124 @@
+"""Tests for the incremental model pipeline"""
+
+import tempfile
+from pathlib import Path
+
+from qrly.pipeline import ModelPipeline, StageGraph
+
+
+BASE_PARAMS = {
+    'input': 'https://example.com',
+    'mode': 'rectangle-text',
+    'text_content': 'HELLO',
+    'text_rotation': 180,
+    'height': 1.0,
+    'margin': 2.0,
+    'relief': 1.0,
+    'corner_radius': 2,
+    'size_scale': 1.0,
+}
+
+
+def test_stage_graph_memoizes_by_key():
+    """A stage is recomputed only when its key changes"""
+    graph = StageGraph()
+    graph.add_stage('double', lambda p, get: p['x'], lambda p, get: p['x'] * 2)
+    graph.add_stage('plus_one', lambda p, get: get('double'), lambda p, get: get('double') + 1)
+
+    assert graph.get('plus_one', {'x': 1, 'y': 0}) == 3
+    assert graph.get('plus_one', {'x': 1, 'y': 5}) == 3
+    assert graph.computed == ['double', 'plus_one']
+
+
+def test_text_change_does_not_resample_image():
+    """Changing text only rebuilds dimensions-dependent stages, not input or matrix"""
+    pipeline = ModelPipeline()
+    try:
+        pipeline.get('scad', BASE_PARAMS)
+        pipeline.graph.computed.clear()
+
+        pipeline.get('scad', dict(BASE_PARAMS, text_content='WORLD'))
+
+        assert 'input' not in pipeline.graph.computed
+        assert 'matrix' not in pipeline.graph.computed
+        assert 'scad' in pipeline.graph.computed
+    finally:
+        pipeline.cleanup()
+
+
+def test_corner_radius_change_keeps_relief():
+    """Changing corner radius rebuilds the base plate but not the QR relief"""
+    pipeline = ModelPipeline()
+    try:
+        pipeline.get('model', BASE_PARAMS)
+        pipeline.graph.computed.clear()
+
+        pipeline.get('model', dict(BASE_PARAMS, corner_radius=4))
+
+        assert pipeline.graph.computed == ['base', 'model']
+    finally:
+        pipeline.cleanup()
+
+
+def test_make_generator_reuses_stages():
+    """Generation through the pipeline reuses the preview's stages and keeps the input"""
+    pipeline = ModelPipeline()
+    try:
+        pipeline.get('model', BASE_PARAMS)
+        pipeline.graph.computed.clear()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            generator = pipeline.make_generator(BASE_PARAMS, tmpdir, output_name='test')
+            generator.engine = 'native'
+            scad_file, stl_file, json_file = generator.generate(qr_input=BASE_PARAMS['input'])
+
+            assert Path(stl_file).stat().st_size > 0
+            assert Path(json_file).exists()
+            assert Path(generator.image_path).exists()
+            assert pipeline.graph.computed == ['scad']
+    finally:
+        pipeline.cleanup()
+
+
+def test_exported_stages_seed_another_pipeline():
+    """A job worker's pipeline reuses the stages computed by the submitting one"""
+    import pickle
+
+    first, second = ModelPipeline(), ModelPipeline()
+    try:
+        exported = pickle.loads(pickle.dumps(first.export_stages(BASE_PARAMS)))
+        second.import_stages(exported)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            generator = second.make_generator(dict(BASE_PARAMS, output_name='test', stages=exported), tmpdir)
+            generator.engine = 'native'
+            _, stl_file, _ = generator.generate(qr_input=BASE_PARAMS['input'])
+
+            assert Path(stl_file).stat().st_size > 0
+            assert not {'input', 'matrix', 'dimensions', 'scad'} & set(second.graph.computed)
+    finally:
+        first.cleanup()
+        second.cleanup()
+
+
+def test_slow_stage_blocks_only_its_own_key():
+    """Memo hits are served while another key computes; concurrent callers of that key share one result"""
+    import threading
+
+    release = threading.Event()
+    graph = StageGraph()
+    graph.add_stage('value', lambda p, get: p['x'],
+                    lambda p, get: release.wait(5) and p['x'] if p['x'] == 'slow' else p['x'])
+    assert graph.get('value', {'x': 'fast'}) == 'fast'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(graph.get('value', {'x': 'slow'}))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    assert graph.get('value', {'x': 'fast'}) == 'fast'  # Not blocked by the slow computation
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['slow', 'slow']
+    assert graph.computed == ['value', 'value']
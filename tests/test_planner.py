@@ -0,0 +1,85 @@
+"""Tests for render cost estimation and batch planning"""
+
+from qrly.planner import CostModel, fit_linear, job_settings, load_jobs, makespan, plan_jobs, record_timing, load_timings
+
+
+def test_cost_model_calibrates_from_timings(tmp_path):
+    """Recorded timings replace the default model"""
+    path = tmp_path / 'timings.jsonl'
+    for primitives, seconds in [(100, 3.0), (200, 5.0), (400, 9.0)]:
+        record_timing('openscad', [], primitives, seconds, primitives * 1000, path=path)
+
+    model = CostModel(load_timings(path))
+    assert model.calibrated('openscad-cgal')
+    assert not model.calibrated('openscad-manifold')
+    assert abs(model.predict_seconds('openscad-cgal', 300) - 7.0) < 1e-6
+    assert model.predict_bytes('openscad-cgal', 300, 0) == 300000
+    assert fit_linear([(1, 1.0)]) is None
+
+
+def test_plan_orders_longest_first(tmp_path):
+    """Bigger QR codes (more primitives) are planned first"""
+    jobs = [{'input': 'https://example.com'},
+            {'input': 'https://example.com/' + 'x' * 150, 'mode': 'pendant-text', 'text': 'HI'}]
+    settings = [job_settings(job, tmp_path, engine='native') for job in jobs]
+    planned = plan_jobs(settings, CostModel({}))
+
+    assert [item['input'] for item, _ in planned] == [jobs[1]['input'], jobs[0]['input']]
+    first, second = planned[0][1], planned[1][1]
+    assert first['primitives'] > second['primitives']
+    assert first['triangles'] > 0 and first['bytes'] > 0
+    assert planned[0][0]['text_rotation'] == 180
+
+
+def test_csv_manifest_converts_numeric_columns(tmp_path):
+    """CSV values of numeric parameters (e.g. min_feature for --ecc auto) are numbers, not strings"""
+    path = tmp_path / 'jobs.csv'
+    path.write_text("input,ecc,min_feature,size_scale\nhttps://example.com/menu,auto,0.6,1.5\n", encoding='utf-8')
+    [job] = load_jobs(path)
+    assert job['min_feature'] == 0.6 and job['size_scale'] == 1.5 and job['ecc'] == 'auto'
+
+    [(settings, estimate)] = plan_jobs([job_settings(job, tmp_path, engine='native')], CostModel({}))
+    assert settings['min_feature'] == 0.6
+    assert 'error' not in estimate and estimate['primitives'] > 0
+
+
+def test_makespan_packs_longest_first():
+    """Greedy longest-first packing on two workers"""
+    assert makespan([5, 4, 3, 3, 1], 2) == 8
+    assert makespan([5, 4], 1) == 9
+
+
+
+def test_timing_records_the_render_actually_run(tmp_path, monkeypatch):
+    """After a budget fallback the merged SCAD is counted; compaction time is not part of the render"""
+    import time
+
+    from qrly import planner
+    from qrly.generator import QRModelGenerator
+    from qrly.mesh import box
+    from qrly.scheduler import RenderBudgetExceeded, count_primitives
+
+    def export_stl(self, scad_path, stl_path, background=False):
+        if self.render_strategy == 'scad':
+            raise RenderBudgetExceeded("over budget")
+        box(0, 0, 0, 10, 10, 1).write_stl(stl_path)  # Stands in for OpenSCAD's output
+        self.exported_with = 'openscad'
+        return True
+
+    def compact_openscad_stl(self, stl_path):
+        time.sleep(0.5)
+        self.compaction = {'triangles': 12}
+
+    monkeypatch.setattr(QRModelGenerator, 'export_stl', export_stl)
+    monkeypatch.setattr(QRModelGenerator, 'compact_openscad_stl', compact_openscad_stl)
+    monkeypatch.setattr(planner, 'TIMINGS_PATH', tmp_path / 'timings.jsonl')
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, output_dir=tmp_path / "out")
+    matrix, width, _ = generator.load_and_process_image()
+    unmerged = count_primitives(generator.generate_openscad(matrix, generator.calculate_dimensions(width)))
+    scad_file, _, _ = generator.generate()
+
+    [entry] = load_timings(tmp_path / 'timings.jsonl')['openscad-cgal']
+    assert entry['primitives'] == count_primitives(scad_file.read_text()) < unmerged
+    assert entry['seconds'] < 0.5 and entry['binary']
+    assert CostModel({}).predict_bytes('openscad-cgal', 0, 100) == 84 + 100 * 50
@@ -0,0 +1,50 @@
+"""Tests for the base plate mesh cache"""
+
+import tempfile
+
+from qrly.plate_cache import PlateCache, build_plate, load_mesh, save_mesh, warm_up
+
+
+def test_plate_cache_memory_and_disk():
+    """Plates are reused from memory, then from disk in a fresh cache"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = PlateCache(tmpdir)
+        plate = cache.get(55, 61, 1.0, 2, 8, (27.5, 6, 5))
+        assert cache.get(55, 61, 1.0, 2, 8, (27.5, 6, 5)) is plate
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        fresh = PlateCache(tmpdir)
+        reloaded = fresh.get(55, 61, 1.0, 2, 8, (27.5, 6, 5))
+        assert (fresh.hits, fresh.misses) == (1, 0)
+        assert reloaded.vertices == plate.vertices
+        assert reloaded.faces == plate.faces
+
+
+def test_save_and_load_mesh_roundtrip():
+    """Binary plate format preserves vertices and faces"""
+    plate = build_plate(54, 64, 0.5, 2, 8)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = f"{tmpdir}/plate.plate"
+        save_mesh(plate, path)
+        loaded = load_mesh(path)
+    assert loaded.vertices == plate.vertices
+    assert loaded.faces == plate.faces
+
+
+def test_warm_up_covers_presets():
+    """Warm-up builds one plate per distinct preset and card length, so long labels hit the cache"""
+    from qrly.generator import CURVE_SEGMENTS, QRModelGenerator
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = PlateCache(tmpdir)
+        count = warm_up(cache)
+        assert count == cache.misses > 45
+
+        for mode in ('pendant-text', 'rectangle-text-2x'):
+            generator = QRModelGenerator('preset.png', mode)
+            generator.text_content = "EIGHTEEN CHARACTER"
+            generator.text_content_top = "TOP" if mode == 'rectangle-text-2x' else ''
+            dimensions = generator.calculate_dimensions(37)
+            cache.get(dimensions['card_width'], dimensions['card_length'], generator.card_height,
+                      generator.corner_radius, CURVE_SEGMENTS, generator.hole_geometry(dimensions))
+        assert cache.misses == count
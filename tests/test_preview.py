@@ -0,0 +1,35 @@
+"""Tests for the in-process preview rasterizer"""
+
+import time
+
+from qrly.pipeline import ModelPipeline
+from qrly.preview import BACKGROUND_COLOR, render_preview
+
+
+def test_render_preview_draws_card_and_modules():
+    """A tiny matrix renders to an image of the requested size with card and relief colors"""
+    matrix = [[True, False], [False, True]]
+    dimensions = {'card_width': 20, 'card_length': 20, 'pixel_size': 5,
+                  'qr_offset_x': 5, 'qr_offset_y': 5}
+    image = render_preview(matrix, dimensions, 1.0, 1.0, size=(200, 100))
+
+    assert image.size == (200, 100)
+    assert image.getpixel((0, 0)) == BACKGROUND_COLOR
+    colors = {color for _, color in image.getcolors(200 * 100)}
+    assert len(colors) > 3
+
+
+def test_pipeline_preview_is_fast_and_memoized():
+    """Preview stage renders in well under a second and is reused for unchanged settings"""
+    pipeline = ModelPipeline()
+    params = {'input': 'https://example.com', 'mode': 'pendant-text', 'text_content': 'HELLO',
+              'text_rotation': 180, 'height': 1.0, 'relief': 1.0}
+    try:
+        pipeline.get('matrix', params)
+        start = time.perf_counter()
+        image = pipeline.get('preview', params)
+        assert time.perf_counter() - start < 1.0
+        assert image.size == (800, 800)
+        assert pipeline.get('preview', params) is image
+    finally:
+        pipeline.cleanup()
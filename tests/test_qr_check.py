@@ -0,0 +1,51 @@
+"""Tests for adaptive binarization and the QR structure check"""
+
+import pytest
+from PIL import Image, ImageChops, ImageFilter
+
+from qrly.generator import QRModelGenerator
+from qrly.qr_check import check_matrix
+
+
+def test_check_accepts_codes_and_rejects_damage(tmp_path):
+    """Sampled generated codes pass; a missing finder pattern or broken timing pattern fails"""
+    image = QRModelGenerator.generate_qr_image("https://example.com/check", tmp_path / "qr.png")
+    matrix, _, _ = QRModelGenerator(image).load_and_process_image()
+    result = check_matrix(matrix)
+    assert result['ok'] and result['modules'] == 33
+
+    no_finder = [list(row) for row in matrix]
+    for row in no_finder[-12:]:
+        row[:12] = [False] * 12
+    assert not check_matrix(no_finder)['ok']
+
+    assert not check_matrix([[False] * 20 for _ in range(20)])['ok']
+
+
+def test_uneven_lighting_uses_adaptive_threshold(tmp_path):
+    """With a strong shadow gradient no global threshold works; auto falls back to the local mean"""
+    image = QRModelGenerator.generate_qr_image("https://example.com/photo", tmp_path / "qr.png")
+    with Image.open(image) as img:
+        code = img.convert('L').resize((1200, 1200), Image.NEAREST).point(lambda v: 30 if v < 128 else 235)
+    shade = Image.linear_gradient('L').rotate(90).resize((1200, 1200)).point(lambda v: int(255 - v * 0.8))
+    ImageChops.multiply(code, shade).filter(ImageFilter.GaussianBlur(2)).save(tmp_path / "photo.jpg")
+
+    generator = QRModelGenerator(tmp_path / "photo.jpg")
+    generator.threshold = 'otsu'
+    assert not check_matrix(generator.load_and_process_image()[0])['ok']
+    generator.threshold = 'auto'
+    matrix, _, _ = generator.load_and_process_image()
+    assert generator.threshold_used == 'adaptive' and check_matrix(matrix)['ok']
+
+
+def test_bad_input_is_rejected_before_rendering(tmp_path):
+    Image.effect_noise((400, 400), 100).save(tmp_path / "noise.png")
+    generator = QRModelGenerator(tmp_path / "noise.png", output_dir=tmp_path / "out")
+    generator.engine = 'native'
+
+    with pytest.raises(ValueError, match="QR code check failed"):
+        generator.generate()
+    assert not (tmp_path / "out").exists()
+
+    generator.check_input = False
+    assert generator.generate()[1].exists()
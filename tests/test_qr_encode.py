@@ -0,0 +1,52 @@
+"""Tests for the QR encoding optimizer (ECC level, version, printable module size)"""
+
+from qrly.generator import QRModelGenerator
+from qrly.qr_encode import choose_encoding, encoding_for, qr_version, uppercase_url
+
+
+def test_auto_uses_fewer_modules_than_fixed_high_ecc():
+    """Auto never picks more modules than ECC H, and never drops below the M target when printable"""
+    url = "https://example.com/some/long/path?x=1"
+    generator = QRModelGenerator(url, 'square')
+    fixed = encoding_for(generator, url, 'H')
+    auto = encoding_for(generator, url, 'auto')
+
+    assert fixed['ecc'] == 'H' and fixed['version'] == qr_version(url, 'H')
+    assert auto['modules'] < fixed['modules'] and auto['module_mm'] > fixed['module_mm']
+    assert auto['ecc'] in ('M', 'Q', 'H') and auto['printable']
+
+
+def test_uppercase_url_variant():
+    """Scheme and host are upper-cased, path and query keep their case"""
+    assert uppercase_url("https://Example.com/Menu?a=B") == "HTTPS://EXAMPLE.COM/Menu?a=B"
+    assert uppercase_url("plain text") == "plain text"
+
+
+def test_small_area_is_not_printable():
+    """A long URL on a tiny QR area is reported as not printable"""
+    encoding = choose_encoding("https://example.com/" + "x" * 300, qr_size_mm=20)
+
+    assert not encoding['printable']
+    assert encoding['module_mm'] < 0.8
+
+
+def test_long_url_prints_every_module(tmp_path):
+    """URL inputs use the encoder's exact matrix: a 420-character URL at ECC H keeps all modules and scans"""
+    from qrly.pipeline import ModelPipeline
+    from qrly.qr_encode import printed_cells
+
+    url = "https://example.com/" + "a1" * 200
+    pipeline = ModelPipeline()
+    try:
+        params = {'input': url, 'mode': 'square', 'ecc': 'H', 'size_scale': 2.0}
+        generator = pipeline.make_generator(params, tmp_path, output_name='long')
+        generator.engine = 'native'
+        generator.generate(qr_input=url)
+
+        encoding = generator.qr_encoding
+        assert pipeline.get('matrix', params)['width'] == printed_cells(encoding['version']) > 100
+        assert generator.scan_check['ok']
+        qr_size = generator.calculate_dimensions(1)['qr_size']
+        assert encoding['module_mm'] == round(qr_size / printed_cells(encoding['version']), 3)
+    finally:
+        pipeline.cleanup()
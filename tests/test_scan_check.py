@@ -0,0 +1,60 @@
+"""Tests for the QR decoder and the scan check of the generated geometry"""
+
+import json
+import time
+
+import pytest
+import qrcode
+
+from qrly.generator import QRModelGenerator
+from qrly.preview import generator_texts
+from qrly.qr_decode import decode_modules
+from qrly.scan_check import check_geometry
+
+
+def test_decoder_corrects_damaged_modules():
+    """Module grids from qrcode decode; flipped data modules are corrected by Reed-Solomon"""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=0)
+    qr.add_data("https://example.com/menu?table=12")
+    qr.make()
+    modules = [list(row) for row in qr.modules]
+    result = decode_modules(modules)
+    assert (result['text'], result['version'], result['ecc'], result['corrected_codewords']) == (
+        "https://example.com/menu?table=12", qr.version, 'M', 0)
+
+    for row, column in ((12, 12), (15, 20), (20, 15)):
+        modules[row][column] = not modules[row][column]
+    result = decode_modules(modules)
+    assert result['text'] == "https://example.com/menu?table=12" and result['corrected_codewords'] == 3
+
+
+def test_generated_model_decodes(tmp_path):
+    """The top view of a generated model decodes to its URL in well under 50 ms; the result is in the metadata"""
+    url = "https://example.com/scan"
+    image = QRModelGenerator.generate_qr_image(url, tmp_path / "qr.png")
+    generator = QRModelGenerator(image, mode='rectangle-text', output_dir=tmp_path / "out")
+    generator.engine = 'native'
+    generator.move_input = False
+    generator.text_content = "SCAN ME"
+    _, _, json_path = generator.generate(qr_input=url)
+
+    scan = json.loads(json_path.read_text())['scan_check']
+    assert scan['ok'] and scan['decoded'] == url and scan['corrected_codewords'] == 0
+
+    matrix, width, _ = generator.load_and_process_image()
+    dimensions = generator.calculate_dimensions(width)
+    start = time.perf_counter()
+    check_geometry(matrix, dimensions, generator.corner_radius, None, generator_texts(generator, dimensions), url)
+    assert time.perf_counter() - start < 0.05
+
+
+def test_model_that_would_not_scan_is_rejected(tmp_path):
+    """A chain hole cutting through the code fails the check before anything is written"""
+    image = QRModelGenerator.generate_qr_image("https://example.com/pendant", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, mode='pendant', output_dir=tmp_path / "out")
+    generator.engine = 'native'
+    generator.hole_diameter = 30
+
+    with pytest.raises(ValueError, match="Scan check failed"):
+        generator.generate()
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,57 @@
+"""Tests for the OpenSCAD render scheduler"""
+
+import os
+import sys
+
+import pytest
+
+from qrly.generator import QRModelGenerator
+from qrly.scheduler import RenderBudgetExceeded, RenderScheduler, is_out_of_memory
+
+
+def test_admission_by_slots_and_memory():
+    """Renders are admitted while both CPU slots and memory budget allow"""
+    scheduler = RenderScheduler(max_concurrent=2, memory_budget_mb=1000)
+    assert scheduler.try_acquire(600)
+    assert not scheduler.try_acquire(600)  # Memory budget
+    assert scheduler.try_acquire(300)
+    assert not scheduler.try_acquire(10)  # CPU slots
+
+    scheduler.release(600)
+    scheduler.release(300)
+    assert scheduler.try_acquire(5000)  # Oversized render still runs, alone
+    assert not scheduler.acquire(10, timeout=0.01)
+
+
+@pytest.mark.skipif(os.name != 'posix' or sys.platform == 'darwin', reason="RLIMIT_DATA is enforced on Linux only")
+def test_run_applies_memory_limit():
+    """Child processes run with a data-segment limit of 3x the estimate (at least 2 GB)"""
+    scheduler = RenderScheduler(max_concurrent=1, memory_budget_mb=10000)
+    code = "import resource; print(resource.getrlimit(resource.RLIMIT_DATA)[0])"
+    result = scheduler.run([sys.executable, '-c', code], 1000)
+    assert int(result.stdout) == 3000 * 1024 * 1024
+
+    assert is_out_of_memory(-9, '')
+    assert is_out_of_memory(-6, 'terminate called after throwing an instance of std::bad_alloc')
+    assert not is_out_of_memory(-11, '')  # Segfault
+    assert not is_out_of_memory(-6, 'CGAL assertion violation')
+    assert not is_out_of_memory(1, 'Parser error')
+
+
+def test_over_budget_falls_back_to_cheaper_strategies(tmp_path, monkeypatch):
+    """A render over budget is retried with merged runs, then with the native engine"""
+    attempts = []
+
+    def export_stl(self, scad_path, stl_path, background=False):
+        attempts.append(scad_path.read_text())
+        raise RenderBudgetExceeded("over budget")
+
+    monkeypatch.setattr(QRModelGenerator, 'export_stl', export_stl)
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, output_dir=tmp_path / "out")
+    _, stl_file, _ = generator.generate()
+
+    assert len(attempts) == 2
+    assert attempts[1].count('cube(') < attempts[0].count('cube(')
+    assert generator.render_strategy == 'native'
+    assert stl_file.stat().st_size > 0
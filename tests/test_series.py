@@ -0,0 +1,75 @@
+"""Tests for numbered series"""
+
+import json
+import struct
+
+import pytest
+
+from qrly.pipeline import ModelPipeline
+from qrly.planner import job_settings
+from qrly.series import generate_series, parse_range, series_items, series_jobs
+
+
+class FakeConn:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+
+def _settings(tmp_path):
+    return job_settings({'input': 'https://x.io/a/00001', 'mode': 'rectangle-text'}, tmp_path, 'native')
+
+
+def test_templates_expand_over_range():
+    """Ranges are inclusive with an optional step; templates must give distinct inputs"""
+    assert parse_range("8-12:2") == [8, 10, 12]
+    items = series_items(parse_range("9-10"), "https://x.io/a/{n:05d}", "#{n}")
+    assert [(item['input'], item['text_content'], item['output_name']) for item in items] == [
+        ("https://x.io/a/00009", "#9", "https___x_io_a_00009"),
+        ("https://x.io/a/00010", "#10", "https___x_io_a_00010"),
+    ]
+    with pytest.raises(ValueError):
+        series_items([1, 2], "https://x.io/a/fixed")
+    with pytest.raises(ValueError):
+        parse_range("5-1")
+
+
+def test_series_chunk_reuses_base_geometry(tmp_path):
+    """A chunk rebuilds matrix and label per item, but the base plate only once"""
+    items = series_items(range(1, 5), "https://x.io/a/{n:05d}", "#{n}")
+    job = dict(series_jobs(_settings(tmp_path), items, workers=1)[0], series=items)
+    pipeline = ModelPipeline()
+    conn = FakeConn()
+    try:
+        generate_series(pipeline, job, conn)
+    finally:
+        pipeline.cleanup()
+
+    assert conn.messages[-1][0] == 'done'
+    assert len([path for path in tmp_path.iterdir() if path.is_dir()]) == 4
+    assert pipeline.graph.computed.count('matrix') == 4
+    assert pipeline.graph.computed.count('text') == 4
+    assert pipeline.graph.computed.count('base') == 1
+
+
+def test_packed_plates(tmp_path):
+    """Cards are packed onto plates (one STL and position map per plate)"""
+    items = series_items(range(1, 6), "https://x.io/a/{n:05d}", "#{n}")
+    jobs = series_jobs(_settings(tmp_path), items, workers=1, plate=(120, 80), plate_dir=tmp_path)
+    assert [len(job['series']) for job in jobs] == [2, 2, 1]  # 54 mm cards: 2 columns, 1 row
+
+    pipeline = ModelPipeline()
+    try:
+        generate_series(pipeline, jobs[0], FakeConn())
+        single = pipeline.get('model', dict(_settings(tmp_path), text_content='#1')).triangle_count
+    finally:
+        pipeline.cleanup()
+
+    cards = json.loads((tmp_path / "plate-001.json").read_text())['cards']
+    assert [(card['n'], card['column'], card['x_mm']) for card in cards] == [(1, 0, 0.0), (2, 1, 59.0)]
+    with open(tmp_path / "plate-001.stl", 'rb') as f:
+        f.seek(80)
+        triangles = struct.unpack('<I', f.read(4))[0]
+    assert single < triangles < 3 * single
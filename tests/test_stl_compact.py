@@ -0,0 +1,75 @@
+"""Tests for the STL compactor (OpenSCAD output post-processing)"""
+
+from collections import Counter
+
+import pytest
+from qrly.generator import QRModelGenerator
+from qrly.mesh import box, extrude_polygon
+from qrly.stl_compact import compact_stl, merge_coplanar, read_stl
+
+
+def write_ascii_stl(path, mesh):
+    """ASCII STL like OpenSCAD writes it (every triangle repeats its vertices)"""
+    with open(path, 'w') as f:
+        f.write("solid OpenSCAD_Model\n")
+        for triangle in mesh.triangles():
+            f.write("  facet normal 0 0 0\n    outer loop\n")
+            for x, y, z in triangle:
+                f.write(f"      vertex {x:g} {y:g} {z:g}\n")
+            f.write("    endloop\n  endfacet\n")
+        f.write("endsolid OpenSCAD_Model\n")
+
+
+def is_closed(mesh):
+    """Every directed edge must have exactly one opposite edge"""
+    edges = Counter()
+    for a, b, c in mesh.faces:
+        for u, v in ((a, b), (b, c), (c, a)):
+            edges[(u, v)] += 1
+    return all(edges[(v, u)] == count for (u, v), count in edges.items())
+
+
+def volume(mesh):
+    return sum(a[0] * (b[1] * c[2] - b[2] * c[1]) - a[1] * (b[0] * c[2] - b[2] * c[0])
+               + a[2] * (b[0] * c[1] - b[1] * c[0]) for a, b, c in mesh.triangles()) / 6
+
+
+def test_coplanar_facets_are_merged(tmp_path):
+    """An outline with a vertex at every module edge (unioned cubes) shrinks to its corners"""
+    outline = ([(x, 0) for x in range(6)] + [(6, y) for y in range(3)] + [(x, 3) for x in range(6, 2, -1)]
+               + [(3, y) for y in range(3, 7)] + [(x, 7) for x in range(3, -1, -1)] + [(0, y) for y in range(7, 0, -1)])
+    path = tmp_path / "model.stl"
+    write_ascii_stl(path, extrude_polygon(outline, height=1.0))
+
+    welded = read_stl(path)
+    stats = compact_stl(path)
+    compacted = read_stl(path)  # Binary now
+
+    assert stats['triangles'] == 20 < stats['triangles_before'] and len(compacted.vertices) == 12
+    assert stats['bytes'] == 84 + 50 * 20 < stats['bytes_before'] / 10
+    assert is_closed(compacted)
+    assert volume(compacted) == pytest.approx(volume(welded)) == pytest.approx(30.0)
+
+
+def test_touching_shells_are_left_alone(tmp_path):
+    """Vertices shared by shells that only touch (not manifold) are kept"""
+    mesh = box(0, 0, 0, 1, 1, 1).extend(box(1, 1, 0, 1, 1, 1)).extend(box(1, 0, 0, 1, 1, 1))
+    path = tmp_path / "touching.stl"
+    write_ascii_stl(path, mesh)
+
+    merged = merge_coplanar(read_stl(path))
+    assert is_closed(merged)
+    assert volume(merged) == pytest.approx(3.0)
+
+
+def test_generator_compacts_openscad_output(tmp_path):
+    """The post-export stage rewrites the STL and records the compaction in the render metadata"""
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, output_dir=tmp_path / "out")
+    matrix, width, _ = generator.load_and_process_image()
+    path = tmp_path / "model.stl"
+    write_ascii_stl(path, generator.build_mesh(matrix, generator.calculate_dimensions(width)))
+
+    generator.compact_openscad_stl(path)
+    assert generator.render_metadata()['compacted']['bytes'] == path.stat().st_size
+    assert len(generator.compacted_mesh.faces) == generator.compaction['triangles']
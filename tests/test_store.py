@@ -0,0 +1,51 @@
+"""Tests for deterministic output and the content-addressed model store"""
+
+from qrly.generator import QRModelGenerator
+from qrly.store import ModelStore
+
+
+def _generate(tmp_path, name, **attributes):
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / f"{name}.png")
+    generator = QRModelGenerator(image, output_dir=tmp_path / "out", output_name="card")
+    generator.engine = 'native'
+    for key, value in attributes.items():
+        setattr(generator, key, value)
+    return generator, generator.generate(qr_input="https://example.com")
+
+
+def test_deterministic_output_is_byte_identical(tmp_path):
+    """Two deterministic runs produce identical SCAD and JSON bytes"""
+    _, first = _generate(tmp_path, 'a', deterministic=True)
+    _, second = _generate(tmp_path, 'b', deterministic=True)
+
+    assert first[0].parent != second[0].parent
+    assert first[0].read_bytes() == second[0].read_bytes()
+    assert first[2].read_bytes() == second[2].read_bytes()
+    assert b'generated_at' not in first[2].read_bytes()
+
+
+def test_store_reuses_identical_requests(tmp_path):
+    """An identical request links the stored model without rendering or a new directory"""
+    store = ModelStore(tmp_path / "store")
+    generator, first = _generate(tmp_path, 'a', store=store)
+    assert generator.exported_with == 'native'
+
+    generator, second = _generate(tmp_path, 'b', store=store)
+    assert generator.exported_with is None  # Nothing rendered
+    assert second == first
+    assert second[1].resolve().parent.parent.parent == store.root / 'objects'
+
+    _, other = _generate(tmp_path, 'c', store=store, corner_radius=4)
+    assert other[0].parent.name == "card-medium-thin (1)"
+    assert len(list((store.root / 'objects').glob('*/*'))) == 2
+
+
+def test_store_links_separate_bodies(tmp_path):
+    """Body STLs are stored and linked with the model; requests without bodies keep their own object"""
+    store = ModelStore(tmp_path / "store")
+    _, plain = _generate(tmp_path, 'a', store=store)
+    _, split = _generate(tmp_path, 'b', store=store, split_bodies=True)
+
+    assert split[0].parent != plain[0].parent
+    for path in QRModelGenerator.body_paths(split[1]).values():
+        assert path.is_symlink() and path.resolve().parent.parent.parent == store.root / 'objects'
@@ -0,0 +1,98 @@
+"""Tests for the 3MF writer"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+import pytest
+
+from qrly.generator import QRModelGenerator
+from qrly.mesh import Mesh, relief_mesh
+from qrly.threemf import CORE_NAMESPACE, MODEL_PATH, read_metadata, write_3mf
+
+
+def _model(path):
+    with zipfile.ZipFile(path) as package:
+        return ET.fromstring(package.read(MODEL_PATH))
+
+
+def test_vertices_are_welded_and_parts_become_components(tmp_path):
+    """Shared and nearly equal vertices are written once; collapsed triangles are dropped"""
+    square = Mesh([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (1.00001, 0, 0)],
+                  [(0, 1, 2), (0, 2, 3), (0, 1, 4)])
+    other = square.translated(0, 0, 1)
+
+    path = tmp_path / "test.3mf"
+    written = write_3mf(path, {'base': square, 'relief': other}, name='card', metadata={'qr_input': 'a & b'})
+    assert written == {'vertices': 8, 'triangles': 4}
+
+    model = _model(path)
+    objects = model.findall(f'{{{CORE_NAMESPACE}}}resources/{{{CORE_NAMESPACE}}}object')
+    assert [item.get('name') for item in objects] == ['base', 'relief', 'card']
+    assert len(objects[2].findall(f'.//{{{CORE_NAMESPACE}}}component')) == 2
+    assert model.find(f'{{{CORE_NAMESPACE}}}build/{{{CORE_NAMESPACE}}}item').get('objectid') == '3'
+    assert read_metadata(path) == {'qr_input': 'a & b'}
+
+    again = tmp_path / "again.3mf"
+    write_3mf(again, {'base': square, 'relief': other}, name='card', metadata={'qr_input': 'a & b'})
+    assert again.read_bytes() == path.read_bytes()
+
+
+def test_touching_shells_stay_manifold(tmp_path):
+    """Boxes of the relief that touch (side by side or diagonally) are not welded into non-manifold edges"""
+    matrix = [[1, 1, 0], [0, 1, 1], [1, 0, 1]]
+    path = tmp_path / "relief.3mf"
+    write_3mf(path, {'relief': relief_mesh(matrix, 1.0, 1.0)})
+
+    edges = Counter()
+    for triangle in _model(path).iter(f'{{{CORE_NAMESPACE}}}triangle'):
+        corners = [triangle.get(name) for name in ('v1', 'v2', 'v3')]
+        for u, v in zip(corners, corners[1:] + corners[:1]):
+            edges[(u, v)] += 1
+    assert all(count == 1 and edges[(v, u)] == 1 for (u, v), count in edges.items())
+
+    with pytest.raises(ValueError):
+        write_3mf(tmp_path / "empty.3mf", {'base': Mesh(), 'relief': Mesh()})
+
+
+def test_generator_writes_3mf(tmp_path):
+    """--3mf writes a compressed model with the metadata embedded, much smaller than the STL"""
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, output_dir=tmp_path / "out", output_name="card")
+    generator.engine = 'native'
+    generator.three_mf = True
+    _, stl_path, _ = generator.generate(qr_input="https://example.com")
+
+    path = stl_path.with_suffix('.3mf')
+    metadata = read_metadata(path)
+    assert metadata['qr_input'] == "https://example.com" and metadata['3mf'] == path.name
+    assert path.stat().st_size * 4 < stl_path.stat().st_size
+    triangles = _model(path).findall(f'.//{{{CORE_NAMESPACE}}}triangle')
+    assert len(triangles) == int.from_bytes(stl_path.read_bytes()[80:84], 'little')
+
+
+def test_3mf_follows_openscad_stl(tmp_path, monkeypatch):
+    """Without bodies the 3MF holds OpenSCAD's mesh; natively built bodies are noted in the metadata"""
+    from qrly.mesh import box
+
+    def export_stl(self, scad_path, stl_path, background=False):
+        box(0, 0, 0, 10, 10, 1).write_stl(stl_path)  # Stands in for OpenSCAD's output
+        self.exported_with = 'openscad'
+        return True
+
+    monkeypatch.setattr(QRModelGenerator, 'export_stl', export_stl)
+    image = QRModelGenerator.generate_qr_image("https://example.com", tmp_path / "qr.png")
+    generator = QRModelGenerator(image, 'rectangle-text', output_dir=tmp_path / "out", output_name="card")
+    generator.text_content = "HELLO"
+    generator.three_mf = True
+    generator.compact_output = False
+    generator.move_input = False  # Generated twice
+    _, stl_path, _ = generator.generate()
+
+    assert len(_model(stl_path.with_suffix('.3mf')).findall(f'.//{{{CORE_NAMESPACE}}}triangle')) == 12
+    assert 'bodies_engine' not in read_metadata(stl_path.with_suffix('.3mf'))['render']
+
+    generator.split_bodies = True
+    _, stl_path, _ = generator.generate()
+    render = read_metadata(stl_path.with_suffix('.3mf'))['render']
+    assert render['bodies_engine'] == 'native' and 'native_font' in render
@@ -0,0 +1,47 @@
+"""Tests for vector (SVG) QR code input"""
+
+import pytest
+import qrcode
+import qrcode.image.svg
+
+from qrly.vector import load_svg_matrix
+
+
+def _reference(data):
+    qr = qrcode.QRCode(border=1, error_correction=qrcode.constants.ERROR_CORRECT_H)
+    qr.add_data(data)
+    return [list(row) for row in qr.get_matrix()]
+
+
+@pytest.mark.parametrize('factory', [qrcode.image.svg.SvgImage, qrcode.image.svg.SvgPathFillImage])
+def test_qrcode_svg_gives_exact_matrix(tmp_path, factory):
+    """Rect-per-module and path SVGs (mm units, white background, 4-module border) give the exact matrix"""
+    qr = qrcode.QRCode(border=4, box_size=7, error_correction=qrcode.constants.ERROR_CORRECT_H,
+                       image_factory=factory)
+    qr.add_data("https://example.com/menu")
+    qr.make_image().save(tmp_path / "qr.svg")
+
+    assert load_svg_matrix(tmp_path / "qr.svg") == _reference("https://example.com/menu")
+
+
+def test_stroked_lines_with_transform(tmp_path):
+    """Stroked horizontal runs (segno style) inside a translated and scaled group"""
+    reference = _reference("HELLO")
+    runs = []
+    for y, row in enumerate(reference):
+        for x, cell in enumerate(row):
+            if cell and (x == 0 or not row[x - 1]):
+                length = next((end for end in range(x, len(row)) if not row[end]), len(row)) - x
+                runs.append(f"M{x} {y + 0.5}h{length}")
+    (tmp_path / "qr.svg").write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><g transform="translate(3 3) scale(2)">'
+        f'<path stroke="#000" fill="none" d="{"".join(runs)}"/></g></svg>')
+
+    assert load_svg_matrix(tmp_path / "qr.svg") == reference
+
+
+def test_curves_are_rejected(tmp_path):
+    (tmp_path / "logo.svg").write_text('<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0C5 5 10 0 10 10z"/></svg>')
+
+    with pytest.raises(ValueError, match="rectilinear"):
+        load_svg_matrix(tmp_path / "logo.svg")
@@ -0,0 +1,51 @@
+"""Tests for the watch folder"""
+
+import json
+
+from qrly.generator import QRModelGenerator
+from qrly.watch import STATE_NAME, WatchFolder
+
+
+def test_files_are_taken_after_settling(tmp_path):
+    """Files are only ready after staying unchanged for `settle` seconds; temp files are ignored"""
+    watch = WatchFolder(tmp_path, settle=2.0, queue=object())
+    image = tmp_path / "card.png"
+    image.write_bytes(b"partial")
+    (tmp_path / "upload.png.part").write_bytes(b"partial")
+
+    assert watch.settled_files(now=0.0) == []
+    assert watch.settled_files(now=1.0) == []
+    image.write_bytes(b"partial, now complete")
+    assert watch.settled_files(now=2.5) == []  # Changed - wait again
+    assert watch.settled_files(now=4.6) == [image]
+
+
+def test_watch_folder_processes_inputs(tmp_path):
+    """Images and manifests are generated; inputs move to processed/ or error/"""
+    QRModelGenerator.generate_qr_image("https://example.com/a", tmp_path / "single.png")
+    QRModelGenerator.generate_qr_image("https://example.com/b", tmp_path / "listed.png")
+    (tmp_path / "orders.csv").write_text(
+        "input,mode,text,height\nlisted.png,rectangle-text,HELLO,2\nhttps://example.com/c,,,\n", encoding='utf-8')
+    (tmp_path / "broken.json").write_text('[{"mode": "square"}]', encoding='utf-8')
+
+    WatchFolder(tmp_path, engine='native', workers=2, settle=0.0).run(interval=0.1, polling=True, once=True)
+
+    models = sorted(path.name for path in (tmp_path / "output").iterdir() if path.is_dir())
+    assert models == ["https___example_com_c-medium-thin", "listed-medium-thick", "single-medium-thin"]
+    assert sorted(path.name for path in (tmp_path / "processed").iterdir()) == ["listed.png", "orders.csv", "single.png"]
+    assert sorted(path.name for path in (tmp_path / "error").iterdir()) == ["broken.json", "broken.json.log"]
+    assert json.loads((tmp_path / STATE_NAME).read_text()) == {}
+
+
+def test_restart_skips_finished_jobs(tmp_path):
+    """Jobs recorded as done before a restart are not generated again"""
+    manifest = tmp_path / "orders.jsonl"
+    manifest.write_text('{"input": "https://example.com/a"}\n{"input": "https://example.com/b"}\n', encoding='utf-8')
+    stat = manifest.stat()
+    key = f"orders.jsonl:{stat.st_size}:{stat.st_mtime_ns}"
+    (tmp_path / STATE_NAME).write_text(json.dumps({key: {'done': [0]}}), encoding='utf-8')
+
+    WatchFolder(tmp_path, engine='native', settle=0.0).run(interval=0.1, polling=True, once=True)
+
+    assert [path.name for path in (tmp_path / "output").iterdir() if path.is_dir()] == ["https___example_com_b-medium-thin"]
+    assert (tmp_path / "processed" / "orders.jsonl").exists()